@@ -0,0 +1,225 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_BusTrace.py
+    @brief Record the register traffic of a board and replay it without hardware
+    @details DFRobot_BusRecorder hooks _read_reg/_write_reg of an I2C or UART instance and appends
+    @n every top-level call to a binary trace. Transfers the transport makes on its own behalf
+    @n (the RTC read window command) are part of the recorded call, not separate records.
+    @n Each recorded call holds the board's bus_lock while it runs and is written, so calls
+    @n from several threads are recorded whole and in the order they reached the bus.
+    @n
+    @n Trace file: b'DFBT' | version (1) | i2c_uart_flag (1), then one record per call:
+    @n op (1, 'R' or 'W') | reg (1) | size (1) | result (1) | received (1) | start_us (8) |
+    @n duration_us (4) | payload (size)
+    @n The payload holds the bytes read (reads) or written (writes) and received the bytes a
+    @n read actually delivered (_last_read_len); little endian throughout.
+    @n
+    @n DFRobot_GNSSAndRTC_Replay serves the trace back to the unchanged driver API, either with
+    @n the original timing or as fast as possible, so get_all_gnss and the RTC paths can be
+    @n profiled on a workstation.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import collections
+import struct
+import threading
+import time
+
+from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC
+from DFRobot_GNSSUtil import install_hook, remove_hook
+
+TRACE_MAGIC = b'DFBT'
+TRACE_VERSION = 1
+OP_READ = ord('R')
+OP_WRITE = ord('W')
+
+_HEADER = struct.Struct('<4sBB')
+_RECORD = struct.Struct('<BBBBBQI')
+
+TraceRecord = collections.namedtuple('TraceRecord',
+                                     'op reg size result received start_us duration_us payload')
+
+
+def read_trace(path):
+    '''!
+      @brief Load a trace file
+      @param path Trace file
+      @return (i2c_uart_flag, list of TraceRecord)
+    '''
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, flag = _HEADER.unpack_from(data, 0)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        raise ValueError("%s is not a bus trace" % path)
+    records = []
+    pos = _HEADER.size
+    while pos + _RECORD.size <= len(data):
+        op, reg, size, result, received, start, duration = _RECORD.unpack_from(data, pos)
+        pos += _RECORD.size
+        payload = bytearray(data[pos:pos + size])
+        pos += size
+        records.append(TraceRecord(op, reg, size, result, received, start, duration, payload))
+    return flag, records
+
+
+class DFRobot_BusRecorder(object):
+    '''!
+      @brief Appends the register calls of one board to a trace file
+    '''
+
+    def __init__(self, path):
+        '''!
+          @brief Constructor
+          @param path Trace file, overwritten
+        '''
+        self.__file = open(path, 'wb')
+        self.__board = None
+        self.__hooks = []
+        # Calls the transport makes on behalf of a recorded call, per thread
+        self.__local = threading.local()
+        self.__t0 = None
+        self.records = 0
+
+    def attach(self, board):
+        '''!
+          @brief Start recording a board
+          @param board DFRobot_GNSSAndRTC_I2C or DFRobot_GNSSAndRTC_UART instance, usually after begin()
+          @n     Other tools hooking the same methods (DFRobot_Tracer) may be attached before or after.
+        '''
+        self.__board = board
+        self.__t0 = time.time()
+        self.__file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, board.i2c_uart_flag))
+        read_reg = board._read_reg
+        write_reg = board._write_reg
+
+        def _read_reg(reg, p_buf, size):
+            if self.__board is not board:
+                return read_reg(reg, p_buf, size)
+            return self.__call(board, OP_READ, read_reg, reg, p_buf, size)
+
+        def _write_reg(reg, p_buf, size):
+            if self.__board is not board:
+                return write_reg(reg, p_buf, size)
+            return self.__call(board, OP_WRITE, write_reg, reg, p_buf, size)
+
+        self.__hooks = [install_hook(board, '_read_reg', _read_reg),
+                        install_hook(board, '_write_reg', _write_reg)]
+        return board
+
+    def detach(self):
+        '''!
+          @brief Stop recording and close the trace file
+          @n     A hook another tool wrapped in the meantime stays installed and only passes calls on.
+        '''
+        board = self.__board
+        if board is not None:
+            # Waits for a call being recorded, later calls see the recorder detached
+            with board.bus_lock:
+                self.__board = None
+                for token in self.__hooks:
+                    remove_hook(board, token)
+        self.__hooks = []
+        self.__file.close()
+
+    def __call(self, board, op, func, reg, p_buf, size):
+        local = self.__local
+        if getattr(local, 'depth', 0):
+            return func(reg, p_buf, size)
+        with board.bus_lock:
+            if self.__board is not board:
+                return func(reg, p_buf, size)
+            local.depth = 1
+            start = time.time()
+            try:
+                ret = func(reg, p_buf, size)
+            finally:
+                local.depth = 0
+            end = time.time()
+            payload = bytearray([b & 0xff for b in p_buf[:size]]) if p_buf else bytearray()
+            received = 0
+            if op == OP_READ:
+                received = len(payload) if ret == 0 else min(board._last_read_len, len(payload))
+            self.__file.write(_RECORD.pack(op, reg, len(payload), ret & 0xff, received,
+                                           int((start - self.__t0) * 1e6), int((end - start) * 1e6)))
+            self.__file.write(payload)
+            self.records += 1
+        return ret
+
+
+class DFRobot_GNSSAndRTC_Replay(DFRobot_GNSSAndRTC):
+    '''!
+      @brief Transport that answers register calls from a recorded trace
+    '''
+
+    def __init__(self, path, realtime=False, strict=True):
+        '''!
+          @brief Constructor
+          @param path Trace file written by DFRobot_BusRecorder
+          @param realtime True to reproduce the recorded call durations and gaps, False to run as fast
+          @n     as possible
+          @param strict True to raise ValueError when the driver issues a call the trace does not contain next
+        '''
+        super(DFRobot_GNSSAndRTC_Replay, self).__init__()
+        self.i2c_uart_flag, self.__records = read_trace(path)
+        self.__pos = 0
+        self.__realtime = realtime
+        self.__strict = strict
+        self.__t0 = None
+        self.mismatches = 0
+
+    def begin(self):
+        '''!
+          @brief Start replaying, no bus traffic is generated
+          @return True
+        '''
+        self.__pos = 0
+        self.__t0 = None
+        return True
+
+    def remaining(self):
+        '''!
+          @brief Number of records not replayed yet
+        '''
+        return len(self.__records) - self.__pos
+
+    def _write_reg(self, reg, p_buf, size):
+        rec = self.__next(OP_WRITE, reg, size)
+        if rec is None:
+            return 1
+        if bytearray([b & 0xff for b in p_buf[:size]]) != rec.payload:
+            self.mismatches += 1
+        return rec.result
+
+    def _read_reg(self, reg, p_buf, size):
+        rec = self.__next(OP_READ, reg, size)
+        if rec is None:
+            self._last_read_len = 0
+            return 1
+        for i in range(min(size, rec.size)):
+            p_buf[i] = rec.payload[i]
+        self._last_read_len = min(size, rec.received)
+        return rec.result
+
+    def __next(self, op, reg, size):
+        if self.__pos >= len(self.__records):
+            if self.__strict:
+                raise ValueError("bus trace exhausted")
+            return None
+        rec = self.__records[self.__pos]
+        if (rec.op, rec.reg, rec.size) != (op, reg, size):
+            self.mismatches += 1
+            if self.__strict:
+                raise ValueError("bus trace diverged at record %d: expected %s 0x%02X/%d, got %s 0x%02X/%d" %
+                                 (self.__pos, chr(rec.op), rec.reg, rec.size, chr(op), reg, size))
+        self.__pos += 1
+        if self.__realtime:
+            if self.__t0 is None:
+                self.__t0 = time.time() - rec.start_us / 1e6
+            delay = self.__t0 + (rec.start_us + rec.duration_us) / 1e6 - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        return rec
@@ -0,0 +1,170 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_FixDelta.py
+    @brief Differential encoding of a stream of fixes returned by get_fix()
+    @details Every field is quantized to a fixed resolution. A delta frame only carries the
+    @n fields that moved by at least their threshold since the value the receiver last got,
+    @n as zigzag varint deltas. A keyframe carries every field as an absolute value and is
+    @n sent every keyframe_interval frames so a receiver can resync after a loss.
+    @n
+    @n Frame: [flags|seq][field mask, 2 bytes LE][varint per field in mask order]
+    @n flags bit 7 marks a keyframe, bits 0~6 are a sequence number used to detect gaps.
+    @n
+    @n examples/fixDeltaRatio.py prints the compression ratio over a recorded track.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+METERS_PER_DEGREE = 111320.0
+
+# (field, resolution) in frame order, at most 16 fields
+FIELDS = [
+    ('year', 1),
+    ('month', 1),
+    ('date', 1),
+    ('hour', 1),
+    ('minute', 1),
+    ('second', 1),
+    ('lat', 1e-7),
+    ('lon', 1e-7),
+    ('sats', 1),
+    ('alt', 0.01),
+    ('sog', 0.01),
+    ('cog', 0.01),
+    ('mode', 1),
+]
+
+KEYFRAME_FLAG = 0x80
+SEQ_MASK = 0x7f
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def _put_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(buf, pos):
+    shift = 0
+    n = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7f) << shift
+        if not b & 0x80:
+            return n, pos
+        shift += 7
+
+
+class DFRobot_FixDeltaEncoder(object):
+    '''!
+      @brief Turns successive fixes into keyframes and delta frames
+    '''
+
+    def __init__(self, keyframe_interval=60, position_cm=50.0, thresholds=None):
+        '''!
+          @brief Constructor
+          @param keyframe_interval Send a keyframe every this many frames
+          @param position_cm Ignore lat/lon movement below this many centimeters
+          @param thresholds dict of field to the smallest change worth sending, in field units,
+          @n     e.g. {'alt': 1.0, 'sog': 0.2}; unlisted fields are sent on any quantized change
+        '''
+        self.keyframe_interval = keyframe_interval
+        deg = position_cm / 100.0 / METERS_PER_DEGREE
+        self.__threshold = {'lat': deg, 'lon': deg}
+        if thresholds:
+            self.__threshold.update(thresholds)
+        self.__sent = None
+        self.__seq = 0
+        self.__since_key = 0
+
+    def force_keyframe(self):
+        '''!
+          @brief Make the next frame a keyframe, e.g. when a new receiver connects
+        '''
+        self.__sent = None
+
+    def encode(self, fix):
+        '''!
+          @brief Encode one fix
+          @param fix dict as returned by get_fix(), missing fields count as 0
+          @return bytearray frame
+        '''
+        q = [int(round(fix.get(name, 0) / res)) for name, res in FIELDS]
+        key = self.__sent is None or self.__since_key >= self.keyframe_interval
+        mask = 0
+        body = bytearray()
+        for i, (name, res) in enumerate(FIELDS):
+            if key:
+                value = q[i]
+            else:
+                value = q[i] - self.__sent[i]
+                if value == 0 or abs(value) * res < self.__threshold.get(name, 0):
+                    continue
+            mask |= 1 << i
+            _put_varint(body, _zigzag(value))
+        if key:
+            self.__sent = q
+            self.__since_key = 0
+        else:
+            for i in range(len(FIELDS)):
+                if mask & (1 << i):
+                    self.__sent[i] = q[i]
+        self.__since_key += 1
+        frame = bytearray([(KEYFRAME_FLAG if key else 0) | self.__seq, mask & 0xff, mask >> 8])
+        self.__seq = (self.__seq + 1) & SEQ_MASK
+        return frame + body
+
+
+class DFRobot_FixDeltaDecoder(object):
+    '''!
+      @brief Rebuilds fixes from frames produced by DFRobot_FixDeltaEncoder
+    '''
+
+    def __init__(self):
+        self.__state = None
+        self.__seq = None
+        self.dropped = 0
+
+    def decode(self, frame):
+        '''!
+          @brief Decode one frame
+          @param frame bytes or bytearray
+          @return dict with every field, None while waiting for a keyframe after a gap
+        '''
+        frame = bytearray(frame)
+        key = bool(frame[0] & KEYFRAME_FLAG)
+        seq = frame[0] & SEQ_MASK
+        if not key and self.__seq is not None and seq != (self.__seq + 1) & SEQ_MASK:
+            self.__state = None
+        self.__seq = seq
+        if key:
+            self.__state = [0] * len(FIELDS)
+        elif self.__state is None:
+            self.dropped += 1
+            return None
+        mask = frame[1] | (frame[2] << 8)
+        pos = 3
+        for i in range(len(FIELDS)):
+            if mask & (1 << i):
+                n, pos = _get_varint(frame, pos)
+                if key:
+                    self.__state[i] = _unzigzag(n)
+                else:
+                    self.__state[i] += _unzigzag(n)
+        fix = {}
+        for i, (name, res) in enumerate(FIELDS):
+            fix[name] = self.__state[i] if res == 1 else self.__state[i] * res
+        return fix
@@ -0,0 +1,252 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_FixShm.py
+    @brief Publish the fix and RTC time to other local processes through shared memory
+    @details One process owns the board and runs DFRobot_FixPublisher. It writes every snapshot
+    @n into a multiprocessing.shared_memory segment, so any number of DFRobot_FixReader
+    @n processes share one set of bus reads. Readers never take a lock and never block the
+    @n publisher: the segment is guarded by a sequence counter (seqlock). The publisher makes the
+    @n counter odd, writes the payload and makes it even again. A reader copies the payload
+    @n into its own preallocated buffer and retries if the counter was odd or changed meanwhile.
+    @n
+    @n Segment layout, little endian:
+    @n   magic b'DFSH' (4) | version (2) | payload size (2) | sequence (4) | writer pid (4) | payload
+    @n A publisher only replaces an existing segment of the same name when its writer process is
+    @n gone, so a second publisher cannot take over the segment of a running one.
+    @n Payload: see PAYLOAD, the valid byte tells whether the fix (VALID_FIX) and the RTC time
+    @n (VALID_RTC) parts were read successfully.
+    @n
+    @n Requires Python 3.8 or later.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import os
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+SHM_NAME = 'dfrobot_gnssandrtc'
+SHM_MAGIC = b'DFSH'
+SHM_VERSION = 1
+
+VALID_FIX = 0x01
+VALID_RTC = 0x02
+
+HEADER = struct.Struct('<4sHHII')
+SEQ_OFFSET = 8
+# published, count, valid, year, month, date, hour, minute, second, sats, lat, lon, alt, sog, cog,
+# rtc year, month, day, hour, minute, second
+PAYLOAD = struct.Struct('<dIBHBBBBBBdddffH5B')
+FIELDS = ('published', 'count', 'valid', 'year', 'month', 'date', 'hour', 'minute', 'second', 'sats',
+          'lat', 'lon', 'alt', 'sog', 'cog',
+          'rtc_year', 'rtc_month', 'rtc_day', 'rtc_hour', 'rtc_minute', 'rtc_second')
+
+_FIX_KEYS = ('year', 'month', 'date', 'hour', 'minute', 'second', 'sats', 'lat', 'lon', 'alt', 'sog', 'cog')
+
+
+def _attach(name):
+    '''!
+      @brief Open an existing segment without handing it to the resource tracker
+    '''
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 an attaching process registers the segment with the resource tracker,
+    # which then unlinks it when the process exits
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _writer_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        pass
+    return True
+
+
+def _stale(name):
+    '''!
+      @brief Check whether an existing segment was left behind by a publisher that is gone
+      @return bool, False if it belongs to a running publisher or is not a fix segment of this version
+    '''
+    shm = _attach(name)
+    try:
+        if shm.size < HEADER.size:
+            return False
+        magic, version, size, _, pid = HEADER.unpack_from(shm.buf, 0)
+    finally:
+        shm.close()
+    if magic != SHM_MAGIC or version != SHM_VERSION or size != PAYLOAD.size or pid <= 0:
+        return False
+    return not _writer_alive(pid)
+
+
+class DFRobot_FixPublisher(object):
+    '''!
+      @brief Writes fix snapshots into the shared segment
+    '''
+
+    def __init__(self, board, name=SHM_NAME, rtc=True):
+        '''!
+          @brief Constructor, creates the segment (replacing a stale one left by a crashed publisher)
+          @exception FileExistsError The segment exists and is not stale: its writer is still running, or
+          @n         it is not a fix segment of this version
+          @param board DFRobot_GNSSAndRTC instance, after begin()
+          @param name Segment name the readers attach to
+          @param rtc Also read and publish the RTC time
+        '''
+        self.__board = board
+        self.__rtc = rtc
+        size = HEADER.size + PAYLOAD.size
+        try:
+            self.__shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            if not _stale(name):
+                raise FileExistsError("Shared memory %s is in use, or not a fix segment of this version" %
+                                      name)
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.__shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = name
+        HEADER.pack_into(self.__shm.buf, 0, SHM_MAGIC, SHM_VERSION, PAYLOAD.size, 0, os.getpid())
+        self.__seq = self.__shm.buf[SEQ_OFFSET:SEQ_OFFSET + 4].cast('I')
+        self.count = 0
+
+    def publish(self, fix=None, rtc=None):
+        '''!
+          @brief Write one snapshot
+          @param fix dict in the format of get_fix(), None if not available
+          @param rtc Object with year, month, day, hour, minute and second, e.g. a datetime or
+          @n     get_rtc_time() result, None if not available
+        '''
+        valid = 0
+        values = [0] * 12
+        if fix is not None:
+            valid |= VALID_FIX
+            values = [fix[k] for k in _FIX_KEYS]
+        rtc_values = (0, 0, 0, 0, 0, 0)
+        if rtc is not None:
+            valid |= VALID_RTC
+            rtc_values = (rtc.year, rtc.month, rtc.day, rtc.hour, rtc.minute, rtc.second)
+        self.count += 1
+        seq = self.__seq[0]
+        self.__seq[0] = (seq + 1) & 0xffffffff
+        PAYLOAD.pack_into(self.__shm.buf, HEADER.size, time.time(), self.count, valid,
+                          values[0], values[1], values[2], values[3], values[4], values[5], values[6],
+                          values[7], values[8], values[9], values[10], values[11], *rtc_values)
+        self.__seq[0] = (seq + 2) & 0xffffffff
+
+    def poll(self):
+        '''!
+          @brief Read the board once and publish the result
+          @return int type, the valid flags published
+        '''
+        fix = self.__board.get_fix()
+        # get_rtc_epoch() reports a failed read as None, get_rtc_time() would return zeros
+        rtc = self.__board.get_rtc_epoch(as_datetime=True) if self.__rtc else None
+        self.publish(fix, rtc)
+        return (VALID_FIX if fix is not None else 0) | (VALID_RTC if rtc is not None else 0)
+
+    def run(self, interval=1.0):
+        '''!
+          @brief Call poll() every interval seconds until interrupted
+          @param interval Seconds between snapshots
+        '''
+        while True:
+            start = time.time()
+            self.poll()
+            time.sleep(max(0.0, interval - (time.time() - start)))
+
+    def close(self, unlink=True):
+        '''!
+          @brief Release the segment
+          @param unlink Remove the segment, readers still attached keep their mapping
+        '''
+        self.__seq.release()
+        self.__shm.close()
+        if unlink:
+            self.__shm.unlink()
+
+
+class DFRobot_FixReader(object):
+    '''!
+      @brief Lock-free reader of the shared segment
+    '''
+
+    def __init__(self, name=SHM_NAME):
+        '''!
+          @brief Constructor, attaches to the segment of a running publisher
+          @param name Segment name
+        '''
+        self.__shm = _attach(name)
+        magic, version, size, _, _ = HEADER.unpack_from(self.__shm.buf, 0)
+        if magic != SHM_MAGIC or version != SHM_VERSION or size != PAYLOAD.size:
+            self.__shm.close()
+            raise ValueError("%s is not a fix segment of this version" % name)
+        self.__seq = self.__shm.buf[SEQ_OFFSET:SEQ_OFFSET + 4].cast('I')
+        self.__payload = self.__shm.buf[HEADER.size:HEADER.size + PAYLOAD.size]
+        self.__buf = bytearray(PAYLOAD.size)
+        self.retries = 0
+
+    def sequence(self):
+        '''!
+          @brief Current sequence number, changes whenever a new snapshot is published
+        '''
+        return self.__seq[0]
+
+    def read_into(self, buf, timeout=0.1):
+        '''!
+          @brief Copy a consistent payload into buf without allocating
+          @param buf bytearray of PAYLOAD.size bytes
+          @param timeout Give up after this many seconds of a publisher stuck mid-write
+          @return int type, the sequence number of the copy, -1 on timeout
+        '''
+        seq = self.__seq
+        payload = self.__payload
+        deadline = None
+        while True:
+            before = seq[0]
+            if not before & 1:
+                buf[:] = payload
+                if seq[0] == before:
+                    return before
+            self.retries += 1
+            if deadline is None:
+                deadline = time.time() + timeout
+            elif time.time() > deadline:
+                return -1
+
+    def read(self, timeout=0.1):
+        '''!
+          @brief Get the latest snapshot
+          @param timeout Give up after this many seconds of a publisher stuck mid-write
+          @return dict with the FIELDS keys plus seq, None on timeout or before the first snapshot
+        '''
+        seq = self.read_into(self.__buf, timeout)
+        if seq <= 0:
+            return None
+        result = dict(zip(FIELDS, PAYLOAD.unpack_from(self.__buf)))
+        result['seq'] = seq
+        return result
+
+    def close(self):
+        '''!
+          @brief Detach from the segment
+        '''
+        self.__seq.release()
+        self.__payload.release()
+        self.__shm.close()
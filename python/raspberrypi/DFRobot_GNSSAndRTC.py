@@ -18,7 +18,9 @@ import serial
 import smbus
 import struct
 import six
+import json
 import logging
+import threading
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), './')))
 from src.L76K import DFRobot_GNSS
 from src.SD3031 import DFRobot_SD3031
@@ -54,6 +56,45 @@ class DFRobot_GNSSAndRTC(DFRobot_GNSS, DFRobot_SD3031):
     ECALIB_COMPLETE = 0x01
     EUNDER_CALIB = 0x02
 
+    # Register cache TTLs in seconds, keyed by the first register of a read; None never expires.
+    # CTR1 is left out on purpose: reading it clears the alarm flags (see clear_alarm).
+    REG_CACHE_TTL = {
+        REG_CS32_PID: None,
+        REG_CS32_VID: None,
+        REG_CS32_VERSION: None,
+        DFRobot_GNSS.REG_GNSS_MODE: 60.0,
+        DFRobot_SD3031.SD3031_REG_CTR2: 60.0,
+        DFRobot_SD3031.SD3031_REG_CTR3: 60.0,
+        DFRobot_SD3031.SD3031_REG_BAT_VAL: 30.0,
+    }
+
+    # Circuit breaker: after BUS_FAIL_THRESHOLD consecutive failures the transport fails fast,
+    # probing the device again after BUS_PROBE_BACKOFF seconds, doubling up to BUS_PROBE_BACKOFF_MAX.
+    BUS_FAIL_THRESHOLD = 3
+    BUS_PROBE_BACKOFF = 1.0
+    BUS_PROBE_BACKOFF_MAX = 60.0
+    BUS_LOG_INTERVAL = 10.0  # < The same bus error is logged at most once per interval, s
+
+    def __init__(self):
+        # Held by every register transfer; hold it as well around sequences of calls that
+        # must not interleave with another thread using the same board
+        self.bus_lock = threading.RLock()
+        self.__bus_threshold = self.BUS_FAIL_THRESHOLD
+        self.__bus_failures = 0
+        self.__bus_open = False
+        self.__bus_probing = False
+        self.__bus_backoff = self.BUS_PROBE_BACKOFF
+        self.__bus_next_probe = 0.0
+        self.__bus_log = {}
+        self.bus_errors = 0
+        self.bus_fast_fails = 0
+        self.__reg_cache = {}
+        self.__reg_cache_ttl = dict(self.REG_CACHE_TTL)
+        self.__reg_cache_enabled = True
+        self.__reg_cache_bypass = 0
+        self.reg_cache_hits = 0
+        self.reg_cache_misses = 0
+
     def begin(self):
         '''!
           @brief subclass initialization function
@@ -103,12 +144,260 @@ class DFRobot_GNSSAndRTC(DFRobot_GNSS, DFRobot_SD3031):
             self._write_reg(self.REG_CALIB_STATUS_REG, status, 1)
         return status[0] & 0xff
 
+    def get_pid(self):
+        '''!
+          @brief Get the product ID of the module
+          @return uint16_t type, 0x444F for DFR1103
+        '''
+        data = [0x00] * 2
+        self._read_reg(self.REG_CS32_PID, data, 2)
+        return data[0] | (data[1] << 8)
+
+    def get_vid(self):
+        '''!
+          @brief Get the vendor ID of the module
+          @return uint16_t type, 0x3343 for DFRobot
+        '''
+        data = [0x00] * 2
+        self._read_reg(self.REG_CS32_VID, data, 2)
+        return data[0] | (data[1] << 8)
+
+    def get_version(self):
+        '''!
+          @brief Get the firmware version of the module
+          @return uint16_t type, e.g. 0x0100 for V1.0
+        '''
+        data = [0x00] * 2
+        self._read_reg(self.REG_CS32_VERSION, data, 2)
+        return data[0] | (data[1] << 8)
+
+    def enable_reg_cache(self, enable=True):
+        '''!
+          @brief Enable or disable the register cache
+          @param enable True to serve rarely-changing registers from the cache
+          @note The cache is enabled by default, disabling it also drops all cached values
+        '''
+        self.__reg_cache_enabled = enable
+        if not enable:
+            self.__reg_cache.clear()
+
+    def set_reg_cache_ttl(self, reg, ttl):
+        '''!
+          @brief Set how long reads starting at a register are cached
+          @param reg First register of the read
+          @param ttl Seconds, None for values that never change, 0 to stop caching the register
+        '''
+        if ttl == 0:
+            self.__reg_cache_ttl.pop(reg, None)
+            self.invalidate_reg_cache(reg)
+        else:
+            self.__reg_cache_ttl[reg] = ttl
+
+    def invalidate_reg_cache(self, reg=None, size=1):
+        '''!
+          @brief Drop cached register values
+          @param reg First register to drop, None drops everything
+          @param size Number of registers from reg
+        '''
+        if reg is None:
+            self.__reg_cache.clear()
+            return
+        for key in list(self.__reg_cache):
+            if key[0] < reg + size and reg < key[0] + key[1]:
+                del self.__reg_cache[key]
+
+    def bypass_reg_cache(self):
+        '''!
+          @brief Context manager that makes the reads inside it go to the bus
+          @n     with rtc.bypass_reg_cache():
+          @n         voltage = rtc.get_voltage()
+          @n The fresh values still refresh the cache.
+        '''
+        return _RegCacheBypass(self)
+
+    def reg_cache_stats(self):
+        '''!
+          @brief Get register cache counters
+          @return dict with hits, misses and the number of cached entries
+        '''
+        return {
+            'hits': self.reg_cache_hits,
+            'misses': self.reg_cache_misses,
+            'entries': len(self.__reg_cache),
+        }
+
+    def _reg_cache_get(self, reg, p_buf, size):
+        '''!
+          @brief Serve a read from the cache, called by the transport before touching the bus
+          @return bool, True if p_buf was filled from the cache
+        '''
+        if not self.__reg_cache_enabled or reg not in self.__reg_cache_ttl:
+            return False
+        entry = self.__reg_cache.get((reg, size))
+        if self.__reg_cache_bypass or entry is None or (entry[1] is not None and _now() >= entry[1]):
+            self.reg_cache_misses += 1
+            return False
+        p_buf[:size] = entry[0]
+        self.reg_cache_hits += 1
+        return True
+
+    def _reg_cache_put(self, reg, p_buf, size):
+        '''!
+          @brief Store a successful bus read, called by the transport
+        '''
+        if not self.__reg_cache_enabled or reg not in self.__reg_cache_ttl:
+            return
+        ttl = self.__reg_cache_ttl[reg]
+        self.__reg_cache[(reg, size)] = (list(p_buf[:size]), None if ttl is None else _now() + ttl)
+
+    def _reg_cache_enter_bypass(self, delta):
+        self.__reg_cache_bypass += delta
+
+    def set_circuit_breaker(self, threshold=BUS_FAIL_THRESHOLD, backoff=BUS_PROBE_BACKOFF,
+                            max_backoff=BUS_PROBE_BACKOFF_MAX):
+        '''!
+          @brief Configure the bus circuit breaker
+          @param threshold Consecutive failures that open the breaker, 0 disables it
+          @param backoff First wait before probing the device again, s
+          @param max_backoff Longest wait between probes, s
+        '''
+        self.__bus_threshold = threshold
+        self.BUS_PROBE_BACKOFF = backoff
+        self.BUS_PROBE_BACKOFF_MAX = max_backoff
+        if not threshold and self.__bus_open:
+            self.__close_breaker()
+
+    def breaker_state(self):
+        '''!
+          @brief Get the circuit breaker state
+          @return dict with threshold, open, consecutive failures, total errors, fast fails and seconds until the next probe
+        '''
+        return {
+            'threshold': self.__bus_threshold,
+            'open': self.__bus_open,
+            'failures': self.__bus_failures,
+            'errors': self.bus_errors,
+            'fast_fails': self.bus_fast_fails,
+            'next_probe': max(0.0, self.__bus_next_probe - _now()) if self.__bus_open else 0.0,
+        }
+
+    def _probe(self):
+        '''!
+          @brief Check that the device answers, used to close the breaker again
+          @return bool
+        '''
+        with self.bypass_reg_cache():
+            return self.get_pid() == self.MODULE_DFR1103_PID
+
+    def _bus_allowed(self):
+        '''!
+          @brief Called by the transport before a bus transfer
+          @return bool, False while the breaker is open and no probe is due
+        '''
+        if not self.__bus_open or self.__bus_probing:
+            return True
+        now = _now()
+        if now >= self.__bus_next_probe:
+            self.__bus_probing = True
+            try:
+                ok = self._probe()
+            finally:
+                self.__bus_probing = False
+            if ok:
+                self.__close_breaker()
+                return True
+            self.__bus_backoff = min(self.__bus_backoff * 2, self.BUS_PROBE_BACKOFF_MAX)
+            self.__bus_next_probe = now + self.__bus_backoff
+        self.bus_fast_fails += 1
+        return False
+
+    def _bus_ok(self):
+        '''!
+          @brief Called by the transport after a successful transfer
+        '''
+        self.__bus_failures = 0
+
+    def _bus_failed(self, msg):
+        '''!
+          @brief Called by the transport after a failed transfer
+          @param msg Log message, repeats are aggregated
+        '''
+        self.bus_errors += 1
+        self.__bus_failures += 1
+        self._log_bus_error(msg)
+        if self.__bus_probing or self.__bus_open or not self.__bus_threshold:
+            return
+        if self.__bus_failures >= self.__bus_threshold:
+            self.__bus_open = True
+            self.__bus_backoff = self.BUS_PROBE_BACKOFF
+            self.__bus_next_probe = _now() + self.__bus_backoff
+            logger.warning("Bus circuit breaker open after %d consecutive failures, failing fast",
+                           self.__bus_failures)
+
+    def _log_bus_error(self, msg):
+        '''!
+          @brief Log a bus error at most once per BUS_LOG_INTERVAL, counting the suppressed repeats
+        '''
+        now = _now()
+        entry = self.__bus_log.get(msg)
+        if entry is not None and now - entry[0] < self.BUS_LOG_INTERVAL:
+            entry[1] += 1
+            return
+        if entry is not None and entry[1]:
+            logger.warning("%s (repeated %d times)", msg, entry[1])
+        else:
+            logger.warning(msg)
+        self.__bus_log[msg] = [now, 0]
+
+    def __close_breaker(self):
+        self.__bus_open = False
+        self.__bus_failures = 0
+        self.__bus_backoff = self.BUS_PROBE_BACKOFF
+        logger.info("Bus circuit breaker closed, device is answering again")
+
+
+def _now():
+    return getattr(time, 'monotonic', time.time)()
+
+
+class _RegCacheBypass(object):
+    def __init__(self, board):
+        self.__board = board
+
+    def __enter__(self):
+        self.__board._reg_cache_enter_bypass(1)
+        return self.__board
+
+    def __exit__(self, *args):
+        self.__board._reg_cache_enter_bypass(-1)
+        return False
+
 
 class DFRobot_GNSSAndRTC_I2C(DFRobot_GNSSAndRTC):
-    def __init__(self, i2c_bus=1, addr=DFRobot_GNSSAndRTC.MODULE_I2C_ADDRESS):
+    SRAM_BLOCK_LEN = DFRobot_GNSSAndRTC.I2C_MAX_READ_LEN
+
+    BACKEND_SMBUS = 'smbus'
+    BACKEND_IOCTL = 'ioctl'
+
+    def __init__(self, i2c_bus=1, addr=DFRobot_GNSSAndRTC.MODULE_I2C_ADDRESS, backend=BACKEND_SMBUS):
+        '''!
+          @brief Constructor
+          @param i2c_bus I2C bus number
+          @param addr I2C address of the module
+          @param backend BACKEND_SMBUS goes through the smbus module,
+          @n     BACKEND_IOCTL issues preallocated I2C_RDWR ioctls on /dev/i2c-<i2c_bus> (see DFRobot_I2CDev)
+        '''
         super(DFRobot_GNSSAndRTC_I2C, self).__init__()
         self.i2c_uart_flag = DFRobot_GNSSAndRTC.GNSS_I2C_FLAG
-        self.__i2c_bus = smbus.SMBus(i2c_bus)
+        self.__i2c_bus = None
+        self.__i2c_dev = None
+        if backend == self.BACKEND_IOCTL:
+            from DFRobot_I2CDev import DFRobot_I2CDev
+            self.__i2c_dev = DFRobot_I2CDev(i2c_bus)
+        elif backend == self.BACKEND_SMBUS:
+            self.__i2c_bus = smbus.SMBus(i2c_bus)
+        else:
+            raise ValueError("backend must be 'smbus' or 'ioctl'")
         self.__device_addr = addr
 
     def begin(self):
@@ -117,46 +406,72 @@ class DFRobot_GNSSAndRTC_I2C(DFRobot_GNSSAndRTC):
         return super(DFRobot_GNSSAndRTC_I2C, self).begin()
 
     def _write_reg(self, reg, p_buf, size):
-        if not p_buf:
-            logger.warning("p_buf ERROR!")
-            return 1
-        buf = p_buf[:size]
-        try:
-            self.__i2c_bus.write_i2c_block_data(self.__device_addr, reg, buf)
-            # !!!
-            time.sleep(0.05)
-            return 0
-        except KeyboardInterrupt:
-            raise
-        except:
-            logger.warning("Write: I2C communication failed, please check the peripherals.!")
-            time.sleep(0.05)
-            return 1
+        with self.bus_lock:
+            if not p_buf:
+                logger.warning("p_buf ERROR!")
+                return 1
+            self.invalidate_reg_cache(reg, size)
+            if not self._bus_allowed():
+                return 1
+            buf = p_buf[:size]
+            try:
+                if self.__i2c_dev is not None:
+                    self.__i2c_dev.write_reg(self.__device_addr, reg, buf, size)
+                else:
+                    self.__i2c_bus.write_i2c_block_data(self.__device_addr, reg, buf)
+                # !!!
+                time.sleep(0.05)
+                self._bus_ok()
+                return 0
+            except KeyboardInterrupt:
+                raise
+            except:
+                self._bus_failed("Write: I2C communication failed, please check the peripherals.!")
+                time.sleep(0.05)
+                return 1
 
     def _read_reg(self, reg, p_buf, size):
-        if not p_buf:
-            logger.warning("p_buf ERROR!")
-            return 1
-        if (reg >= 0x30) and (reg <= 0x79) and (size != 0):
-            if self._write_reg(self.REG_RTC_READ_REG, [reg, size], 2) == 1:
+        with self.bus_lock:
+            if not p_buf:
+                logger.warning("p_buf ERROR!")
+                return 1
+            if self._reg_cache_get(reg, p_buf, size):
+                return 0
+            if not self._bus_allowed():
+                return 1
+            if (reg >= 0x30) and (reg <= 0x79) and (size != 0):
+                if self._write_reg(self.REG_RTC_READ_REG, [reg, size], 2) == 1:
+                    return 1
+                time.sleep(0.05)
+            try:
+                if self.__i2c_dev is not None:
+                    # Register pointer write and block read in one combined transfer
+                    self.__i2c_dev.read_reg(self.__device_addr, reg, p_buf, size)
+                    self._last_read_len = size
+                    self._bus_ok()
+                    self._reg_cache_put(reg, p_buf, size)
+                    return 0
+                #buf = self.__i2c_bus.read_i2c_block_data(self.__device_addr, reg, size)
+                self._last_read_len = 0
+                for i in range(size):
+                    #p_buf[i] = buf[i]
+                    if reg == self.REG_ALL_DATA:
+                        p_buf[i] = self.__i2c_bus.read_byte_data(self.__device_addr, reg)
+                    else:
+                        p_buf[i] = self.__i2c_bus.read_byte_data(self.__device_addr, reg + i)
+                    self._last_read_len = i + 1
+                self._bus_ok()
+                self._reg_cache_put(reg, p_buf, size)
+                return 0
+            except KeyboardInterrupt:
+                raise
+            except:
+                self._bus_failed("Read: I2C communication failed, please check the peripherals.!")
                 return 1
-            time.sleep(0.05)
-        try:
-            #buf = self.__i2c_bus.read_i2c_block_data(self.__device_addr, reg, size)
-            for i in range(size):
-                #p_buf[i] = buf[i]
-                if reg == self.REG_ALL_DATA:
-                    p_buf[i] = self.__i2c_bus.read_byte_data(self.__device_addr, reg)
-                else:
-                    p_buf[i] = self.__i2c_bus.read_byte_data(self.__device_addr, reg + i)
-            return 0
-        except KeyboardInterrupt:
-            raise
-        except:
-            logging.warning("Read: I2C communication failed, please check the peripherals.!")
-            return 1
 
     def scan(self):
+        if self.__i2c_dev is not None:
+            return self.__i2c_dev.probe(self.__device_addr)
         try:
             self.__i2c_bus.read_byte(self.__device_addr)
             return True
@@ -165,6 +480,9 @@ class DFRobot_GNSSAndRTC_I2C(DFRobot_GNSSAndRTC):
         except:
             return False
 
+    def _probe(self):
+        return self.scan()
+
 
 class DFRobot_GNSSAndRTC_UART(DFRobot_GNSSAndRTC):
     UART_BAUDRATE = 57600
@@ -173,6 +491,11 @@ class DFRobot_GNSSAndRTC_UART(DFRobot_GNSSAndRTC):
 
     UART_SERIAL_NAME = "/dev/serial0"
 
+    UART_PROBE_BAUDRATES = (921600, 460800, 230400, 115200, 57600)
+    UART_BAUD_CACHE = os.path.join(os.path.expanduser("~"), ".dfrobot_gnssandrtc_baud.json")
+
+    SRAM_BLOCK_LEN = DFRobot_GNSSAndRTC.UART_MAX_READ_LEN
+
     __baud = UART_BAUDRATE
     __rxpin = 0x00
     __txpin = 0x00
@@ -186,17 +509,93 @@ class DFRobot_GNSSAndRTC_UART(DFRobot_GNSSAndRTC):
         self.__serial_name = serial_name
         self.__baud = baud
 
-    def begin(self):
-        self.__serial = serial.Serial(self.__serial_name, self.__baud)
-        self.__serial.flush()
-        if not self.__serial.isOpen():
+    def begin(self, probe_bauds=None, baud_cache=UART_BAUD_CACHE):
+        '''!
+          @brief Open the serial port and check the module
+          @param probe_bauds None to use the baud rate given to the constructor, or a list of candidate
+          @n     rates (e.g. UART_PROBE_BAUDRATES). The last rate that worked is tried first, then the
+          @n     candidates from fastest to slowest, then UART_BAUDRATE; the first rate at which PID and
+          @n     VID verify is kept.
+          @param baud_cache File remembering the verified rate per port, None to disable
+          @return bool type, means returning initialization status
+        '''
+        if probe_bauds:
+            return self.__begin_probe(probe_bauds, baud_cache)
+        if not self.__open(self.__baud):
             return False
-        data = [0x00] * 2
-        self._read_reg(self.REG_CS32_PID, data, 2)
-        if self.MODULE_DFR1103_PID != (data[0] | (data[1] << 8)):
+        with self.bypass_reg_cache():
+            pid = self.get_pid()
+        if self.MODULE_DFR1103_PID != pid:
             return False
         return super(DFRobot_GNSSAndRTC_UART, self).begin()
-    
+
+    def get_baud(self):
+        '''!
+          @brief Get the baud rate in use
+          @return int
+        '''
+        return self.__baud
+
+    def __open(self, baud):
+        if self.__serial is not None and self.__serial.isOpen():
+            self.__serial.close()
+        self.__baud = baud
+        self.__serial = serial.Serial(self.__serial_name, baud)
+        self.__serial.flush()
+        self.__serial.reset_input_buffer()
+        return self.__serial.isOpen()
+
+    def __verify(self):
+        with self.bypass_reg_cache():
+            return self.get_pid() == self.MODULE_DFR1103_PID and self.get_vid() == self.MODULE_DFR1103_VID
+
+    def __begin_probe(self, probe_bauds, baud_cache):
+        cache = {}
+        if baud_cache:
+            try:
+                with open(baud_cache) as f:
+                    cache = json.load(f)
+            except (IOError, OSError, ValueError):
+                cache = {}
+        candidates = []
+        for baud in [cache.get(self.__serial_name)] + sorted(probe_bauds, reverse=True) + [self.UART_BAUDRATE]:
+            if baud and baud not in candidates:
+                candidates.append(baud)
+        # Mismatched rates are expected to fail here, they must not open the circuit breaker
+        state = self.breaker_state()
+        self.set_circuit_breaker(0)
+        try:
+            for baud in candidates:
+                try:
+                    if self.__open(baud) and self.__verify():
+                        break
+                except (IOError, OSError, ValueError, serial.SerialException):
+                    pass
+            else:
+                return False
+        finally:
+            self.set_circuit_breaker(state['threshold'], self.BUS_PROBE_BACKOFF, self.BUS_PROBE_BACKOFF_MAX)
+        if baud_cache and cache.get(self.__serial_name) != baud:
+            cache[self.__serial_name] = baud
+            try:
+                with open(baud_cache, 'w') as f:
+                    json.dump(cache, f)
+            except (IOError, OSError):
+                logger.warning("Could not write the baud rate cache %s", baud_cache)
+        return super(DFRobot_GNSSAndRTC_UART, self).begin()
+
+    def pipeline(self, window=4, **kwargs):
+        '''!
+          @brief Create a pipelined reader on this port
+          @param window Most read frames in flight at once
+          @param kwargs timeout, retries, settle, quiet, see DFRobot_UARTPipeline
+          @return DFRobot_UARTPipeline
+          @note Each burst holds bus_lock and goes through the circuit breaker, so the regular register
+          @n    functions and background users of this board may run while requests are queued.
+        '''
+        from DFRobot_UARTPipeline import DFRobot_UARTPipeline
+        return DFRobot_UARTPipeline(self.__serial, window=window, board=self, **kwargs)
+
     def int_to_bytes(self, n, length, byteorder='big'):
         if byteorder == 'big':
             return struct.pack('>I', n)[-length:]
@@ -206,62 +605,80 @@ class DFRobot_GNSSAndRTC_UART(DFRobot_GNSSAndRTC):
             raise ValueError("byteorder 必须是 'big' 或 'little'")
 
     def _write_reg(self, reg, p_buf, size):
-        if not p_buf:
-            return 1
-        '''
-        self.__serial.write(self.UART0_WRITE_REGBUF.to_bytes(1, byteorder='big'))
-        self.__serial.write(reg.to_bytes(1, byteorder='big'))
-        self.__serial.write(size.to_bytes(1, byteorder='big'))
-        for i in range(0, size):
-            self.__serial.write(p_buf[i].to_bytes(1, byteorder='big'))
-        '''
-        try:
-            self.__serial.write(self.int_to_bytes(self.UART0_WRITE_REGBUF, 1))
-            self.__serial.write(self.int_to_bytes(reg, 1))
-            self.__serial.write(self.int_to_bytes(size, 1))
-            for i in range(0, size):
-                self.__serial.write(self.int_to_bytes(p_buf[i], 1))
-            time.sleep(0.05)
-            return 0
-        except KeyboardInterrupt:
-            raise
-        except:
-            logger.warning("Write: UART communication failed, please check the peripherals!")
-            return 1
-
-    def _read_reg(self, reg, p_buf, size):
-        if not p_buf:
-            return 1
-        try:
-            if (reg >= 0x30) and (reg <= 0x79) and (size != 0):
-                data = [reg, size]
-                self._write_reg(self.REG_RTC_READ_REG, data, 2)
-                time.sleep(0.05)
+        with self.bus_lock:
+            if not p_buf:
+                return 1
+            self.invalidate_reg_cache(reg, size)
+            if not self._bus_allowed():
+                return 1
             '''
-            self.__serial.write(self.UART0_READ_REGBUF.to_bytes(1, byteorder='big'))
+            self.__serial.write(self.UART0_WRITE_REGBUF.to_bytes(1, byteorder='big'))
             self.__serial.write(reg.to_bytes(1, byteorder='big'))
             self.__serial.write(size.to_bytes(1, byteorder='big'))
+            for i in range(0, size):
+                self.__serial.write(p_buf[i].to_bytes(1, byteorder='big'))
             '''
-            self.__serial.write(self.int_to_bytes(self.UART0_READ_REGBUF, 1))
-            self.__serial.write(self.int_to_bytes(reg, 1))
-            self.__serial.write(self.int_to_bytes(size, 1))
-            nowtime = time.time() * 1000
-            i = 0
-            while time.time() * 1000 - nowtime < self.TIME_OUT:
-                while self.__serial.in_waiting > 0:
-                    if six.PY3:
-                        p_buf[i] = self.__serial.read(1)[0]
-                    else:
-                        p_buf[i] = ord(self.__serial.read(1)[0])
-                    i += 1
+            try:
+                self.__serial.write(self.int_to_bytes(self.UART0_WRITE_REGBUF, 1))
+                self.__serial.write(self.int_to_bytes(reg, 1))
+                self.__serial.write(self.int_to_bytes(size, 1))
+                for i in range(0, size):
+                    self.__serial.write(self.int_to_bytes(p_buf[i], 1))
+                time.sleep(0.05)
+                self._bus_ok()
+                return 0
+            except KeyboardInterrupt:
+                raise
+            except:
+                self._bus_failed("Write: UART communication failed, please check the peripherals!")
+                return 1
+
+    def _read_reg(self, reg, p_buf, size):
+        with self.bus_lock:
+            if not p_buf:
+                return 1
+            if self._reg_cache_get(reg, p_buf, size):
+                return 0
+            if not self._bus_allowed():
+                return 1
+            try:
+                if (reg >= 0x30) and (reg <= 0x79) and (size != 0):
+                    data = [reg, size]
+                    self._write_reg(self.REG_RTC_READ_REG, data, 2)
+                    time.sleep(0.05)
+                '''
+                self.__serial.write(self.UART0_READ_REGBUF.to_bytes(1, byteorder='big'))
+                self.__serial.write(reg.to_bytes(1, byteorder='big'))
+                self.__serial.write(size.to_bytes(1, byteorder='big'))
+                '''
+                self.__serial.write(self.int_to_bytes(self.UART0_READ_REGBUF, 1))
+                self.__serial.write(self.int_to_bytes(reg, 1))
+                self.__serial.write(self.int_to_bytes(size, 1))
+                nowtime = time.time() * 1000
+                # Leave room for the transfer itself, 10 bit times per byte
+                timeout = self.TIME_OUT + size * 10000.0 / self.__baud
+                i = 0
+                while time.time() * 1000 - nowtime < timeout:
+                    while self.__serial.in_waiting > 0:
+                        if six.PY3:
+                            p_buf[i] = self.__serial.read(1)[0]
+                        else:
+                            p_buf[i] = ord(self.__serial.read(1)[0])
+                        i += 1
+                        if i == size:
+                            break
                     if i == size:
                         break
-                if i == size:
-                    break
-            return 0
-        except KeyboardInterrupt:
-            raise
-        except:
-            logger.warning("Read: UART communication failed, please check the peripherals!")
-            return 1
+                self._last_read_len = i
+                if i != size:
+                    self._bus_failed("Read: UART response timed out, please check the peripherals!")
+                    return 1
+                self._bus_ok()
+                self._reg_cache_put(reg, p_buf, size)
+                return 0
+            except KeyboardInterrupt:
+                raise
+            except:
+                self._bus_failed("Read: UART communication failed, please check the peripherals!")
+                return 1
 
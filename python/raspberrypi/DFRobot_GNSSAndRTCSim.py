@@ -0,0 +1,203 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GNSSAndRTCSim.py
+    @brief pty-backed simulator of the DFR1103 UART interface
+    @details The simulator opens a pseudo terminal and answers the 0xBB (read) / 0xCC (write)
+    @n register protocol on its master side, so DFRobot_GNSSAndRTC_UART can be pointed at
+    @n sim.port without any hardware. It only answers while the port is configured for the
+    @n simulated device baud rate, and paces its responses to that rate (10 bit times per byte),
+    @n so baud probing and throughput can be measured.
+    @n
+    @n examples/simBaudThroughput.py measures the throughput per baud rate against it.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import datetime
+import os
+import select
+import termios
+import threading
+import time
+import tty
+
+UART0_READ_REGBUF = 0xBB
+UART0_WRITE_REGBUF = 0xCC
+
+REG_START_GET = 29
+REG_DATA_LEN_H = 31
+REG_ALL_DATA = 33
+REG_GNSS_MODE = 34
+REG_RTC_READ_REG = 0x2E
+RTC_BASE = 0x30
+
+DEFAULT_NMEA = (
+    "$GNGGA,083000.000,3113.82400,N,12128.42200,E,1,09,1.2,12.3,M,0.0,M,,*41\r\n"
+    "$GNGLL,3113.82400,N,12128.42200,E,083000.000,A,A*4E\r\n"
+    "$GNGSA,A,3,02,05,12,13,15,18,20,25,29,,,,2.1,1.2,1.7,1*32\r\n"
+    "$GPGSV,3,1,10,02,35,307,31,05,62,050,38,12,28,203,27,13,41,090,33,0*68\r\n"
+    "$GPGSV,3,2,10,15,19,061,24,18,52,256,35,20,11,128,20,25,44,329,36,0*60\r\n"
+    "$GPGSV,3,3,10,29,71,168,40,31,05,028,,0*6F\r\n"
+    "$BDGSV,1,1,04,06,48,222,33,09,35,201,29,16,63,189,37,39,30,167,25,0*77\r\n"
+    "$GNRMC,083000.000,A,3113.82400,N,12128.42200,E,0.12,45.60,100724,,,A,V*37\r\n"
+    "$GNVTG,45.60,T,,M,0.12,N,0.22,K,A*17\r\n"
+    "$GNZDA,083000.000,10,07,2024,00,00*41\r\n"
+)
+
+
+def _bcd(val):
+    return val + 6 * (val // 10)
+
+
+class DFRobot_GNSSAndRTC_Simulator(object):
+    '''!
+      @brief Register-level simulator behind a pseudo terminal
+    '''
+
+    def __init__(self, baud=57600, latency=0.001, nmea=DEFAULT_NMEA):
+        '''!
+          @brief Constructor
+          @param baud Baud rate the simulated module listens at
+          @param latency Processing time per command, s
+          @param nmea Text served through REG_ALL_DATA
+        '''
+        self.baud = baud
+        self.latency = latency
+        self.regs = bytearray(256)
+        self.regs[0xAA:0xB0] = bytearray([0x4F, 0x44, 0x43, 0x33, 0x00, 0x01])
+        self.regs[REG_GNSS_MODE] = 7
+        self.regs[RTC_BASE + 0x16] = 25
+        self.regs[RTC_BASE + 0x1A:RTC_BASE + 0x1C] = bytearray([0x80, 0x2C])
+        self.nmea = bytearray(nmea.encode('ascii'))
+        self.__nmea_pos = 0
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__slave)
+        self.port = os.ttyname(self.__slave)
+        self.__rx = bytearray()
+        self.__running = False
+        self.__thread = None
+        self.commands = 0
+        self.bytes_out = 0
+
+    def set_fix(self, fix):
+        '''!
+          @brief Load the GNSS registers from a get_fix() style dict
+          @param fix dict with year, month, date, hour, minute, second, lat, lon, sats, alt, sog, cog
+        '''
+        r = self.regs
+        r[0] = fix.get('year', 2024) >> 8
+        r[1] = fix.get('year', 2024) & 0xff
+        r[2:7] = bytearray([fix.get(k, 0) for k in ('month', 'date', 'hour', 'minute', 'second')])
+        for base, key, neg in ((7, 'lat', 'S'), (13, 'lon', 'W')):
+            value = fix.get(key, 0.0)
+            direction = ord(neg if value < 0 else ('N' if key == 'lat' else 'E'))
+            value = abs(value)
+            deg = int(value)
+            minutes = (value - deg) * 60.0
+            mm = int(minutes)
+            frac = int(round((minutes - mm) * 100000))
+            r[base:base + 6] = bytearray([deg, mm, (frac >> 16) & 0xff, (frac >> 8) & 0xff, frac & 0xff, direction])
+        r[19] = fix.get('sats', 0)
+        for base, key in ((20, 'alt'), (23, 'sog'), (26, 'cog')):
+            value = abs(fix.get(key, 0.0))
+            whole = int(value)
+            r[base:base + 3] = bytearray([(whole >> 8) & 0x7f, whole & 0xff, int(round((value - whole) * 100)) % 100])
+
+    def start(self):
+        '''!
+          @brief Start answering on the pty
+          @return self
+        '''
+        self.__running = True
+        self.__thread = threading.Thread(target=self.__run, name="DFRobot_GNSSAndRTC_Simulator")
+        self.__thread.daemon = True
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        '''!
+          @brief Stop the simulator and close the pty
+        '''
+        self.__running = False
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        os.close(self.__master)
+        os.close(self.__slave)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+        return False
+
+    def __baud_matches(self):
+        speed = termios.tcgetattr(self.__master)[5]
+        return speed == getattr(termios, 'B%d' % self.baud, None)
+
+    def __run(self):
+        while self.__running:
+            ready, _, _ = select.select([self.__master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                data = os.read(self.__master, 4096)
+            except OSError:
+                continue
+            if not self.__baud_matches():
+                # At the wrong rate the module only sees framing errors
+                self.__rx = bytearray()
+                continue
+            self.__rx += data
+            self.__parse()
+
+    def __parse(self):
+        rx = self.__rx
+        while len(rx) >= 3:
+            cmd, reg, size = rx[0], rx[1], rx[2]
+            if cmd == UART0_READ_REGBUF:
+                del rx[:3]
+                self.commands += 1
+                self.__respond(self.__read(reg, size))
+            elif cmd == UART0_WRITE_REGBUF:
+                if len(rx) < 3 + size:
+                    return
+                data = rx[3:3 + size]
+                del rx[:3 + size]
+                self.commands += 1
+                self.__write(reg, data)
+            else:
+                del rx[:1]
+
+    def __respond(self, data):
+        time.sleep(self.latency + len(data) * 10.0 / self.baud)
+        os.write(self.__master, bytes(data))
+        self.bytes_out += len(data)
+
+    def __read(self, reg, size):
+        if reg == REG_ALL_DATA:
+            out = self.nmea[self.__nmea_pos:self.__nmea_pos + size]
+            self.__nmea_pos += len(out)
+            return out + bytearray(size - len(out))
+        return self.regs[reg:reg + size] + bytearray(max(0, reg + size - 256))
+
+    def __write(self, reg, data):
+        if reg == REG_START_GET and data[:1] == b'\x55':
+            self.__nmea_pos = 0
+            self.regs[REG_DATA_LEN_H] = len(self.nmea) >> 8
+            self.regs[REG_DATA_LEN_H + 1] = len(self.nmea) & 0xff
+        elif reg == REG_RTC_READ_REG:
+            self.__refresh_rtc()
+        else:
+            self.regs[reg:reg + len(data)] = data
+
+    def __refresh_rtc(self):
+        now = datetime.datetime.utcnow()
+        r = self.regs
+        r[RTC_BASE:RTC_BASE + 7] = bytearray([
+            _bcd(now.second), _bcd(now.minute), _bcd(now.hour) | 0x80, _bcd((now.weekday() + 1) % 7),
+            _bcd(now.day), _bcd(now.month), _bcd(now.year - 2000)])
@@ -0,0 +1,303 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GNSSKalman.py
+    @brief Constant-velocity Kalman filter serving positions between get_fix() reads
+    @details Fixes are projected onto a local east/north plane (equirectangular around an
+    @n origin that follows the board) and filtered with a constant-velocity model. East,
+    @n north and up are independent [position, velocity] filters: each fix measures the
+    @n position, and sog/cog give the horizontal velocity, so every step is closed form 2x2
+    @n algebra. predict() extrapolates from the last correction without touching the bus and
+    @n can be called at any rate, e.g. 20 Hz from a control loop while fixes arrive at 1 Hz.
+    @n
+    @n A fix whose horizontal innovation has a squared Mahalanobis distance above the gate
+    @n (chi-square, 2 degrees of freedom) is rejected as an outlier. The max_rejects-th reject
+    @n in a row restarts the filter from that fix, so a genuine jump is not locked out.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import math
+import threading
+import time
+
+from DFRobot_GNSSUtil import KNOT_TO_MS, METERS_PER_DEGREE_LAT
+
+GATE_99_9 = 13.82  # < chi-square 2 dof, 99.9 %
+REANCHOR_M = 20000.0  # < Move the plane origin once the position is this far from it
+
+
+class _Axis(object):
+    '''!
+      @brief [position, velocity] filter of one axis with white acceleration noise
+    '''
+    __slots__ = ('p', 'v', 'pp', 'pv', 'vv')
+
+    def __init__(self, p, v, pos_var, vel_var):
+        self.p = p
+        self.v = v
+        self.pp = pos_var
+        self.pv = 0.0
+        self.vv = vel_var
+
+    def predicted(self, dt, q):
+        '''!
+          @brief State and covariance dt seconds ahead, without changing the filter
+          @return (p, v, pp, pv, vv)
+        '''
+        dt2 = dt * dt
+        pp = self.pp + 2 * dt * self.pv + dt2 * self.vv + q * dt2 * dt2 / 4
+        pv = self.pv + dt * self.vv + q * dt2 * dt / 2
+        vv = self.vv + q * dt2
+        return self.p + self.v * dt, self.v, pp, pv, vv
+
+    def advance(self, dt, q):
+        self.p, self.v, self.pp, self.pv, self.vv = self.predicted(dt, q)
+
+    def correct(self, z_p, r_p, z_v=None, r_v=None):
+        if z_v is None:
+            s = self.pp + r_p
+            kp, kv = self.pp / s, self.pv / s
+            e = z_p - self.p
+            self.p += kp * e
+            self.v += kv * e
+            self.pp, self.pv, self.vv = (1 - kp) * self.pp, (1 - kp) * self.pv, self.vv - kv * self.pv
+            return
+        # S = P + R, K = P S^-1, P = (I - K) P
+        a, b, d = self.pp + r_p, self.pv, self.vv + r_v
+        det = a * d - b * b
+        ia, ib, id_ = d / det, -b / det, a / det
+        k11 = self.pp * ia + self.pv * ib
+        k12 = self.pp * ib + self.pv * id_
+        k21 = self.pv * ia + self.vv * ib
+        k22 = self.pv * ib + self.vv * id_
+        ep, ev = z_p - self.p, z_v - self.v
+        self.p += k11 * ep + k12 * ev
+        self.v += k21 * ep + k22 * ev
+        pp, pv, vv = self.pp, self.pv, self.vv
+        self.pp = (1 - k11) * pp - k12 * pv
+        self.pv = (1 - k11) * pv - k12 * vv
+        self.vv = (1 - k22) * vv - k21 * pv
+
+
+class DFRobot_GNSSKalman(object):
+    '''!
+      @brief Fuses successive fixes and predicts the position at any time
+    '''
+
+    def __init__(self, gnss=None, accel_noise=1.0, pos_sigma=2.5, vel_sigma=0.3, alt_sigma=5.0,
+                 gate=GATE_99_9, max_rejects=5, min_sats=4, clock=time.time):
+        '''!
+          @brief Constructor
+          @param gnss DFRobot_GNSSAndRTC board for poll() and start(), None to feed fixes with correct()
+          @param accel_noise Standard deviation of the unmodelled acceleration, m/s^2
+          @param pos_sigma Horizontal position error of one fix per axis, m
+          @param vel_sigma Velocity error of sog/cog per axis, m/s
+          @param alt_sigma Altitude error of one fix, m
+          @param gate Squared Mahalanobis distance above which a fix is rejected, None to accept all
+          @param max_rejects Consecutive rejects after which the filter restarts
+          @param min_sats Fixes with fewer satellites are ignored
+          @param clock Time source, s
+        '''
+        self.gnss = gnss
+        self.accel_var = accel_noise * accel_noise
+        self.pos_var = pos_sigma * pos_sigma
+        self.vel_var = vel_sigma * vel_sigma
+        self.alt_var = alt_sigma * alt_sigma
+        self.gate = gate
+        self.max_rejects = max_rejects
+        self.min_sats = min_sats
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread = None
+        self.__last_time = None
+        self.reset()
+        self.corrections = 0
+        self.rejects = 0
+        self.reads = 0
+
+    def reset(self):
+        '''!
+          @brief Forget the state, the next fix starts the filter again
+        '''
+        self.__axes = None
+        self.__t = None
+        self.__lat0 = self.__lon0 = 0.0
+        self.__m_lon = 0.0
+        self.__streak = 0
+        self.last_distance = None
+
+    @property
+    def ready(self):
+        '''!
+          @brief True once a fix has started the filter
+        '''
+        return self.__axes is not None
+
+    def correct(self, fix, t=None):
+        '''!
+          @brief Feed a fix
+          @param fix dict in the format of get_fix(), fixes with fewer than min_sats satellites are ignored
+          @param t Time the fix was read, s, None for the clock
+          @return True if the fix was used (also when it restarted the filter), False if it was ignored or
+          @n      rejected
+        '''
+        if fix is None or fix['sats'] < self.min_sats:
+            return False
+        if t is None:
+            t = self.__clock()
+        speed = fix['sog'] * KNOT_TO_MS
+        course = math.radians(fix['cog'])
+        ve, vn = speed * math.sin(course), speed * math.cos(course)
+        with self.__lock:
+            if self.__axes is None:
+                self.__start(fix, ve, vn, t)
+                return True
+            x, y = self.__to_plane(fix['lat'], fix['lon'])
+            dt = max(0.0, t - self.__t)
+            east, north, up = self.__axes
+            pe = east.predicted(dt, self.accel_var)
+            pn = north.predicted(dt, self.accel_var)
+            d2 = (x - pe[0]) ** 2 / (pe[2] + self.pos_var) + (y - pn[0]) ** 2 / (pn[2] + self.pos_var)
+            self.last_distance = d2
+            if self.gate is not None and d2 > self.gate:
+                self.rejects += 1
+                self.__streak += 1
+                if self.__streak < self.max_rejects:
+                    return False
+                self.__start(fix, ve, vn, t)
+                return True
+            self.__streak = 0
+            for axis in self.__axes:
+                axis.advance(dt, self.accel_var)
+            east.correct(x, self.pos_var, ve, self.vel_var)
+            north.correct(y, self.pos_var, vn, self.vel_var)
+            up.correct(fix['alt'], self.alt_var)
+            self.__t = t
+            self.corrections += 1
+            if abs(east.p) > REANCHOR_M or abs(north.p) > REANCHOR_M:
+                self.__reanchor()
+            return True
+
+    def predict(self, t=None):
+        '''!
+          @brief Filtered position at a time, no bus access
+          @param t Time, s, None for the clock
+          @return dict with lat, lon (degree), alt (m), sog (knot), cog (degree), sigma_h
+          @n      (horizontal 1-sigma radius, m), sigma_alt (m) and age (s since the last
+          @n      correction), None before the first fix
+        '''
+        if t is None:
+            t = self.__clock()
+        with self.__lock:
+            if self.__axes is None:
+                return None
+            dt = max(0.0, t - self.__t)
+            east, north, up = [axis.predicted(dt, self.accel_var) for axis in self.__axes]
+            lat, lon = self.__to_degree(east[0], north[0])
+            age = t - self.__t
+        speed = math.hypot(east[1], north[1])
+        return {
+            'lat': lat,
+            'lon': lon,
+            'alt': up[0],
+            'sog': speed / KNOT_TO_MS,
+            'cog': math.degrees(math.atan2(east[1], north[1])) % 360.0,
+            'sigma_h': math.sqrt((east[2] + north[2]) / 2),
+            'sigma_alt': math.sqrt(up[2]),
+            'age': age,
+        }
+
+    def covariance(self, t=None):
+        '''!
+          @brief Covariance of the state at a time
+          @param t Time, s, None for the clock
+          @return dict of east, north, up to (pos var m^2, pos-vel cov m^2/s, vel var m^2/s^2),
+          @n      None before the first fix
+        '''
+        if t is None:
+            t = self.__clock()
+        with self.__lock:
+            if self.__axes is None:
+                return None
+            dt = max(0.0, t - self.__t)
+            return dict((name, axis.predicted(dt, self.accel_var)[2:])
+                        for name, axis in zip(('east', 'north', 'up'), self.__axes))
+
+    def poll(self):
+        '''!
+          @brief Read a fix from the board and correct with it if its UTC time is new
+          @return True if the filter was corrected
+        '''
+        with self.gnss.bus_lock:
+            fix = self.gnss.get_fix()
+        self.reads += 1
+        if fix is None:
+            return False
+        stamp = (fix['hour'], fix['minute'], fix['second'])
+        if stamp == self.__last_time:
+            return False
+        self.__last_time = stamp
+        return self.correct(fix)
+
+    def start(self, interval=1.0):
+        '''!
+          @brief Call poll() every interval seconds on a background thread
+          @param interval Seconds between fix reads
+          @note The thread reads the board under its bus_lock, so the caller may keep using the
+          @n    board; hold bus_lock around own call sequences that must not be interleaved.
+        '''
+        def work():
+            while not self.__stop.is_set():
+                start = time.time()
+                self.poll()
+                self.__stop.wait(max(0.0, interval - (time.time() - start)))
+
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=work, name="DFRobot_GNSSKalman")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        '''!
+          @brief Stop the background thread
+        '''
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def stats(self):
+        '''!
+          @brief Filter counters
+          @return dict with reads, corrections and rejects
+        '''
+        return {'reads': self.reads, 'corrections': self.corrections, 'rejects': self.rejects}
+
+    def __start(self, fix, ve, vn, t):
+        self.__set_origin(fix['lat'], fix['lon'])
+        self.__axes = (_Axis(0.0, ve, self.pos_var, self.vel_var),
+                       _Axis(0.0, vn, self.pos_var, self.vel_var),
+                       _Axis(fix['alt'], 0.0, self.alt_var, 1.0))
+        self.__t = t
+        self.__streak = 0
+
+    def __set_origin(self, lat, lon):
+        self.__lat0, self.__lon0 = lat, lon
+        self.__m_lon = METERS_PER_DEGREE_LAT * max(1e-6, math.cos(math.radians(lat)))
+
+    def __reanchor(self):
+        east, north = self.__axes[0], self.__axes[1]
+        self.__set_origin(*self.__to_degree(east.p, north.p))
+        east.p = north.p = 0.0
+
+    def __to_plane(self, lat, lon):
+        dlon = (lon - self.__lon0 + 180.0) % 360.0 - 180.0
+        return dlon * self.__m_lon, (lat - self.__lat0) * METERS_PER_DEGREE_LAT
+
+    def __to_degree(self, x, y):
+        lon = self.__lon0 + x / self.__m_lon
+        return self.__lat0 + y / METERS_PER_DEGREE_LAT, (lon + 180.0) % 360.0 - 180.0
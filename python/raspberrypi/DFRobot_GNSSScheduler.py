@@ -0,0 +1,165 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GNSSScheduler.py
+    @brief Adaptive GNSS polling driven by speed, displacement and fix quality
+    @details The next poll interval shrinks to the fast cadence while the board moves and grows
+    @n geometrically towards the slow cadence while it stays put. During long idle windows the
+    @n GNSS can optionally be powered down and is woken up a warm-up period before the next poll.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import time
+
+from DFRobot_GNSSUtil import haversine_m
+
+
+def signed_degree(value, direction):
+    '''!
+      @brief Apply the N/S or E/W direction returned by get_lat()/get_lon()
+      @param value Degree value
+      @param direction b'S'/'S'/ord('S') style direction
+      @return Negative value for south and west
+    '''
+    if isinstance(direction, int):
+        direction = chr(direction)
+    if isinstance(direction, bytes):
+        direction = direction.decode('ascii', 'ignore')
+    return -value if direction in ('S', 'W') else value
+
+
+class DFRobot_GNSSScheduler(object):
+    '''!
+      @brief Picks the next poll time from the latest fix
+    '''
+    OPS_PER_POLL = 4  # < get_lat, get_lon, get_sog and get_num_sat_used, one register read each
+
+    def __init__(self, gnss, fast_interval=1.0, slow_interval=30.0, baseline_interval=1.0,
+                 moving_speed=1.0, moving_distance=15.0, min_sats=4,
+                 power_save=False, power_off_after=20.0, warmup=5.0,
+                 clock=time.time, sleep=time.sleep):
+        '''!
+          @brief Constructor
+          @param gnss DFRobot_GNSSAndRTC instance
+          @param fast_interval Poll interval while moving or without a usable fix, s
+          @param slow_interval Longest poll interval while stationary, s
+          @param baseline_interval The fixed interval the savings are compared against, s
+          @param moving_speed Speed over ground above which the board counts as moving, knot
+          @param moving_distance Displacement since the last poll above which the board counts as moving, m
+          @param min_sats Fewer satellites than this means the fix is not trusted
+          @param power_save Power the GNSS down when the next poll is at least power_off_after away
+          @param power_off_after Shortest idle window worth a power cycle, s
+          @param warmup Time the GNSS gets to reacquire before the poll, s
+          @param clock Time source, for tests
+          @param sleep Sleep function, for tests
+        '''
+        self.__gnss = gnss
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.baseline_interval = baseline_interval
+        self.moving_speed = moving_speed
+        self.moving_distance = moving_distance
+        self.min_sats = min_sats
+        self.power_save = power_save
+        self.power_off_after = power_off_after
+        self.warmup = warmup
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__interval = fast_interval
+        self.__last = None
+        self.__started = None
+        self.__powered = True
+        self.polls = 0
+        self.power_cycles = 0
+        self.power_off_time = 0.0
+
+    def poll(self):
+        '''!
+          @brief Read one fix and compute the next interval
+          @return dict with lat, lon (signed degree), sog (knot), sats, moving and interval (s)
+        '''
+        now = self.__clock()
+        if self.__started is None:
+            self.__started = now
+        lat_t = self.__gnss.get_lat()
+        lon_t = self.__gnss.get_lon()
+        lat = signed_degree(lat_t.latitudeDegree, lat_t.latDirection)
+        lon = signed_degree(lon_t.lonitudeDegree, lon_t.lonDirection)
+        sog = self.__gnss.get_sog()
+        sats = self.__gnss.get_num_sat_used()
+        self.polls += 1
+
+        moved = 0.0
+        if self.__last is not None:
+            moved = haversine_m(self.__last[0], self.__last[1], lat, lon)
+        moving = sog >= self.moving_speed or moved >= self.moving_distance
+        if sats < self.min_sats or moving:
+            self.__interval = self.fast_interval
+        else:
+            self.__interval = min(self.slow_interval, self.__interval * 2)
+        if sats >= self.min_sats:
+            self.__last = (lat, lon)
+        return {
+            'lat': lat,
+            'lon': lon,
+            'sog': sog,
+            'sats': sats,
+            'moving': moving,
+            'interval': self.__interval,
+        }
+
+    def wait(self):
+        '''!
+          @brief Sleep until the next poll, powering the GNSS down if the window is long enough
+        '''
+        interval = self.__interval
+        if self.power_save and interval >= self.power_off_after and interval > self.warmup:
+            off = interval - self.warmup
+            self.__gnss.disable_power()
+            self.__powered = False
+            self.__sleep(off)
+            self.__gnss.enable_power()
+            self.__powered = True
+            self.power_cycles += 1
+            self.power_off_time += off
+            self.__sleep(self.warmup)
+        else:
+            self.__sleep(interval)
+
+    def run(self, callback, stop=None):
+        '''!
+          @brief Poll forever
+          @param callback Called with the dict returned by poll()
+          @param stop Optional threading.Event that ends the loop
+        '''
+        try:
+            while stop is None or not stop.is_set():
+                callback(self.poll())
+                self.wait()
+        finally:
+            if not self.__powered:
+                self.__gnss.enable_power()
+                self.__powered = True
+
+    def savings(self):
+        '''!
+          @brief Compare the work done with fixed-rate polling at baseline_interval
+          @return dict with elapsed time, polls, baseline polls, bus ops, saved bus ops and GNSS off time
+        '''
+        elapsed = 0.0
+        if self.__started is not None:
+            elapsed = self.__clock() - self.__started
+        baseline = int(elapsed / self.baseline_interval) + (1 if self.__started is not None else 0)
+        return {
+            'elapsed': elapsed,
+            'polls': self.polls,
+            'baseline_polls': baseline,
+            'bus_ops': self.polls * self.OPS_PER_POLL,
+            'saved_bus_ops': max(0, baseline - self.polls) * self.OPS_PER_POLL,
+            'power_cycles': self.power_cycles,
+            'power_off_time': self.power_off_time,
+            'power_off_ratio': self.power_off_time / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,262 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GNSSStream.py
+    @brief Decouple get_all_gnss acquisition from slow consumers
+    @details The stream installs itself as the get_all_gnss callback and only copies each chunk
+    @n into a bounded queue per consumer, so the bus loop never waits for printing, disk or
+    @n network I/O. Every consumer gets every item (fan-out) through its own queue and runs on a
+    @n worker thread or as an async iterator. When a queue is full the overflow policy decides:
+    @n   POLICY_BLOCK        the producer waits for the consumer
+    @n   POLICY_DROP_OLDEST  the oldest queued item is discarded
+    @n   POLICY_DROP_NEWEST  the new item is discarded
+    @n Async iterators need Python 3.5 or later and live in DFRobot_GNSSStreamAsync, which only
+    @n aiter() imports, so this module also runs on older versions.
+    @n
+    @n poll() holds the board's bus_lock for the whole dump and queues its chunks once the lock
+    @n is released, so a blocking consumer never holds up other threads using the board, and
+    @n those threads only run their calls between dumps.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import collections
+import threading
+import time
+
+POLICY_BLOCK = 'block'
+POLICY_DROP_OLDEST = 'drop-oldest'
+POLICY_DROP_NEWEST = 'drop-newest'
+
+
+class _Channel(object):
+    '''!
+      @brief Bounded thread-safe queue with an overflow policy and counters
+    '''
+
+    def __init__(self, name, maxsize, policy):
+        if policy not in (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST):
+            raise ValueError("unknown overflow policy %r" % policy)
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.items = collections.deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.blocked_time = 0.0
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) >= self.maxsize:
+                if self.policy == POLICY_DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                if self.policy == POLICY_DROP_OLDEST:
+                    self.items.popleft()
+                    self.dropped += 1
+                else:
+                    start = time.time()
+                    while len(self.items) >= self.maxsize and not self.closed:
+                        self.cond.wait()
+                    self.blocked_time += time.time() - start
+            if self.closed:
+                return
+            self.items.append(item)
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.cond.notify_all()
+        self._wake()
+
+    def get(self, timeout=None):
+        '''!
+          @return (True, item), or (False, None) when closed and drained or on timeout
+        '''
+        with self.cond:
+            deadline = None if timeout is None else time.time() + timeout
+            while not self.items:
+                if self.closed:
+                    return False, None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False, None
+                self.cond.wait(remaining)
+            item = self.items.popleft()
+            self.delivered += 1
+            self.cond.notify_all()
+            return True, item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self._wake()
+
+    def stats(self):
+        with self.cond:
+            return {
+                'depth': len(self.items),
+                'max_depth': self.max_depth,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'blocked_time': self.blocked_time,
+            }
+
+    def _wake(self):
+        pass
+
+
+class DFRobot_GNSSStream(object):
+    '''!
+      @brief Bounded fan-out queues between get_all_gnss and its consumers
+    '''
+
+    def __init__(self, gnss, maxsize=64, policy=POLICY_DROP_OLDEST, per_dump=False):
+        '''!
+          @brief Constructor, replaces the callback of gnss
+          @param gnss DFRobot_GNSSAndRTC instance
+          @param maxsize Default queue length per consumer
+          @param policy Default overflow policy per consumer
+          @param per_dump False queues every chunk as it is read, True queues one bytes item per get_all_gnss call
+        '''
+        self.__gnss = gnss
+        self.maxsize = maxsize
+        self.policy = policy
+        self.per_dump = per_dump
+        self.__channels = []
+        self.__workers = []
+        self.__lock = threading.Lock()
+        self.__dump = bytearray()
+        self.__polled = None
+        self.__producer = None
+        self.__stop = threading.Event()
+        self.chunks = 0
+        self.bytes = 0
+        gnss.set_callback(self.__on_chunk)
+
+    def add_consumer(self, func, name=None, maxsize=None, policy=None):
+        '''!
+          @brief Run func(item) on its own worker thread for every queued item
+          @param func Consumer, receives bytes
+          @param name Name used in stats(), defaults to the function name
+          @param maxsize Queue length, defaults to the stream setting
+          @param policy Overflow policy, defaults to the stream setting
+        '''
+        channel = self.__add(_Channel(name or getattr(func, '__name__', 'consumer'),
+                                      maxsize or self.maxsize, policy or self.policy))
+
+        def work():
+            while True:
+                ok, item = channel.get()
+                if not ok:
+                    return
+                func(item)
+
+        worker = threading.Thread(target=work, name="DFRobot_GNSSStream-" + channel.name)
+        worker.daemon = True
+        worker.start()
+        self.__workers.append(worker)
+
+    def aiter(self, name='async', maxsize=None, policy=None, loop=None):
+        '''!
+          @brief Get an async iterator over the queued items
+          @n     async for chunk in stream.aiter(): ...
+          @param name Name used in stats()
+          @param maxsize Queue length, defaults to the stream setting
+          @param policy Overflow policy, defaults to the stream setting
+          @param loop Event loop the iterator is consumed on, defaults to the loop running the first iteration
+          @return async iterator ending when the stream is closed
+          @note Needs Python 3.5 or later
+        '''
+        from DFRobot_GNSSStreamAsync import _AsyncChannel
+        return self.__add(_AsyncChannel(name, maxsize or self.maxsize, policy or self.policy, loop))
+
+    def poll(self):
+        '''!
+          @brief Read one GNSS dump and queue it
+          @return int type, number of bytes read
+        '''
+        with self.__gnss.bus_lock:
+            self.__polled = []
+            try:
+                n = self.__gnss.get_all_gnss() or 0
+            finally:
+                chunks, self.__polled = self.__polled, None
+        for chunk in chunks:
+            self.__publish(chunk)
+        if self.per_dump and self.__dump:
+            item = bytes(self.__dump)
+            self.__dump = bytearray()
+            self.__publish(item)
+        return n
+
+    def start(self, interval=1.0):
+        '''!
+          @brief Call poll() every interval seconds on a producer thread
+          @param interval Seconds between dumps
+          @note The producer shares the board with the caller through bus_lock, see poll()
+        '''
+        def produce():
+            while not self.__stop.is_set():
+                start = time.time()
+                self.poll()
+                self.__stop.wait(max(0.0, interval - (time.time() - start)))
+
+        self.__stop.clear()
+        self.__producer = threading.Thread(target=produce, name="DFRobot_GNSSStream-producer")
+        self.__producer.daemon = True
+        self.__producer.start()
+
+    def close(self, wait=True):
+        '''!
+          @brief Stop the producer and let the consumers drain their queues
+          @param wait Wait for the worker threads to finish
+        '''
+        self.__stop.set()
+        if self.__producer is not None:
+            self.__producer.join()
+            self.__producer = None
+        for channel in self.__channels:
+            channel.close()
+        if wait:
+            for worker in self.__workers:
+                worker.join()
+
+    def stats(self):
+        '''!
+          @brief Get queue counters
+          @return dict with chunks and bytes produced and, per consumer name, depth, max_depth,
+          @n      delivered, dropped and blocked_time (s the producer waited on that consumer)
+        '''
+        with self.__lock:
+            channels = list(self.__channels)
+        result = {'chunks': self.chunks, 'bytes': self.bytes, 'consumers': {}}
+        for channel in channels:
+            result['consumers'][channel.name] = channel.stats()
+        return result
+
+    def __add(self, channel):
+        with self.__lock:
+            self.__channels.append(channel)
+        return channel
+
+    def __on_chunk(self, data, length):
+        # The driver reuses its buffer, copy before handing the chunk on
+        chunk = bytes(bytearray(data[:length]))
+        self.chunks += 1
+        self.bytes += length
+        if self.per_dump:
+            self.__dump += chunk
+        elif self.__polled is not None:
+            self.__polled.append(chunk)
+        else:
+            self.__publish(chunk)
+
+    def __publish(self, item):
+        with self.__lock:
+            channels = list(self.__channels)
+        for channel in channels:
+            channel.put(item)
@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GNSSStreamAsync.py
+    @brief asyncio consumers of DFRobot_GNSSStream
+    @details Imported by DFRobot_GNSSStream.aiter() only, so the stream itself imports on Python
+    @n versions without asyncio or async def. Needs Python 3.5 or later.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import asyncio
+
+from DFRobot_GNSSStream import _Channel
+
+
+class _AsyncChannel(_Channel):
+    '''!
+      @brief Channel read by an asyncio task
+    '''
+
+    def __init__(self, name, maxsize, policy, loop=None):
+        super(_AsyncChannel, self).__init__(name, maxsize, policy)
+        self.event = None
+        self.loop = loop
+
+    def _wake(self):
+        # Before the first __anext__ there is nobody to wake, the item stays queued
+        loop = self.loop
+        if loop is not None and self.event is not None:
+            try:
+                loop.call_soon_threadsafe(self.event.set)
+            except RuntimeError:
+                pass  # < Loop closed, nobody iterates any more
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.event is None:
+            # Created here so the event binds to the loop that consumes the items
+            self.event = asyncio.Event()
+            if self.loop is None:
+                self.loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        while True:
+            self.event.clear()
+            ok, item = self.get(timeout=0)
+            if ok:
+                return item
+            if self.closed:
+                raise StopAsyncIteration
+            await self.event.wait()
@@ -0,0 +1,118 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GNSSUtil.py
+    @brief Helpers shared by the fix processing modules
+    @details Earth and unit constants and the scalar great-circle distance (DFRobot_GeoBatch has
+    @n the NumPy versions for batches of fixes), versioned JSON state files that are replaced
+    @n atomically, so a crash while saving leaves the previous state intact, and method hooks
+    @n on a board instance that several tools can stack and remove in any order.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import json
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+EARTH_RADIUS_M = 6371008.8  # < Mean earth radius
+METERS_PER_DEGREE_LAT = math.radians(1.0) * EARTH_RADIUS_M
+KNOT_TO_MS = 0.514444
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    '''!
+      @brief Great-circle distance
+      @param lat1 Latitude of the first point, degree
+      @param lon1 Longitude of the first point, degree
+      @param lat2 Latitude of the second point, degree
+      @param lon2 Longitude of the second point, degree
+      @return Distance in meters
+    '''
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def load_state(path, version):
+    '''!
+      @brief Read a state file written by save_state()
+      @param path State file, None or empty for no file
+      @param version Expected state version
+      @return dict with the saved fields, None if there is no readable file of that version
+    '''
+    if not path:
+        return None
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get('version') != version:
+        return None
+    return state
+
+
+def save_state(path, version, state, what='state'):
+    '''!
+      @brief Write a state file through a temporary file and a rename
+      @param path State file, None or empty to skip
+      @param version State version stored with the fields
+      @param state dict of JSON serializable fields
+      @param what Description used in the warning when the file cannot be written
+      @return True if the file was written
+    '''
+    if not path:
+        return False
+    data = dict(state)
+    data['version'] = version
+    tmp = path + '.tmp'
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.rename(tmp, path)
+    except (IOError, OSError):
+        logger.warning("Could not write the %s %s", what, path)
+        return False
+    return True
+
+
+def install_hook(obj, name, hook):
+    '''!
+      @brief Replace an attribute on an instance, e.g. a bound method of a board
+      @param obj Instance
+      @param name Attribute name
+      @param hook New value, usually a wrapper of getattr(obj, name)
+      @return Token for remove_hook()
+    '''
+    previous = vars(obj).get(name, _UNSET)
+    setattr(obj, name, hook)
+    return (name, previous, hook)
+
+
+def remove_hook(obj, token):
+    '''!
+      @brief Undo install_hook() if the hook is still the outermost one
+      @n     A hook wrapped by a later install_hook() must stay, the later hook still calls it.
+      @param obj Instance
+      @param token Result of install_hook()
+      @return True if the replaced attribute was restored
+    '''
+    name, previous, hook = token
+    if vars(obj).get(name) is not hook:
+        return False
+    if previous is _UNSET:
+        delattr(obj, name)
+    else:
+        setattr(obj, name, previous)
+    return True
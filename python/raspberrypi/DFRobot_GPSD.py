@@ -0,0 +1,289 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GPSD.py
+    @brief Local gpsd-compatible JSON server backed by the driver
+    @details The server reads the board once per interval, however many clients are connected,
+    @n and fans the result out as gpsd protocol reports:
+    @n   TPV   time, position, altitude, speed and track of the fix
+    @n   SKY   number of satellites used (the module does not report per-satellite data)
+    @n   TOFF  GNSS time of the fix against the system clock when it was read
+    @n Each report is serialized once and the same bytes are queued to every watching client.
+    @n Every client has its own bounded queue and writer task, so a slow client only loses its
+    @n own oldest reports (counted in stats()) and never delays the others or the bus poll.
+    @n
+    @n Supported commands: ?VERSION; ?DEVICES; ?WATCH={"enable":true,"json":true}; ?POLL;
+    @n
+    @n examples/gpsdServer.py serves a board from the command line; point gpspipe, cgps or any
+    @n gpsd client at localhost:2947.
+    @n Requires Python 3.7 or later.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import asyncio
+import collections
+import datetime
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from DFRobot_GNSSUtil import KNOT_TO_MS
+
+GPSD_PORT = 2947
+GPSD_RELEASE = '3.25'
+PROTO_MAJOR = 3
+PROTO_MINOR = 14
+
+MODE_NO_FIX = 1
+MODE_2D = 2
+MODE_3D = 3
+
+
+def _dumps(obj):
+    return (json.dumps(obj, separators=(',', ':')) + '\r\n').encode('ascii')
+
+
+def _iso_time(fix):
+    return '%04d-%02d-%02dT%02d:%02d:%02d.000Z' % (fix['year'], fix['month'], fix['date'],
+                                                    fix['hour'], fix['minute'], fix['second'])
+
+
+class _Client(object):
+    '''!
+      @brief Connection state and bounded send queue of one client
+    '''
+
+    def __init__(self, writer, max_queue):
+        self.writer = writer
+        self.queue = collections.deque()
+        self.max_queue = max_queue
+        self.ready = asyncio.Event()
+        self.watch = False
+        self.dropped = 0
+        self.sent = 0
+
+    def send(self, data):
+        if len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(data)
+        self.ready.set()
+
+
+class DFRobot_GPSDServer(object):
+    '''!
+      @brief asyncio TCP server speaking the gpsd JSON protocol
+    '''
+
+    def __init__(self, board, host='127.0.0.1', port=GPSD_PORT, interval=1.0,
+                 device='/dev/dfrobot_gnss', max_queue=32, min_sats=3):
+        '''!
+          @brief Constructor
+          @param board DFRobot_GNSSAndRTC instance, after begin()
+          @param host Listen address, keep it local
+          @param port Listen port, gpsd uses 2947
+          @param interval Seconds between bus polls
+          @param device Device path reported to clients
+          @param max_queue Reports buffered per client before its oldest are dropped
+          @param min_sats Satellites needed to report a fix, 4 and more give a 3D fix
+        '''
+        self.__board = board
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.device = device
+        self.max_queue = max_queue
+        self.min_sats = min_sats
+        self.__clients = set()
+        self.__server = None
+        self.__poller = None
+        # One thread owns the bus, the event loop never waits on it
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+        self.__last = {}
+        self.polls = 0
+        self.reports = 0
+
+    async def start(self):
+        '''!
+          @brief Start listening and polling
+          @return int type, the bound port (useful with port=0)
+        '''
+        self.__server = await asyncio.start_server(self.__handle, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+        self.__poller = asyncio.ensure_future(self.__poll_loop())
+        return self.port
+
+    async def serve_forever(self):
+        '''!
+          @brief Start the server and run until cancelled
+        '''
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        '''!
+          @brief Stop polling and disconnect all clients
+        '''
+        if self.__poller is not None:
+            self.__poller.cancel()
+            self.__poller = None
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+        for client in list(self.__clients):
+            client.writer.close()
+        self.__executor.shutdown(wait=True)
+
+    def stats(self):
+        '''!
+          @brief Get server counters
+          @return dict with polls, reports, clients and the per-client queue depth, sent and dropped counts
+        '''
+        return {
+            'polls': self.polls,
+            'reports': self.reports,
+            'clients': [{'watch': c.watch, 'depth': len(c.queue), 'sent': c.sent, 'dropped': c.dropped}
+                        for c in self.__clients],
+        }
+
+    def reports_for(self, fix, clock):
+        '''!
+          @brief Build the serialized TPV, SKY and TOFF reports of one poll
+          @param fix dict in the format of get_fix(), None if the read failed
+          @param clock System time of the read, s
+          @return dict of class name to bytes
+        '''
+        now = datetime.datetime.fromtimestamp(clock, datetime.timezone.utc)
+        now = now.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        sats = fix['sats'] if fix is not None else 0
+        if fix is None or sats < self.min_sats or (fix['lat'] == 0.0 and fix['lon'] == 0.0):
+            mode = MODE_NO_FIX
+        elif sats >= 4:
+            mode = MODE_3D
+        else:
+            mode = MODE_2D
+        tpv = {'class': 'TPV', 'device': self.device, 'mode': mode}
+        reports = {}
+        if fix is not None and fix['year'] >= 2000:
+            tpv['time'] = _iso_time(fix)
+            real = (datetime.datetime(fix['year'], fix['month'], fix['date'], fix['hour'],
+                                      fix['minute'], fix['second']) - datetime.datetime(1970, 1, 1))
+            real = int(real.total_seconds())
+            reports['TOFF'] = _dumps({'class': 'TOFF', 'device': self.device,
+                                      'real_sec': real, 'real_nsec': 0,
+                                      'clock_sec': int(clock), 'clock_nsec': int((clock % 1) * 1e9),
+                                      'precision': -1})
+        if mode >= MODE_2D:
+            tpv.update({'lat': fix['lat'], 'lon': fix['lon'],
+                        'speed': round(fix['sog'] * KNOT_TO_MS, 3), 'track': fix['cog']})
+            if mode == MODE_3D:
+                tpv['alt'] = tpv['altMSL'] = fix['alt']
+        reports['TPV'] = _dumps(tpv)
+        reports['SKY'] = _dumps({'class': 'SKY', 'device': self.device, 'time': now,
+                                 'nSat': sats, 'uSat': sats, 'satellites': []})
+        return reports
+
+    async def __poll_loop(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            start = loop.time()
+            if any(c.watch for c in self.__clients):
+                await self.__poll(loop)
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - start)))
+
+    async def __poll(self, loop):
+        fix, clock = await loop.run_in_executor(self.__executor, self.__read)
+        self.polls += 1
+        self.__last = self.reports_for(fix, clock)
+        for name in ('TPV', 'SKY', 'TOFF'):
+            data = self.__last.get(name)
+            if data is None:
+                continue
+            for client in self.__clients:
+                if client.watch:
+                    client.send(data)
+                    self.reports += 1
+
+    def __read(self):
+        fix = self.__board.get_fix()
+        return fix, time.time()
+
+    async def __handle(self, reader, writer):
+        client = _Client(writer, self.max_queue)
+        self.__clients.add(client)
+        sender = asyncio.ensure_future(self.__send_loop(client))
+        client.send(_dumps({'class': 'VERSION', 'release': GPSD_RELEASE, 'rev': GPSD_RELEASE,
+                            'proto_major': PROTO_MAJOR, 'proto_minor': PROTO_MINOR}))
+        try:
+            pending = b''
+            while True:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                pending += data
+                while b';' in pending:
+                    command, pending = pending.split(b';', 1)
+                    await self.__command(client, command.strip().decode('ascii', 'replace'))
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self.__clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def __command(self, client, command):
+        if command == '?VERSION':
+            client.send(_dumps({'class': 'VERSION', 'release': GPSD_RELEASE, 'rev': GPSD_RELEASE,
+                                'proto_major': PROTO_MAJOR, 'proto_minor': PROTO_MINOR}))
+        elif command == '?DEVICES':
+            client.send(self.__devices())
+        elif command.startswith('?WATCH'):
+            try:
+                args = json.loads(command[7:]) if command.startswith('?WATCH=') else {}
+            except ValueError:
+                client.send(_dumps({'class': 'ERROR', 'message': "Invalid WATCH: %s" % command}))
+                return
+            if not isinstance(args, dict):
+                args = {}
+            client.watch = bool(args.get('enable', True)) and bool(args.get('json', True))
+            client.send(self.__devices())
+            client.send(_dumps({'class': 'WATCH', 'enable': client.watch, 'json': client.watch,
+                                'nmea': False, 'raw': 0, 'scaled': False, 'timing': False}))
+        elif command == '?POLL':
+            if not self.__last:
+                await self.__poll(asyncio.get_event_loop())
+            tpv = json.loads(self.__last['TPV'].decode('ascii'))
+            sky = json.loads(self.__last['SKY'].decode('ascii'))
+            client.send(_dumps({'class': 'POLL', 'time': sky['time'], 'active': 1,
+                                'tpv': [tpv], 'sky': [sky]}))
+        else:
+            client.send(_dumps({'class': 'ERROR',
+                                'message': "Unrecognized request '%s'" % command.lstrip('?')}))
+
+    def __devices(self):
+        activated = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        return _dumps({'class': 'DEVICES', 'devices': [{'class': 'DEVICE', 'path': self.device,
+                                                         'driver': 'DFRobot_GNSSAndRTC',
+                                                         'activated': activated,
+                                                         'flags': 1, 'native': 0}]})
+
+    async def __send_loop(self, client):
+        writer = client.writer
+        try:
+            while True:
+                await client.ready.wait()
+                while client.queue:
+                    writer.write(client.queue.popleft())
+                    client.sent += 1
+                    # Waits only while this client's socket buffer is above its high-water mark
+                    await writer.drain()
+                client.ready.clear()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
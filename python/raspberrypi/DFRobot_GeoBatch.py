@@ -0,0 +1,293 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_GeoBatch.py
+    @brief Vectorized coordinate transformations and distances for batches of fixes
+    @details All functions take NumPy arrays (or anything np.asarray accepts) of WGS84 degrees
+    @n and meters, and work element-wise over the whole batch:
+    @n   geodetic_to_ecef, geodetic_to_enu   earth-centred and local east/north/up coordinates
+    @n   to_utm                              UTM easting/northing (Krueger series, mm accuracy)
+    @n   haversine_m, vincenty_m             great-circle and ellipsoidal distances
+    @n   bearing_deg                         initial bearings
+    @n   consecutive_*, pairwise_*           along a track and between all pairs of points
+    @n The ENU rotation of an origin and the per-zone UTM parameters are cached, so repeated
+    @n batches against the same origin or zone skip the setup.
+    @n
+    @n Requires NumPy. examples/geoBatchCost.py prints the per-point cost at 1e6 points.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import functools
+import math
+
+import numpy as np
+
+from DFRobot_GNSSUtil import EARTH_RADIUS_M
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+UTM_K0 = 0.9996
+UTM_FALSE_EASTING = 500000.0
+UTM_FALSE_NORTHING_SOUTH = 10000000.0
+
+# Krueger series of the transverse Mercator projection, depends on the ellipsoid only
+_N = WGS84_F / (2 - WGS84_F)
+_UTM_A = WGS84_A / (1 + _N) * (1 + _N ** 2 / 4 + _N ** 4 / 64)
+_UTM_ALPHA = (
+    _N / 2 - 2 * _N ** 2 / 3 + 5 * _N ** 3 / 16 + 41 * _N ** 4 / 180,
+    13 * _N ** 2 / 48 - 3 * _N ** 3 / 5 + 557 * _N ** 4 / 1440,
+    61 * _N ** 3 / 240 - 103 * _N ** 4 / 140,
+    49561 * _N ** 4 / 161280,
+)
+_UTM_E = 2 * math.sqrt(_N) / (1 + _N)
+
+
+def fixes_to_arrays(fixes):
+    '''!
+      @brief Turn get_fix() dicts into arrays
+      @param fixes Iterable of get_fix() results, None entries are skipped
+      @return (lat, lon, alt) float64 arrays, degree and m
+    '''
+    fixes = [f for f in fixes if f is not None]
+    lat = np.fromiter((f['lat'] for f in fixes), np.float64, len(fixes))
+    lon = np.fromiter((f['lon'] for f in fixes), np.float64, len(fixes))
+    alt = np.fromiter((f['alt'] for f in fixes), np.float64, len(fixes))
+    return lat, lon, alt
+
+
+def nmea_to_degree(ddmm, direction=None):
+    '''!
+      @brief Convert NMEA ddmm.mmmmm values to signed degrees
+      @param ddmm Values in the get_lat()/get_lon() latitude/lonitude field format
+      @param direction Optional array of 'N'/'S'/'E'/'W' (str, bytes or their ord), S and W negate
+      @return float64 array
+    '''
+    ddmm = np.asarray(ddmm, np.float64)
+    deg = np.floor(ddmm / 100.0)
+    value = deg + (ddmm - deg * 100.0) / 60.0
+    if direction is not None:
+        d = np.asarray(direction)
+        if d.dtype.kind in 'iu':
+            negative = (d == ord('S')) | (d == ord('W'))
+        else:
+            d = d.astype('U1')
+            negative = (d == 'S') | (d == 'W')
+        value = np.where(negative, -value, value)
+    return value
+
+
+def geodetic_to_ecef(lat, lon, alt=0.0):
+    '''!
+      @brief WGS84 geodetic to earth-centred earth-fixed coordinates
+      @return (x, y, z) arrays, m
+    '''
+    phi = np.radians(lat)
+    lam = np.radians(lon)
+    sin_phi = np.sin(phi)
+    cos_phi = np.cos(phi)
+    n = WGS84_A / np.sqrt(1 - WGS84_E2 * sin_phi * sin_phi)
+    alt = np.asarray(alt, np.float64)
+    x = (n + alt) * cos_phi * np.cos(lam)
+    y = (n + alt) * cos_phi * np.sin(lam)
+    z = (n * (1 - WGS84_E2) + alt) * sin_phi
+    return x, y, z
+
+
+@functools.lru_cache(maxsize=32)
+def _enu_origin(lat0, lon0, alt0):
+    x0, y0, z0 = geodetic_to_ecef(lat0, lon0, alt0)
+    phi = math.radians(lat0)
+    lam = math.radians(lon0)
+    sp, cp, sl, cl = math.sin(phi), math.cos(phi), math.sin(lam), math.cos(lam)
+    rotation = np.array([[-sl, cl, 0.0],
+                         [-sp * cl, -sp * sl, cp],
+                         [cp * cl, cp * sl, sp]])
+    return np.array([float(x0), float(y0), float(z0)]), rotation
+
+
+def geodetic_to_enu(lat, lon, alt, origin):
+    '''!
+      @brief WGS84 geodetic to local east/north/up coordinates
+      @param origin (lat0, lon0, alt0) of the local frame, its rotation is cached
+      @return (east, north, up) arrays, m
+    '''
+    centre, rotation = _enu_origin(float(origin[0]), float(origin[1]), float(origin[2]))
+    x, y, z = geodetic_to_ecef(lat, lon, alt)
+    d = np.stack([np.asarray(x) - centre[0], np.asarray(y) - centre[1], np.asarray(z) - centre[2]])
+    east, north, up = np.tensordot(rotation, d, axes=1)
+    return east, north, up
+
+
+def utm_zone(lat, lon):
+    '''!
+      @brief UTM zone numbers, with the Norway and Svalbard exceptions
+      @return int array 1~60
+    '''
+    lat = np.asarray(lat, np.float64)
+    lon = np.asarray(lon, np.float64)
+    zone = (np.floor((lon + 180.0) / 6.0).astype(np.int64) % 60) + 1
+    zone = np.where((lat >= 56) & (lat < 64) & (lon >= 3) & (lon < 12), 32, zone)
+    svalbard = (lat >= 72) & (lat < 84)
+    for lo, hi, z in ((0, 9, 31), (9, 21, 33), (21, 33, 35), (33, 42, 37)):
+        zone = np.where(svalbard & (lon >= lo) & (lon < hi), z, zone)
+    return zone
+
+
+@functools.lru_cache(maxsize=64)
+def _utm_central_meridian(zone):
+    return math.radians(zone * 6 - 183)
+
+
+def to_utm(lat, lon, zone=None):
+    '''!
+      @brief WGS84 geodetic to UTM
+      @param zone Force one zone for the whole batch (keeps a track in one grid), None for each point's own zone
+      @return (easting, northing, zone, north) arrays; north is True on the northern hemisphere
+    '''
+    lat = np.asarray(lat, np.float64)
+    lon = np.asarray(lon, np.float64)
+    if zone is None:
+        zone = utm_zone(lat, lon)
+        zones = np.unique(zone)
+        lam0 = np.zeros_like(lon)
+        for z in zones:
+            lam0[zone == z] = _utm_central_meridian(int(z))
+    else:
+        lam0 = _utm_central_meridian(int(zone))
+        zone = np.full(lat.shape, int(zone))
+    phi = np.radians(lat)
+    dlam = np.radians(lon) - lam0
+    dlam = (dlam + np.pi) % (2 * np.pi) - np.pi
+    sin_phi = np.sin(phi)
+    t = np.sinh(np.arctanh(sin_phi) - _UTM_E * np.arctanh(_UTM_E * sin_phi))
+    xi = np.arctan2(t, np.cos(dlam))
+    eta = np.arctanh(np.sin(dlam) / np.sqrt(1 + t * t))
+    easting = eta.copy()
+    northing = xi.copy()
+    for j, alpha in enumerate(_UTM_ALPHA, 1):
+        easting += alpha * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+        northing += alpha * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+    north = lat >= 0
+    easting = UTM_FALSE_EASTING + UTM_K0 * _UTM_A * easting
+    northing = UTM_K0 * _UTM_A * northing + np.where(north, 0.0, UTM_FALSE_NORTHING_SOUTH)
+    return easting, northing, zone, north
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    '''!
+      @brief Great-circle distances on the mean earth sphere
+      @return array, m
+    '''
+    p1 = np.radians(lat1)
+    p2 = np.radians(lat2)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(np.subtract(lon2, lon1)) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+
+def vincenty_m(lat1, lon1, lat2, lon2, tol=1e-12, max_iter=200):
+    '''!
+      @brief Distances on the WGS84 ellipsoid (Vincenty inverse formula)
+      @n     Nearly antipodal pairs that do not converge fall back to haversine_m.
+      @return array, m
+    '''
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(*[np.asarray(v, np.float64) for v in (lat1, lon1, lat2, lon2)])
+    out_shape = lat1.shape
+    lat1, lon1, lat2, lon2 = [v.ravel() for v in (lat1, lon1, lat2, lon2)]
+    f = WGS84_F
+    big_l = np.radians(lon2 - lon1)
+    u1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    su1, cu1, su2, cu2 = np.sin(u1), np.cos(u1), np.sin(u2), np.cos(u2)
+    lam = big_l.copy()
+    active = np.ones(lam.shape, bool)
+    shape = lam.shape
+    sin_sigma = np.zeros(shape)
+    cos_sigma = np.ones(shape)
+    sigma = np.zeros(shape)
+    cos2_alpha = np.ones(shape)
+    cos_2sm = np.zeros(shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(max_iter):
+            idx = np.nonzero(active)
+            if not idx[0].size:
+                break
+            sl, cl = np.sin(lam[idx]), np.cos(lam[idx])
+            a_su1, a_cu1, a_su2, a_cu2 = su1[idx], cu1[idx], su2[idx], cu2[idx]
+            ss = np.sqrt((a_cu2 * sl) ** 2 + (a_cu1 * a_su2 - a_su1 * a_cu2 * cl) ** 2)
+            cs = a_su1 * a_su2 + a_cu1 * a_cu2 * cl
+            sg = np.arctan2(ss, cs)
+            sin_alpha = np.where(ss == 0, 0.0, a_cu1 * a_cu2 * sl / ss)
+            c2a = 1 - sin_alpha ** 2
+            c2sm = np.where(c2a == 0, 0.0, cs - 2 * a_su1 * a_su2 / c2a)
+            c = f / 16 * c2a * (4 + f * (4 - 3 * c2a))
+            new = big_l[idx] + (1 - c) * f * sin_alpha * (sg + c * ss * (c2sm + c * cs * (-1 + 2 * c2sm ** 2)))
+            sin_sigma[idx], cos_sigma[idx], sigma[idx], cos2_alpha[idx], cos_2sm[idx] = ss, cs, sg, c2a, c2sm
+            done = np.abs(new - lam[idx]) <= tol
+            lam[idx] = new
+            active[idx[0][done]] = False
+        u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+        big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+        d_sigma = big_b * sin_sigma * (cos_2sm + big_b / 4 * (cos_sigma * (-1 + 2 * cos_2sm ** 2) -
+                                                             big_b / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) *
+                                                             (-3 + 4 * cos_2sm ** 2)))
+        s = WGS84_B * big_a * (sigma - d_sigma)
+    if active.any():
+        s[active] = haversine_m(lat1[active], lon1[active], lat2[active], lon2[active])
+    return s.reshape(out_shape)
+
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    '''!
+      @brief Initial great-circle bearings from the first to the second points
+      @return array, degree 0~360 clockwise from north
+    '''
+    p1 = np.radians(lat1)
+    p2 = np.radians(lat2)
+    dl = np.radians(np.subtract(lon2, lon1))
+    y = np.sin(dl) * np.cos(p2)
+    x = np.cos(p1) * np.sin(p2) - np.sin(p1) * np.cos(p2) * np.cos(dl)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+_METHODS = {'haversine': haversine_m, 'vincenty': vincenty_m}
+
+
+def consecutive_distances(lat, lon, method='haversine'):
+    '''!
+      @brief Distances between successive points of a track
+      @param method 'haversine' or 'vincenty'
+      @return array of len(lat) - 1, m
+    '''
+    lat = np.asarray(lat, np.float64)
+    lon = np.asarray(lon, np.float64)
+    return _METHODS[method](lat[:-1], lon[:-1], lat[1:], lon[1:])
+
+
+def consecutive_bearings(lat, lon):
+    '''!
+      @brief Bearings between successive points of a track
+      @return array of len(lat) - 1, degree
+    '''
+    lat = np.asarray(lat, np.float64)
+    lon = np.asarray(lon, np.float64)
+    return bearing_deg(lat[:-1], lon[:-1], lat[1:], lon[1:])
+
+
+def pairwise_distances(lat, lon, lat2=None, lon2=None, method='haversine'):
+    '''!
+      @brief Distance matrix between two point sets (or one set and itself)
+      @param method 'haversine' or 'vincenty'
+      @return array of shape (len(lat), len(lat2)), m
+    '''
+    lat = np.asarray(lat, np.float64)
+    lon = np.asarray(lon, np.float64)
+    lat2 = lat if lat2 is None else np.asarray(lat2, np.float64)
+    lon2 = lon if lon2 is None else np.asarray(lon2, np.float64)
+    return _METHODS[method](lat[:, None], lon[:, None], lat2[None, :], lon2[None, :])
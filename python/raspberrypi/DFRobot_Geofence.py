@@ -0,0 +1,289 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_Geofence.py
+    @brief Streaming enter/exit/dwell events against large sets of polygon fences
+    @details Fence bounding boxes are registered in a uniform lat/lon grid, so a fix only looks
+    @n at the fences whose box covers its cell and runs the exact ray casting test on those.
+    @n Fences covering more than max_cells cells are kept in a short list checked by box
+    @n instead, which keeps the grid small when a few fences are very large.
+    @n
+    @n Every tracked key (one per board, vehicle...) remembers the fences it is inside. An
+    @n update compares that set with the fences containing the new fix and reports the
+    @n difference as events, plus one dwell event per visit once a key stayed inside a fence
+    @n for its dwell time.
+    @n
+    @n load() replaces the fence set by diffing it against the current one: unchanged fences
+    @n keep their grid cells, only added, removed and modified fences touch the index. Keys
+    @n inside a removed fence get its exit event on their next update.
+    @n
+    @n Polygons are lists of (lat, lon) degree vertices, closed implicitly. Fences must not
+    @n cross the antimeridian.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import math
+import time
+
+ENTER = 'enter'
+EXIT = 'exit'
+DWELL = 'dwell'
+
+
+def point_in_polygon(lat, lon, points):
+    '''!
+      @brief Ray casting test
+      @param lat Latitude, degree
+      @param lon Longitude, degree
+      @param points Polygon vertices as (lat, lon)
+      @return True if the point is inside
+    '''
+    inside = False
+    lat_j, lon_j = points[-1]
+    for lat_i, lon_i in points:
+        if (lat_i > lat) != (lat_j > lat) and lon < (lon_j - lon_i) * (lat - lat_i) / (lat_j - lat_i) + lon_i:
+            inside = not inside
+        lat_j, lon_j = lat_i, lon_i
+    return inside
+
+
+def fences_from_geojson(obj, id_property='id'):
+    '''!
+      @brief Turn a GeoJSON FeatureCollection of Polygons into a load() mapping
+      @param obj Parsed GeoJSON
+      @param id_property Feature property holding the fence id, the feature id or index otherwise
+      @return dict of fence id to (lat, lon) vertices of the outer ring
+    '''
+    fences = {}
+    for i, feature in enumerate(obj.get('features', [])):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') != 'Polygon':
+            continue
+        fid = (feature.get('properties') or {}).get(id_property, feature.get('id', i))
+        ring = geometry['coordinates'][0]
+        if ring[0] == ring[-1]:
+            ring = ring[:-1]
+        fences[fid] = [(c[1], c[0]) for c in ring]
+    return fences
+
+
+class _Fence(object):
+    __slots__ = ('fid', 'points', 'dwell', 'lat_min', 'lat_max', 'lon_min', 'lon_max', 'cells')
+
+    def __init__(self, fid, points, dwell):
+        self.fid = fid
+        self.points = tuple((float(lat), float(lon)) for lat, lon in points)
+        if len(self.points) < 3:
+            raise ValueError("fence %r needs at least 3 vertices" % (fid,))
+        self.dwell = dwell
+        lats = [p[0] for p in self.points]
+        lons = [p[1] for p in self.points]
+        self.lat_min, self.lat_max = min(lats), max(lats)
+        self.lon_min, self.lon_max = min(lons), max(lons)
+        self.cells = None
+
+
+class DFRobot_Geofence(object):
+    '''!
+      @brief Grid indexed fence set with per-key enter/exit/dwell state
+    '''
+
+    def __init__(self, cell=0.01, max_cells=4096, dwell=None, min_sats=4, callback=None, clock=time.time):
+        '''!
+          @brief Constructor
+          @param cell Grid cell size, degree (0.01 is about 1.1 km of latitude)
+          @param max_cells Fences covering more cells are checked by bounding box instead
+          @param dwell Default dwell time, s, None for no dwell events
+          @param min_sats update_fix() ignores fixes with fewer satellites
+          @param callback Called with every event dict as well as returning it from update()
+          @param clock Time source when update() gets no time
+        '''
+        self.cell = float(cell)
+        self.max_cells = max_cells
+        self.dwell = dwell
+        self.min_sats = min_sats
+        self.callback = callback
+        self.__clock = clock
+        self.__fences = {}
+        self.__grid = {}
+        self.__large = {}
+        self.__keys = {}
+        self.fixes = 0
+        self.candidates = 0
+        self.tests = 0
+        self.events = 0
+
+    def __len__(self):
+        return len(self.__fences)
+
+    def add_fence(self, fid, points, dwell=None):
+        '''!
+          @brief Add a fence or replace the fence with the same id
+          @param fid Hashable fence id
+          @param points Polygon vertices as (lat, lon) degree
+          @param dwell Dwell time of this fence, s, None for the default
+        '''
+        fence = _Fence(fid, points, dwell)
+        if fid in self.__fences:
+            self.remove_fence(fid)
+        self.__fences[fid] = fence
+        rows = self.__span(fence.lat_min, fence.lat_max)
+        cols = self.__span(fence.lon_min, fence.lon_max)
+        if len(rows) * len(cols) > self.max_cells:
+            self.__large[fid] = fence
+            return
+        fence.cells = [(r, c) for r in rows for c in cols]
+        grid = self.__grid
+        for key in fence.cells:
+            bucket = grid.get(key)
+            if bucket is None:
+                grid[key] = [fence]
+            else:
+                bucket.append(fence)
+
+    def remove_fence(self, fid):
+        '''!
+          @brief Remove a fence, keys inside it get an exit event on their next update
+          @param fid Fence id
+          @return True if the fence existed
+        '''
+        fence = self.__fences.pop(fid, None)
+        if fence is None:
+            return False
+        if fence.cells is None:
+            del self.__large[fid]
+            return True
+        grid = self.__grid
+        for key in fence.cells:
+            bucket = grid[key]
+            bucket.remove(fence)
+            if not bucket:
+                del grid[key]
+        return True
+
+    def load(self, fences, dwell=None):
+        '''!
+          @brief Hot reload: make the fence set equal to fences, touching only what changed
+          @param fences dict of fence id to vertices, or to (vertices, dwell)
+          @param dwell Dwell time for fences given without one, None for the default
+          @return (added, removed, modified) counts
+        '''
+        added = removed = modified = 0
+        for fid in [fid for fid in self.__fences if fid not in fences]:
+            self.remove_fence(fid)
+            removed += 1
+        for fid, spec in fences.items():
+            if isinstance(spec, tuple) and len(spec) == 2 and not isinstance(spec[1], (tuple, list)):
+                points, fence_dwell = spec
+            else:
+                points, fence_dwell = spec, dwell
+            old = self.__fences.get(fid)
+            if old is not None:
+                if old.dwell == fence_dwell and old.points == tuple((float(a), float(b)) for a, b in points):
+                    continue
+                modified += 1
+            else:
+                added += 1
+            self.add_fence(fid, points, fence_dwell)
+        return added, removed, modified
+
+    def fences_at(self, lat, lon):
+        '''!
+          @brief Fences containing a point
+          @param lat Latitude, degree
+          @param lon Longitude, degree
+          @return set of fence ids
+        '''
+        found = set()
+        candidates = self.__grid.get((int(math.floor(lat / self.cell)), int(math.floor(lon / self.cell))), ())
+        for group in (candidates, self.__large.values()):
+            for fence in group:
+                self.candidates += 1
+                if not (fence.lat_min <= lat <= fence.lat_max and fence.lon_min <= lon <= fence.lon_max):
+                    continue
+                self.tests += 1
+                if point_in_polygon(lat, lon, fence.points):
+                    found.add(fence.fid)
+        return found
+
+    def update(self, lat, lon, key=None, t=None):
+        '''!
+          @brief Process one position
+          @param lat Latitude, degree, negative for south
+          @param lon Longitude, degree, negative for west
+          @param key Tracked object, e.g. the board or vehicle id
+          @param t Time of the position, s, None for the clock
+          @return list of event dicts with type (enter, exit, dwell), fence, key, t and for exit
+          @n      and dwell the time spent inside
+        '''
+        if t is None:
+            t = self.__clock()
+        self.fixes += 1
+        state = self.__keys.get(key)
+        if state is None:
+            state = self.__keys[key] = {}
+        now = self.fences_at(lat, lon)
+        events = []
+        for fid in [fid for fid in state if fid not in now]:
+            entered, _ = state.pop(fid)
+            events.append({'type': EXIT, 'fence': fid, 'key': key, 't': t, 'duration': t - entered})
+        for fid in now:
+            visit = state.get(fid)
+            if visit is None:
+                state[fid] = [t, False]
+                events.append({'type': ENTER, 'fence': fid, 'key': key, 't': t})
+                continue
+            if visit[1]:
+                continue
+            dwell = self.__fences[fid].dwell
+            if dwell is None:
+                dwell = self.dwell
+            if dwell is not None and t - visit[0] >= dwell:
+                visit[1] = True
+                events.append({'type': DWELL, 'fence': fid, 'key': key, 't': t, 'duration': t - visit[0]})
+        self.events += len(events)
+        if self.callback is not None:
+            for event in events:
+                self.callback(event)
+        return events
+
+    def update_fix(self, fix, key=None, t=None):
+        '''!
+          @brief Process a get_fix() result
+          @param fix dict returned by get_fix(), None and fixes with fewer than min_sats satellites are ignored
+          @param key Tracked object
+          @param t Time of the fix, s, None for the clock
+          @return list of event dicts, see update()
+        '''
+        if fix is None or fix['sats'] < self.min_sats:
+            return []
+        return self.update(fix['lat'], fix['lon'], key, t)
+
+    def inside(self, key=None):
+        '''!
+          @brief Fences a key was inside at its last update
+          @return dict of fence id to the time it entered
+        '''
+        return dict((fid, visit[0]) for fid, visit in self.__keys.get(key, {}).items())
+
+    def forget(self, key):
+        '''!
+          @brief Drop the state of a key without events
+        '''
+        self.__keys.pop(key, None)
+
+    def stats(self):
+        '''!
+          @brief Index and work counters
+          @return dict with fences, cells, large, keys, fixes, candidates (box checks), tests
+          @n      (exact polygon tests) and events
+        '''
+        return {'fences': len(self.__fences), 'cells': len(self.__grid), 'large': len(self.__large),
+                'keys': len(self.__keys), 'fixes': self.fixes, 'candidates': self.candidates,
+                'tests': self.tests, 'events': self.events}
+
+    def __span(self, lo, hi):
+        return range(int(math.floor(lo / self.cell)), int(math.floor(hi / self.cell)) + 1)
@@ -0,0 +1,138 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_I2CDev.py
+    @brief I2C access through /dev/i2c-N and the I2C_RDWR ioctl
+    @details The message array and the transfer buffers are allocated once. A register read is
+    @n a single ioctl with a write message (register address) followed by a read message, so a
+    @n block of any length up to 255 bytes costs one kernel call instead of one SMBus call per byte.
+    @n
+    @n Select it with DFRobot_GNSSAndRTC_I2C(1, backend='ioctl').
+    @n examples/i2cDevCompare.py compares reads against the smbus path.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import os
+from ctypes import Structure, POINTER, c_uint8, c_uint16, c_uint32, cast, addressof, sizeof
+
+I2C_RDWR = 0x0707  # < linux/i2c-dev.h
+I2C_M_RD = 0x0001  # < linux/i2c.h
+
+MAX_TRANSFER = 255
+
+
+class i2c_msg(Structure):
+    _fields_ = [('addr', c_uint16),
+                ('flags', c_uint16),
+                ('len', c_uint16),
+                ('buf', POINTER(c_uint8))]
+
+
+class i2c_rdwr_ioctl_data(Structure):
+    _fields_ = [('msgs', POINTER(i2c_msg)),
+                ('nmsgs', c_uint32)]
+
+
+class DFRobot_I2CDev(object):
+    '''!
+      @brief Preallocated I2C_RDWR transfers on a /dev/i2c-N node
+    '''
+
+    def __init__(self, bus=1, path=None, ioctl=None):
+        '''!
+          @brief Open the device node
+          @param bus I2C bus number, opens /dev/i2c-<bus>
+          @param path Explicit device node path, overrides bus
+          @param ioctl ioctl function, defaults to fcntl.ioctl
+        '''
+        if ioctl is None:
+            import fcntl
+            ioctl = fcntl.ioctl
+        self.__ioctl = ioctl
+        self.__fd = os.open(path or "/dev/i2c-%d" % bus, os.O_RDWR)
+        self.__wbuf = (c_uint8 * (MAX_TRANSFER + 1))()
+        self.__rbuf = (c_uint8 * MAX_TRANSFER)()
+        self.__msgs = (i2c_msg * 2)()
+        self.__msgs[0].buf = cast(addressof(self.__wbuf), POINTER(c_uint8))
+        self.__msgs[1].buf = cast(addressof(self.__rbuf), POINTER(c_uint8))
+        self.__msgs[1].flags = I2C_M_RD
+        self.__xfer = i2c_rdwr_ioctl_data()
+        self.__xfer.msgs = cast(addressof(self.__msgs), POINTER(i2c_msg))
+        self.__probe = i2c_rdwr_ioctl_data()
+        self.__probe.msgs = cast(addressof(self.__msgs) + sizeof(i2c_msg), POINTER(i2c_msg))
+        self.__probe.nmsgs = 1
+        self.ioctls = 0
+
+    def write_reg(self, addr, reg, p_buf, size):
+        '''!
+          @brief Write a register block in one message
+          @param addr 7-bit device address
+          @param reg Register address
+          @param p_buf Data to write
+          @param size Number of bytes from p_buf, 1~255
+        '''
+        if not 0 < size <= MAX_TRANSFER:
+            raise ValueError("size must be 1~%d" % MAX_TRANSFER)
+        wbuf = self.__wbuf
+        wbuf[0] = reg
+        for i in range(size):
+            wbuf[i + 1] = p_buf[i]
+        msg = self.__msgs[0]
+        msg.addr = addr
+        msg.flags = 0
+        msg.len = size + 1
+        self.__transfer(1)
+
+    def read_reg(self, addr, reg, p_buf, size):
+        '''!
+          @brief Set the register pointer and read a block in one combined transfer
+          @param addr 7-bit device address
+          @param reg Register address
+          @param p_buf Storage for the data read
+          @param size Number of bytes to read, 1~255
+        '''
+        if not 0 < size <= MAX_TRANSFER:
+            raise ValueError("size must be 1~%d" % MAX_TRANSFER)
+        self.__wbuf[0] = reg
+        msgs = self.__msgs
+        msgs[0].addr = addr
+        msgs[0].flags = 0
+        msgs[0].len = 1
+        msgs[1].addr = addr
+        msgs[1].len = size
+        self.__transfer(2)
+        rbuf = self.__rbuf
+        for i in range(size):
+            p_buf[i] = rbuf[i]
+
+    def probe(self, addr):
+        '''!
+          @brief Read one byte to check that the device answers
+          @param addr 7-bit device address
+          @return bool
+        '''
+        msg = self.__msgs[1]
+        msg.addr = addr
+        msg.len = 1
+        self.ioctls += 1
+        try:
+            self.__ioctl(self.__fd, I2C_RDWR, self.__probe)
+            return True
+        except (IOError, OSError):
+            return False
+
+    def close(self):
+        '''!
+          @brief Close the device node
+        '''
+        if self.__fd is not None:
+            os.close(self.__fd)
+            self.__fd = None
+
+    def __transfer(self, nmsgs):
+        self.__xfer.nmsgs = nmsgs
+        self.ioctls += 1
+        self.__ioctl(self.__fd, I2C_RDWR, self.__xfer)
@@ -0,0 +1,208 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_NMEABatch.py
+    @brief Parse archived get_all_gnss captures on all cores
+    @details Capture files are raw get_all_gnss output appended to a file. They are cut into
+    @n byte ranges that end on sentence boundaries, and each range is parsed by a worker of a
+    @n ProcessPoolExecutor. A worker reads its range from the file itself and returns its fixes
+    @n as column arrays (array.array tobytes), so the only data crossing process boundaries are
+    @n a handful of flat byte strings per shard. The shards are concatenated in file order and
+    @n only re-sorted by time when that order is not monotonic.
+    @n
+    @n One fix is produced per RMC sentence with a valid checksum. Altitude, satellites, fix
+    @n quality and HDOP come from the GGA sentence with the same UTC time when there is one.
+    @n
+    @n examples/parseCaptures.py runs it from the command line.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import itertools
+import operator
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from src.timeconv import to_epoch
+
+# name, array typecode
+COLUMNS = (('epoch', 'd'), ('lat', 'd'), ('lon', 'd'), ('alt', 'd'), ('sog', 'f'), ('cog', 'f'),
+           ('hdop', 'f'), ('sats', 'B'), ('quality', 'B'))
+
+SHARDS_PER_JOB = 4  # < More shards than workers keeps every core busy until the end
+MIN_SHARD = 1 << 20
+NAN = float('nan')
+
+
+def _checksum_ok(line):
+    star = line.rfind(b'*')
+    if star < 0 or len(line) < star + 3:
+        return False
+    crc = 0
+    for c in bytearray(line[1:star]):
+        crc ^= c
+    try:
+        return crc == int(line[star + 1:star + 3], 16)
+    except ValueError:
+        return False
+
+
+def _degree(value, hemisphere):
+    if not value:
+        return NAN
+    dot = value.find(b'.')
+    deg = int(value[:dot - 2]) + float(value[dot - 2:]) / 60.0
+    return -deg if hemisphere in (b'S', b'W') else deg
+
+
+def _float(value):
+    return float(value) if value else NAN
+
+
+def parse_range(path, start, end):
+    '''!
+      @brief Parse the sentences of a byte range of a capture
+      @param path Capture file
+      @param start First byte, the start of a line
+      @param end Byte after the range, the start of a line or the file size
+      @return (dict of column name to bytes, dict with sentences, fixes, bad_checksum)
+    '''
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    cols = dict((name, array(code)) for name, code in COLUMNS)
+    epoch_a, lat_a, lon_a, alt_a = cols['epoch'].append, cols['lat'].append, cols['lon'].append, cols['alt'].append
+    sog_a, cog_a, hdop_a = cols['sog'].append, cols['cog'].append, cols['hdop'].append
+    sats_a, quality_a = cols['sats'].append, cols['quality'].append
+    gga = {}
+    sentences = bad = 0
+    for line in data.split(b'\n'):
+        line = line.strip(b'\r\x00 ')
+        if len(line) < 7 or line[:1] != b'$':
+            continue
+        kind = line[3:6]
+        if kind != b'RMC' and kind != b'GGA':
+            continue
+        sentences += 1
+        if not _checksum_ok(line):
+            bad += 1
+            continue
+        f = line[:line.rfind(b'*')].split(b',')
+        try:
+            if kind == b'GGA':
+                if len(f) >= 10:
+                    gga = {f[1]: (int(f[6] or 0), int(f[7] or 0), _float(f[8]), _float(f[9]))}
+                continue
+            if len(f) < 10 or len(f[9]) != 6 or len(f[1]) < 6:
+                continue
+            t, d = f[1], f[9]
+            epoch = to_epoch(2000 + int(d[4:6]), int(d[2:4]), int(d[0:2]), int(t[0:2]), int(t[2:4]), 0) + float(t[4:])
+            quality, sats, hdop, alt = gga.get(t, (0, 0, NAN, NAN))
+            epoch_a(epoch)
+            lat_a(_degree(f[3], f[4]))
+            lon_a(_degree(f[5], f[6]))
+            alt_a(alt)
+            sog_a(_float(f[7]))
+            cog_a(_float(f[8]))
+            hdop_a(hdop)
+            sats_a(min(sats, 255))
+            quality_a(min(quality, 255) if f[2] == b'A' else 0)
+        except (ValueError, IndexError):
+            bad += 1
+    out = dict((name, cols[name].tobytes()) for name, _ in COLUMNS)
+    return out, {'sentences': sentences, 'fixes': len(cols['epoch']), 'bad': bad}
+
+
+def split_file(path, shards):
+    '''!
+      @brief Cut a capture into byte ranges that start and end on line boundaries
+      @param path Capture file
+      @param shards Number of ranges wanted
+      @return list of (path, start, end)
+    '''
+    size = os.path.getsize(path)
+    step = max(MIN_SHARD, size // max(1, shards) + 1)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            end = start + step
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                # Move to the start of the next line; RMC and its GGA stay within one shard
+                # unless the cut falls between them, costing at most one fix's GGA fields
+                f.readline()
+                end = f.tell()
+            ranges.append((path, start, end))
+            start = end
+    return ranges
+
+
+class FixColumns(object):
+    '''!
+      @brief Time-ordered fixes as column arrays
+    '''
+
+    def __init__(self):
+        for name, code in COLUMNS:
+            setattr(self, name, array(code))
+        self.stats = {'sentences': 0, 'fixes': 0, 'bad': 0, 'shards': 0}
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def rows(self):
+        '''!
+          @brief Iterate over the fixes as tuples in COLUMNS order
+        '''
+        return zip(*[getattr(self, name) for name, _ in COLUMNS])
+
+    def write_csv(self, path):
+        '''!
+          @brief Write the fixes as CSV
+          @param path Output file
+        '''
+        with open(path, 'w') as f:
+            f.write(','.join(name for name, _ in COLUMNS) + '\n')
+            for row in self.rows():
+                f.write('%.3f,%.7f,%.7f,%.2f,%.2f,%.2f,%.2f,%d,%d\n' % row)
+
+
+def parse_captures(paths, jobs=None):
+    '''!
+      @brief Parse capture files on several processes and merge the fixes in time order
+      @param paths list of capture files
+      @param jobs Worker processes, None for one per core, 1 to parse in this process
+      @return FixColumns
+    '''
+    jobs = jobs or os.cpu_count() or 1
+    ranges = []
+    for path in paths:
+        ranges.extend(split_file(path, jobs * SHARDS_PER_JOB))
+    if jobs == 1:
+        results = [parse_range(*r) for r in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(parse_range, *zip(*ranges))) if ranges else []
+    result = FixColumns()
+    for cols, stats in results:
+        for key in ('sentences', 'fixes', 'bad'):
+            result.stats[key] += stats[key]
+        result.stats['shards'] += 1
+        for name, _ in COLUMNS:
+            getattr(result, name).frombytes(cols[name])
+    epoch = result.epoch
+    if not all(map(operator.le, epoch, itertools.islice(epoch, 1, None))):
+        # Shards and files are mostly sorted runs already, which timsort merges in near-linear time
+        order = sorted(range(len(epoch)), key=epoch.__getitem__)
+        for name, code in COLUMNS:
+            column = getattr(result, name)
+            setattr(result, name, array(code, [column[i] for i in order]))
+    return result
@@ -0,0 +1,303 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_RTCDrift.py
+    @brief Calibrate the RTC from GNSS only when its predicted error exceeds a budget
+    @details The crystal rate error is modelled as a quadratic in temperature:
+    @n   rate(T) = c0 + c1 * (T - 25) + c2 * (T - 25)^2   (ppm)
+    @n update() samples get_temperature_c() and integrates the predicted error since the last
+    @n calibration. Before each calibration the actual RTC-vs-GNSS offset is measured. Over an
+    @n interval the offset is linear in the coefficients:
+    @n   offset = 1e-6 * (c0 * S0 + c1 * S1 + c2 * S2),  Sk = integral of (T - 25)^k dt
+    @n so every calibration adds one exact least-squares observation, whatever the temperature
+    @n did in between. The fit is anchored by a prior on a typical 32.768 kHz tuning fork crystal
+    @n (c2 = -0.034 ppm/C^2) and the spread of the observed rates sets the uncertainty.
+    @n calib_rtc() is only triggered when |predicted| + confidence * uncertainty reaches the
+    @n budget, or after max_interval. Model and running integrals are stored in a JSON file so a
+    @n restart does not lose them; the time the process was down is integrated at the last
+    @n temperature.
+    @n
+    @n The offset is measured from the second transitions of both clocks against the system
+    @n clock, so it resolves well below one second. It is measured again right after each
+    @n calibration, and the drift of an interval is counted from that baseline, so a constant
+    @n latency of the GNSS time registers cancels out.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import logging
+import math
+import os
+import time
+
+from DFRobot_GNSSUtil import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+DRIFT_STATE = os.path.join(os.path.expanduser("~"), ".dfrobot_rtc_drift.json")
+DRIFT_STATE_VERSION = 1
+
+T_REF = 25.0
+# Prior mean and standard deviation of c0 (ppm), c1 (ppm/C) and c2 (ppm/C^2)
+PRIOR_MEAN = (0.0, 0.0, -0.034)
+PRIOR_SIGMA = (20.0, 0.5, 0.01)
+DEFAULT_RATE_SIGMA = 5.0  # < ppm, rate uncertainty until two observations exist
+MAX_OBSERVATIONS = 64
+
+
+def _solve3(a, b):
+    '''!
+      @brief Solve a 3x3 linear system with partial pivoting
+    '''
+    m = [list(a[i]) + [b[i]] for i in range(3)]
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda r: abs(m[r][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(col + 1, 3):
+            f = m[r][col] / m[col][col]
+            for c in range(col, 4):
+                m[r][c] -= f * m[col][c]
+    x = [0.0] * 3
+    for r in (2, 1, 0):
+        x[r] = (m[r][3] - sum(m[r][c] * x[c] for c in range(r + 1, 3))) / m[r][r]
+    return x
+
+
+class DFRobot_RTCDrift(object):
+    '''!
+      @brief Temperature-aware drift estimator that schedules GNSS calibration
+    '''
+
+    def __init__(self, rtc, path=DRIFT_STATE, budget=0.5, confidence=2.0, max_interval=7 * 86400,
+                 calib_timeout=120, clock=time.time, sleep=time.sleep):
+        '''!
+          @brief Constructor, loads the persisted state
+          @param rtc DFRobot_GNSSAndRTC instance, after begin()
+          @param path State file, None to keep the model in memory only
+          @param budget Largest acceptable RTC error, s
+          @param confidence Uncertainty multiples added to the predicted error
+          @param max_interval Calibrate at least this often, s
+          @param calib_timeout Give up on a calibration session after this many s
+          @param clock Time source, for tests
+          @param sleep Sleep function, for tests
+        '''
+        self.__rtc = rtc
+        self.path = path
+        self.budget = budget
+        self.confidence = confidence
+        self.max_interval = max_interval
+        self.calib_timeout = calib_timeout
+        self.__clock = clock
+        self.__sleep = sleep
+        self.coeffs = list(PRIOR_MEAN)
+        self.rate_sigma = DEFAULT_RATE_SIGMA
+        self.observations = []
+        self.integrals = [0.0, 0.0, 0.0]
+        self.last_calib = None
+        self.baseline = None
+        self.last_sample = None
+        self.last_temp = None
+        self.calibrations = 0
+        self.failed = 0
+        self.__load()
+
+    def start(self):
+        '''!
+          @brief Switch off the fixed-interval calibration and calibrate once if nothing is known yet
+          @return bool, False if the first calibration failed
+        '''
+        self.__rtc.calib_rtc_hour(0)
+        if self.last_calib is None:
+            return self.calibrate()
+        self.update()
+        return True
+
+    def update(self):
+        '''!
+          @brief Sample the temperature, advance the prediction and calibrate if it is due
+          @n     Call it every few minutes, the integral follows the temperature at that resolution.
+          @return float type, the predicted RTC error after this update, s
+        '''
+        self.__sample()
+        if self.due():
+            self.calibrate()
+        return self.predicted_error()
+
+    def due(self):
+        '''!
+          @brief Whether the error budget or max_interval is used up
+        '''
+        if self.last_calib is None:
+            return True
+        if self.__clock() - self.last_calib >= self.max_interval:
+            return True
+        return abs(self.predicted_error()) + self.confidence * self.uncertainty() >= self.budget
+
+    def predicted_error(self):
+        '''!
+          @brief Predicted RTC minus GNSS time since the last calibration, s
+        '''
+        return 1e-6 * sum(c * s for c, s in zip(self.coeffs, self.integrals))
+
+    def uncertainty(self):
+        '''!
+          @brief Standard deviation of the prediction, s
+        '''
+        return 1e-6 * self.rate_sigma * self.integrals[0]
+
+    def rate_ppm(self, temperature):
+        '''!
+          @brief Modelled rate error at a temperature
+          @param temperature degree Celsius
+          @return float, ppm, positive when the RTC runs fast
+        '''
+        d = temperature - T_REF
+        return self.coeffs[0] + self.coeffs[1] * d + self.coeffs[2] * d * d
+
+    def calibrate(self):
+        '''!
+          @brief Measure the offset, learn from it and calibrate the RTC from GNSS
+          @return bool, True if the calibration completed
+        '''
+        self.__sample()
+        offset = self.measure_offset()
+        rtc = self.__rtc
+        rtc.calib_rtc()
+        start = self.__clock()
+        status = rtc.EUNDER_CALIB
+        while self.__clock() - start < self.calib_timeout:
+            self.__sleep(1)
+            status = rtc.calib_status()
+            if status != rtc.EUNDER_CALIB:
+                break
+        if status != rtc.ECALIB_COMPLETE:
+            if status == rtc.EUNDER_CALIB:
+                rtc.calib_status(False)
+            self.failed += 1
+            logger.warning("RTC calibration did not complete, predicted error %.3f s", self.predicted_error())
+            self.__save()
+            return False
+        # Only a completed calibration closes the interval the offset was measured over
+        if offset is not None and self.last_calib is not None and self.integrals[0] > 0:
+            self.observations.append({'s': list(self.integrals), 'offset': offset - (self.baseline or 0.0)})
+            del self.observations[:-MAX_OBSERVATIONS]
+            self.__fit()
+        self.calibrations += 1
+        self.last_calib = self.__clock()
+        self.integrals = [0.0, 0.0, 0.0]
+        # The offset right after calibrating is what the next interval drifts away from
+        self.baseline = self.measure_offset()
+        self.__save()
+        return True
+
+    def measure_offset(self, window=2.5):
+        '''!
+          @brief Measure RTC minus GNSS time from the second transitions of both clocks
+          @param window Sampling time, must cover a transition of each clock, s
+          @return float type, offset in s, None without a valid GNSS time
+        '''
+        rtc = self.__rtc
+        edges = {}
+        previous = {}
+        end = self.__clock() + window
+        while self.__clock() < end and len(edges) < 2:
+            for name, read in (('rtc', rtc.get_rtc_epoch), ('gnss', rtc.get_gnss_epoch)):
+                if name in edges:
+                    continue
+                before = self.__clock()
+                value = read()
+                after = self.__clock()
+                if value is None:
+                    return None
+                if name in previous and value != previous[name][0]:
+                    # The tick happened between the previous sample and this one
+                    edges[name] = value - (previous[name][1] + after) / 2.0
+                previous[name] = (value, before)
+        if len(edges) < 2:
+            logger.warning("No second transition seen within %.1f s", window)
+            return None
+        return edges['rtc'] - edges['gnss']
+
+    def stats(self):
+        '''!
+          @brief Get the model state
+          @return dict with coeffs (ppm), rate_sigma (ppm), observations, calibrations, failed,
+          @n      predicted (s), uncertainty (s) and since_calib (s)
+        '''
+        return {
+            'coeffs': list(self.coeffs),
+            'rate_sigma': self.rate_sigma,
+            'observations': len(self.observations),
+            'calibrations': self.calibrations,
+            'failed': self.failed,
+            'predicted': self.predicted_error(),
+            'uncertainty': self.uncertainty(),
+            'since_calib': None if self.last_calib is None else self.__clock() - self.last_calib,
+        }
+
+    def __sample(self):
+        now = self.__clock()
+        temp = self.__rtc.get_temperature_c()
+        if temp > 127:
+            temp -= 256
+        if self.last_sample is not None and self.last_calib is not None and now > self.last_sample:
+            # Trapezoid over the samples, the time the process was down uses the last temperature
+            dt = now - self.last_sample
+            d0 = self.last_temp - T_REF
+            d1 = temp - T_REF
+            self.integrals[0] += dt
+            self.integrals[1] += dt * (d0 + d1) / 2.0
+            self.integrals[2] += dt * (d0 * d0 + d1 * d1) / 2.0
+        self.last_sample = now
+        self.last_temp = temp
+        self.__save()
+
+    def __fit(self):
+        precision = [1.0 / (s * s) for s in PRIOR_SIGMA]
+        ata = [[precision[i] if i == j else 0.0 for j in range(3)] for i in range(3)]
+        atb = [precision[i] * PRIOR_MEAN[i] for i in range(3)]
+        # Observations in ppm*s, weighted by the measurement precision of the offset
+        weight = 1.0 / (0.05 * 1e6) ** 2
+        for obs in self.observations:
+            s = obs['s']
+            for i in range(3):
+                atb[i] += weight * s[i] * obs['offset'] * 1e6
+                for j in range(3):
+                    ata[i][j] += weight * s[i] * s[j]
+        self.coeffs = _solve3(ata, atb)
+        if len(self.observations) >= 2:
+            residuals = [(obs['offset'] * 1e6 - sum(c * v for c, v in zip(self.coeffs, obs['s']))) / obs['s'][0]
+                         for obs in self.observations]
+            self.rate_sigma = max(0.1, math.sqrt(sum(r * r for r in residuals) / (len(residuals) - 1)))
+
+    def __load(self):
+        state = load_state(self.path, DRIFT_STATE_VERSION)
+        if state is None:
+            return
+        self.coeffs = state['coeffs']
+        self.rate_sigma = state['rate_sigma']
+        self.observations = state['observations']
+        self.integrals = state['integrals']
+        self.last_calib = state['last_calib']
+        self.baseline = state['baseline']
+        self.last_sample = state['last_sample']
+        self.last_temp = state['last_temp']
+        self.calibrations = state.get('calibrations', 0)
+
+    def __save(self):
+        if not self.path:
+            return
+        state = {
+            'coeffs': self.coeffs,
+            'rate_sigma': self.rate_sigma,
+            'observations': self.observations,
+            'integrals': self.integrals,
+            'last_calib': self.last_calib,
+            'baseline': self.baseline,
+            'last_sample': self.last_sample,
+            'last_temp': self.last_temp,
+            'calibrations': self.calibrations,
+        }
+        save_state(self.path, DRIFT_STATE_VERSION, state, "drift state")
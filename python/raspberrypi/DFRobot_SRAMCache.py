@@ -0,0 +1,255 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_SRAMCache.py
+    @brief Write-back cache for the SD3031 user SRAM
+    @details Reads are served from a mirror of 0x30~0x71 loaded once. Writes only touch the
+    @n mirror and mark the bytes dirty; dirty bytes are written back in coalesced bursts
+    @n on flush(), when the interpreter exits and, if flush_interval is set, on a timer.
+    @n The cache shares the board's bus_lock, so a timed write-back running on its background
+    @n thread holds the bus for the whole flush and never interleaves with transfers of
+    @n other threads. Like DFRobot_SRAMStore it leaves out 0x2C~0x2F, as 0x2E/0x2F are the
+    @n module's RTC read window registers.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import atexit
+import threading
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+def _close_at_exit(ref):
+    cache = ref()
+    if cache is not None:
+        cache.close()
+
+
+class DFRobot_SRAMCache(object):
+    '''!
+      @brief Write-back cache with the same read_sram/write_sram/clear_sram interface as the driver
+    '''
+    MERGE_GAP = 4  # < Clean bytes up to this gap are rewritten to save a bus frame
+
+    def __init__(self, rtc, flush_interval=None, verify=False):
+        '''!
+          @brief Constructor
+          @param rtc DFRobot_GNSSAndRTC instance
+          @param flush_interval Seconds between automatic write-backs from a timer thread, None to flush
+          @n     manually only
+          @param verify Read every flushed range back and keep it dirty if it does not match
+        '''
+        self.__rtc = rtc
+        self.__base = rtc.SD3031_SRAM_FREE_START
+        self.__size = rtc.SD3031_SRAM_END - rtc.SD3031_SRAM_FREE_START + 1
+        self.__mirror = [0x00] * self.__size
+        self.__dirty = [False] * self.__size
+        self.__loaded = False
+        self.__verify = verify
+        # One lock with the board, so a flush and other threads' transfers cannot interleave
+        self.__lock = rtc.bus_lock
+        self.__interval = flush_interval
+        self.__timer = None
+        self.__closed = False
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.flush_frames = 0
+        self.flush_bytes = 0
+        self.verify_errors = 0
+        # Only a weak reference, so the exit hook does not keep a dropped cache alive
+        atexit.register(_close_at_exit, weakref.ref(self))
+        self.__schedule()
+
+    def read_sram(self, addr):
+        '''!
+          @brief read the SRAM
+          @param addr 0x30~0x71
+          @return data stored in the SRAM, 0 if the mirror could not be loaded as the driver returns on a
+          @n      failed read
+        '''
+        data = self.read_sram_block(addr, 1)
+        if data is None:
+            return 0x00
+        return data[0]
+
+    def read_sram_block(self, addr, n):
+        '''!
+          @brief read a block of the SRAM
+          @param addr 0x30~0x71, start address
+          @param n Number of bytes to read
+          @return list of bytes, None if the mirror could not be loaded
+        '''
+        self.__check(addr, n)
+        with self.__lock:
+            if not self.__loaded:
+                self.misses += 1
+                if not self.__load():
+                    return None
+            else:
+                self.hits += 1
+            i = addr - self.__base
+            return self.__mirror[i:i + n]
+
+    def write_sram(self, addr, data):
+        '''!
+          @brief write the SRAM
+          @param addr 0x30~0x71
+          @param data uint8_t HEX
+        '''
+        self.write_sram_block(addr, [data])
+
+    def write_sram_block(self, addr, data):
+        '''!
+          @brief write a block of the SRAM, the bytes are written back on the next flush
+          @param addr 0x30~0x71, start address
+          @param data list of uint8_t
+        '''
+        self.__check(addr, len(data))
+        with self.__lock:
+            i = addr - self.__base
+            for j, b in enumerate(data):
+                b &= 0xff
+                if not self.__loaded or self.__mirror[i + j] != b:
+                    self.__mirror[i + j] = b
+                    self.__dirty[i + j] = True
+
+    def clear_sram(self, addr):
+        '''!
+          @brief clear the SRAM
+          @param addr 0x30~0x71
+        '''
+        self.write_sram_block(addr, [0xff])
+
+    def dirty_ranges(self):
+        '''!
+          @brief Get the ranges that the next flush will write
+          @return list of (address, length) tuples
+        '''
+        with self.__lock:
+            return [(self.__base + i, n) for i, n in self.__runs()]
+
+    def flush(self):
+        '''!
+          @brief Write all dirty bytes back to the SRAM
+          @return uint8_t type, 0 on success, 1 if some ranges are still dirty
+        '''
+        with self.__lock:
+            runs = self.__runs()
+            if not runs:
+                return 0
+            self.flushes += 1
+            ret = 0
+            for i, n in runs:
+                data = self.__mirror[i:i + n]
+                for j in range(i, i + n):
+                    self.__dirty[j] = False
+                ok = self.__rtc.write_sram_block(self.__base + i, data) == 0
+                self.flush_frames += 1
+                self.flush_bytes += n
+                if ok and self.__verify:
+                    ok = self.__rtc.read_sram_block(self.__base + i, n) == data
+                    if not ok:
+                        self.verify_errors += 1
+                if not ok:
+                    for j in range(i, i + n):
+                        self.__dirty[j] = True
+                    ret = 1
+            if ret:
+                logger.warning("SRAM write-back incomplete, dirty bytes kept for the next flush")
+            return ret
+
+    def invalidate(self):
+        '''!
+          @brief Drop the mirror so the next read reloads it, dirty bytes are flushed first
+        '''
+        with self.__lock:
+            self.flush()
+            self.__loaded = False
+
+    def stats(self):
+        '''!
+          @brief Get cache counters
+          @return dict with hits, misses, flushes, flush_frames, flush_bytes, verify_errors
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'flushes': self.flushes,
+            'flush_frames': self.flush_frames,
+            'flush_bytes': self.flush_bytes,
+            'verify_errors': self.verify_errors,
+        }
+
+    def close(self):
+        '''!
+          @brief Stop the flush timer and write back everything still dirty
+        '''
+        self.__closed = True
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        self.flush()
+
+    def __load(self):
+        data = self.__rtc.read_sram_block(self.__base, self.__size)
+        if data is None:
+            return False
+        # Bytes written before the first load are newer than what the chip holds
+        for i in range(self.__size):
+            if not self.__dirty[i]:
+                self.__mirror[i] = data[i]
+        self.__loaded = True
+        return True
+
+    def __runs(self):
+        '''!
+          @brief Coalesce dirty bytes into write frames
+          @details Clean gaps of up to MERGE_GAP bytes are absorbed into the frame when the
+          @n mirror holds their real value, which is cheaper than a second frame.
+        '''
+        runs = []
+        i = 0
+        while i < self.__size:
+            if not self.__dirty[i]:
+                i += 1
+                continue
+            start = i
+            end = i + 1
+            while end < self.__size:
+                if self.__dirty[end]:
+                    end += 1
+                    continue
+                gap = end
+                while gap < self.__size and not self.__dirty[gap] and gap - end < self.MERGE_GAP:
+                    gap += 1
+                if self.__loaded and gap < self.__size and self.__dirty[gap]:
+                    end = gap
+                else:
+                    break
+            runs.append((start, end - start))
+            i = end
+        return runs
+
+    def __schedule(self):
+        if self.__closed or not self.__interval:
+            return
+        self.__timer = threading.Timer(self.__interval, self.__tick)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __tick(self):
+        try:
+            self.flush()
+        finally:
+            self.__schedule()
+
+    def __check(self, addr, n):
+        if n <= 0 or addr < self.__base or addr + n > self.__base + self.__size:
+            raise ValueError("SRAM block 0x%02X+%d is outside 0x%02X~0x%02X" %
+                             (addr, n, self.__base, self.__base + self.__size - 1))
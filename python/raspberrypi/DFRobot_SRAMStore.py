@@ -0,0 +1,183 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_SRAMStore.py
+    @brief Typed key-value store kept in the SD3031 user SRAM
+    @details The 0x30~0x71 region is split into two slots. Every commit goes to the older slot
+    @n together with an incremented sequence number and a CRC-8, so a torn write never destroys
+    @n the last good record and consecutive commits alternate between the two slots.
+    @n 0x2E and 0x2F are shared with the module's RTC read window registers, which every RTC
+    @n read rewrites, so the store stays clear of 0x2C~0x2F unless told otherwise.
+    @n Only the bytes that differ from what the target slot already holds are written.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import struct
+
+CRC8_POLY = 0x31
+
+
+def _make_crc8_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ CRC8_POLY) & 0xff
+            else:
+                crc = (crc << 1) & 0xff
+        table.append(crc)
+    return table
+
+
+CRC8_TABLE = _make_crc8_table()
+
+
+def crc8(data, crc=0xff):
+    '''!
+      @brief CRC-8 (poly 0x31, init 0xFF)
+      @param data Iterable of uint8_t
+      @param crc Initial value
+      @return uint8_t CRC
+    '''
+    for b in data:
+        crc = CRC8_TABLE[(crc ^ b) & 0xff]
+    return crc
+
+
+class DFRobot_SRAMStore(object):
+    '''!
+      @brief Typed key-value store over the RTC SRAM
+      @details Slot layout: [seq][payload ...][crc8]. The CRC is seeded with a hash of the
+      @n field schema, so changing the schema makes old records read back as empty.
+    '''
+    SLOT_OVERHEAD = 2  # < sequence byte + crc byte
+
+    def __init__(self, rtc, fields, start=None, end=None):
+        '''!
+          @brief Constructor
+          @param rtc DFRobot_GNSSAndRTC instance providing read_sram_block/write_sram_block
+          @param fields list of (name, struct format char, default value), e.g. ('boot_count', 'H', 0)
+          @param start First SRAM address used, defaults to 0x30 (0x2E/0x2F are the RTC read
+          @n     window registers)
+          @param end Last SRAM address used, defaults to 0x71
+        '''
+        self.__rtc = rtc
+        self.__start = rtc.SD3031_SRAM_FREE_START if start is None else start
+        self.__end = rtc.SD3031_SRAM_END if end is None else end
+        self.__names = [f[0] for f in fields]
+        self.__defaults = dict((f[0], f[2]) for f in fields)
+        self.__struct = struct.Struct('<' + ''.join(f[1] for f in fields))
+        self.__slot_len = (self.__end - self.__start + 1) // 2
+        if self.__struct.size + self.SLOT_OVERHEAD > self.__slot_len:
+            raise ValueError("schema needs %d bytes, a slot holds %d" %
+                             (self.__struct.size + self.SLOT_OVERHEAD, self.__slot_len))
+        schema = ','.join('%s:%s' % (f[0], f[1]) for f in fields)
+        self.__seed = crc8(bytearray(schema.encode('utf-8')))
+        self.__values = dict(self.__defaults)
+        self.__images = [None, None]
+        self.__active = None
+        self.__seq = 0
+
+    def load(self):
+        '''!
+          @brief Read both slots and keep the newest valid record
+          @return bool, True if a valid record was found, False if defaults are in use
+        '''
+        raw = self.__rtc.read_sram_block(self.__start, self.__slot_len * 2)
+        if raw is None:
+            return False
+        valid = []
+        for slot in range(2):
+            image = raw[slot * self.__slot_len:(slot + 1) * self.__slot_len]
+            self.__images[slot] = image
+            if self.__check(image):
+                valid.append(slot)
+        if not valid:
+            self.__values = dict(self.__defaults)
+            self.__active = None
+            return False
+        slot = valid[0]
+        if len(valid) == 2:
+            # Sequence numbers wrap, the newer slot is at most 127 steps ahead
+            if ((self.__images[1][0] - self.__images[0][0]) & 0xff) < 0x80:
+                slot = 1
+        image = self.__images[slot]
+        payload = bytearray(image[1:1 + self.__struct.size])
+        self.__values = dict(zip(self.__names, self.__struct.unpack(bytes(payload))))
+        self.__active = slot
+        self.__seq = image[0]
+        return True
+
+    def get(self, name):
+        '''!
+          @brief Get a value
+          @param name Field name
+          @return The stored value, or its default
+        '''
+        return self.__values[name]
+
+    def set(self, name, value):
+        '''!
+          @brief Set a value, call commit() to persist it
+          @param name Field name
+          @param value New value
+        '''
+        if name not in self.__values:
+            raise KeyError(name)
+        self.__values[name] = value
+
+    def items(self):
+        '''!
+          @brief Get all values
+          @return dict of field name to value
+        '''
+        return dict(self.__values)
+
+    def commit(self):
+        '''!
+          @brief Write the current values to the older slot
+          @return uint8_t type, 0 on success, 1 on failure
+        '''
+        target = 0 if self.__active in (None, 1) else 1
+        seq = (self.__seq + 1) & 0xff
+        payload = bytearray(self.__struct.pack(*[self.__values[n] for n in self.__names]))
+        image = [seq] + list(payload)
+        image.append(crc8(image, self.__seed))
+        old = self.__images[target]
+        addr = self.__start + target * self.__slot_len
+        if old is None:
+            lo, hi = 0, len(image) - 1
+        else:
+            diff = [i for i in range(len(image)) if image[i] != old[i]]
+            lo, hi = (diff[0], diff[-1]) if diff else (0, -1)
+        # The slot may already hold exactly this image, then only the bookkeeping moves
+        if hi >= lo and self.__rtc.write_sram_block(addr + lo, image[lo:hi + 1]) == 1:
+            self.__images[target] = None
+            return 1
+        if old is None:
+            old = [0xff] * self.__slot_len
+        self.__images[target] = image + list(old[len(image):])
+        self.__active = target
+        self.__seq = seq
+        return 0
+
+    def erase(self):
+        '''!
+          @brief Invalidate both slots and fall back to the defaults
+          @return uint8_t type, 0 on success, 1 on failure
+        '''
+        n = self.__struct.size
+        image = [0xff] * self.__slot_len
+        image[1 + n] = crc8(image[:1 + n], self.__seed) ^ 0xff
+        self.__values = dict(self.__defaults)
+        self.__images = [None, None]
+        self.__active = None
+        return self.__rtc.write_sram_block(self.__start, image * 2)
+
+    def __check(self, image):
+        n = self.__struct.size
+        return crc8(image[:1 + n], self.__seed) == image[1 + n]
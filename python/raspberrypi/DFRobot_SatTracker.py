@@ -0,0 +1,229 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_SatTracker.py
+    @brief Per-satellite elevation, azimuth and SNR history from the GSV sentences of get_all_gnss
+    @details Feed the raw get_all_gnss output (chunks may split sentences anywhere). Every
+    @n completed GSV group of a constellation is one epoch: each satellite it lists gets one
+    @n sample in its own fixed-size ring (array.array columns for time, elevation, azimuth and
+    @n SNR). Sum and sum of squares of the SNRs in each ring are updated as samples enter and
+    @n leave, so mean and standard deviation cost O(1), a history query costs O(window), and
+    @n memory is bounded by window * number of satellites whatever the uptime.
+    @n
+    @n Satellites are keyed by (constellation, PRN). The constellation comes from the talker
+    @n ID: GP GPS, BD/GB BeiDou, GL GLONASS, GA Galileo, GQ QZSS.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import math
+import time
+from array import array
+
+GPS = 'GPS'
+BEIDOU = 'BeiDou'
+GLONASS = 'GLONASS'
+GALILEO = 'Galileo'
+QZSS = 'QZSS'
+
+TALKERS = {b'GP': GPS, b'BD': BEIDOU, b'GB': BEIDOU, b'GL': GLONASS, b'GA': GALILEO, b'GQ': QZSS}
+
+NO_SNR = 0xff  # < Stored for satellites in view but not tracked (empty SNR field)
+
+
+def constellations_for_mode(mode):
+    '''!
+      @brief Constellations enabled by a set_gnss()/get_gnss_mode() value
+      @param mode 1~7, bit 0 GPS, bit 1 BeiDou, bit 2 GLONASS
+      @return set of constellation names
+    '''
+    return set(name for bit, name in ((1, GPS), (2, BEIDOU), (4, GLONASS)) if mode & bit)
+
+
+class _Ring(object):
+    '''!
+      @brief Fixed-size sample history of one satellite with running SNR sums
+    '''
+    __slots__ = ('t', 'elev', 'az', 'snr', 'pos', 'count', 'snr_n', 'snr_sum', 'snr_sq', 'last_seen')
+
+    def __init__(self, window):
+        self.t = array('d', [0.0]) * window
+        self.elev = array('b', [0]) * window
+        self.az = array('H', [0]) * window
+        self.snr = array('B', [0]) * window
+        self.pos = 0
+        self.count = 0
+        self.snr_n = 0
+        self.snr_sum = 0
+        self.snr_sq = 0
+        self.last_seen = 0.0
+
+    def push(self, t, elev, az, snr):
+        pos = self.pos
+        if self.count == len(self.t):
+            old = self.snr[pos]
+            if old != NO_SNR:
+                self.snr_n -= 1
+                self.snr_sum -= old
+                self.snr_sq -= old * old
+        else:
+            self.count += 1
+        self.t[pos] = t
+        self.elev[pos] = elev
+        self.az[pos] = az
+        self.snr[pos] = snr
+        if snr != NO_SNR:
+            self.snr_n += 1
+            self.snr_sum += snr
+            self.snr_sq += snr * snr
+        self.pos = (pos + 1) % len(self.t)
+        self.last_seen = t
+
+    def ordered(self):
+        size = len(self.t)
+        start = (self.pos - self.count) % size
+        return [(start + i) % size for i in range(self.count)]
+
+
+class DFRobot_SatTracker(object):
+    '''!
+      @brief Streaming GSV aggregator with bounded per-satellite history
+    '''
+
+    def __init__(self, window=300, constellations=None, max_satellites=256, clock=time.time):
+        '''!
+          @brief Constructor
+          @param window Samples kept per satellite
+          @param constellations Set of constellation names to keep, None for all, see constellations_for_mode()
+          @param max_satellites Most satellites tracked, the longest unseen one is dropped first
+          @param clock Time source for the sample times
+        '''
+        self.window = window
+        self.constellations = constellations
+        self.max_satellites = max_satellites
+        self.__clock = clock
+        self.__rings = {}
+        self.__pending = bytearray()
+        self.__groups = {}
+        self.epochs = 0
+        self.bad = 0
+
+    def feed(self, data):
+        '''!
+          @brief Consume raw get_all_gnss output
+          @param data bytes, bytearray or list of byte values, sentences may span calls
+        '''
+        self.__pending += bytearray(data)
+        end = self.__pending.rfind(b'\n')
+        if end < 0:
+            return
+        lines = bytes(self.__pending[:end])
+        del self.__pending[:end + 1]
+        for line in lines.split(b'\n'):
+            line = line.strip(b'\r\x00 ')
+            if line[3:6] == b'GSV' and line[:1] == b'$':
+                self.__gsv(line)
+
+    def callback(self, data, length):
+        '''!
+          @brief set_callback() compatible entry point
+        '''
+        self.feed(data[:length])
+
+    def satellites(self, constellation=None):
+        '''!
+          @brief Latest sample of every satellite
+          @param constellation Only this constellation, None for all
+          @return list of dict with constellation, prn, t, elev, az, snr (None if not tracked)
+        '''
+        result = []
+        for (name, prn), ring in sorted(self.__rings.items()):
+            if constellation is not None and name != constellation:
+                continue
+            i = (ring.pos - 1) % self.window
+            snr = ring.snr[i]
+            result.append({'constellation': name, 'prn': prn, 't': ring.t[i], 'elev': ring.elev[i],
+                           'az': ring.az[i], 'snr': None if snr == NO_SNR else snr})
+        return result
+
+    def history(self, prn, constellation=GPS):
+        '''!
+          @brief Sample history of one satellite, oldest first
+          @param prn Satellite number
+          @param constellation Constellation name
+          @return list of (t, elev, az, snr) with snr None when not tracked, empty if unknown
+        '''
+        ring = self.__rings.get((constellation, prn))
+        if ring is None:
+            return []
+        return [(ring.t[i], ring.elev[i], ring.az[i], None if ring.snr[i] == NO_SNR else ring.snr[i])
+                for i in ring.ordered()]
+
+    def snr_history(self, prn, constellation=GPS):
+        '''!
+          @brief SNR history of one satellite, oldest first
+          @return list of (t, snr) with snr None when not tracked
+        '''
+        return [(t, snr) for t, _, _, snr in self.history(prn, constellation)]
+
+    def stats(self, prn, constellation=GPS):
+        '''!
+          @brief Rolling SNR statistics over the window of one satellite
+          @return dict with samples, tracked (samples with SNR), snr_mean, snr_std (dB-Hz) and
+          @n      last_seen, None if the satellite is unknown
+        '''
+        ring = self.__rings.get((constellation, prn))
+        if ring is None:
+            return None
+        n = ring.snr_n
+        mean = ring.snr_sum / float(n) if n else None
+        std = math.sqrt(max(0.0, ring.snr_sq / float(n) - mean * mean)) if n else None
+        return {'samples': ring.count, 'tracked': n, 'snr_mean': mean, 'snr_std': std, 'last_seen': ring.last_seen}
+
+    def __gsv(self, line):
+        star = line.rfind(b'*')
+        if star < 0:
+            self.bad += 1
+            return
+        crc = 0
+        for c in bytearray(line[1:star]):
+            crc ^= c
+        try:
+            if crc != int(line[star + 1:star + 3], 16):
+                self.bad += 1
+                return
+            f = line[1:star].split(b',')
+            constellation = TALKERS.get(f[0][:2])
+            if constellation is None or (self.constellations is not None and constellation not in self.constellations):
+                return
+            total, number = int(f[1]), int(f[2])
+            sats = self.__groups.setdefault(constellation, [])
+            if number == 1:
+                del sats[:]
+            # Groups of four fields per satellite, optionally followed by the NMEA 4.1 signal ID
+            body = f[4:]
+            for i in range(0, len(body) - 3, 4):
+                if body[i]:
+                    sats.append((int(body[i]), int(body[i + 1] or 0), int(body[i + 2] or 0),
+                                 int(body[i + 3]) if body[i + 3] else NO_SNR))
+        except (ValueError, IndexError):
+            self.bad += 1
+            return
+        if number == total:
+            self.__commit(constellation, sats)
+            del sats[:]
+
+    def __commit(self, constellation, sats):
+        t = self.__clock()
+        self.epochs += 1
+        for prn, elev, az, snr in sats:
+            key = (constellation, prn)
+            ring = self.__rings.get(key)
+            if ring is None:
+                if len(self.__rings) >= self.max_satellites:
+                    stale = min(self.__rings, key=lambda k: self.__rings[k].last_seen)
+                    del self.__rings[stale]
+                ring = self.__rings[key] = _Ring(self.window)
+            ring.push(t, max(-90, min(90, elev)), az % 360, min(snr, NO_SNR))
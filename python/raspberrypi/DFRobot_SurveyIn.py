@@ -0,0 +1,208 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_SurveyIn.py
+    @brief Survey-in of a fixed antenna position with streaming mean and covariance
+    @details Fixes are projected onto a local east/north/up frame around the first one and
+    @n folded into Welford's running mean and co-moment matrix, so the survey keeps nine
+    @n numbers however long it runs. The 95 % confidence radius of the mean is taken from the
+    @n major axis of the horizontal covariance divided by the effective number of samples.
+    @n GNSS errors are correlated over tens of seconds, so consecutive fixes are not treated
+    @n as independent: the effective count is capped at one per correlation_time seconds.
+    @n
+    @n The survey completes once min_duration passed and the radius is below the target, or
+    @n at max_duration with whatever radius was reached. The result is written to a JSON file
+    @n and loaded by later instances, which then skip the survey.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import math
+import os
+import time
+
+from DFRobot_GNSSUtil import METERS_PER_DEGREE_LAT, load_state, save_state
+
+SURVEY_STATE = os.path.join(os.path.expanduser("~"), ".dfrobot_survey_in.json")
+SURVEY_STATE_VERSION = 1
+
+K95_2D = 2.4477  # < sqrt of the chi-square 2 dof 95 % quantile
+
+
+class DFRobot_SurveyIn(object):
+    '''!
+      @brief Averages fixes of a static receiver until the mean is precise enough
+    '''
+
+    def __init__(self, gnss=None, path=SURVEY_STATE, target=1.0, min_duration=300.0, max_duration=86400.0,
+                 correlation_time=120.0, min_sats=4, clock=time.time):
+        '''!
+          @brief Constructor
+          @param gnss DFRobot_GNSSAndRTC board for run(), None to feed fixes with add()
+          @param path Result file, None to keep the result in memory only
+          @param target 95 % horizontal confidence radius that ends the survey, m
+          @param min_duration Shortest survey, s
+          @param max_duration Longest survey, s, it then ends above the target
+          @param correlation_time Seconds per independent sample, about twice the time constant of the fix error
+          @param min_sats Fixes with fewer satellites are ignored
+          @param clock Time source, s
+        '''
+        self.gnss = gnss
+        self.path = path
+        self.target = target
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.correlation_time = correlation_time
+        self.min_sats = min_sats
+        self.__clock = clock
+        self.result = None
+        self.reset()
+        self.__load()
+
+    @property
+    def done(self):
+        '''!
+          @brief True once a survey result exists, measured now or loaded from the file
+        '''
+        return self.result is not None
+
+    def reset(self):
+        '''!
+          @brief Start a new survey, the previous result is kept until the new one completes
+        '''
+        self.n = 0
+        self.__origin = None
+        self.__start = None
+        self.__last = None
+        self.__mean = [0.0, 0.0, 0.0]
+        # Co-moments ee, en, eu, nn, nu, uu
+        self.__m2 = [0.0] * 6
+
+    def clear(self):
+        '''!
+          @brief Forget the result and delete the file so the next boot surveys again
+        '''
+        self.result = None
+        self.reset()
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def add(self, fix, t=None):
+        '''!
+          @brief Feed one fix
+          @param fix dict in the format of get_fix(), None is ignored
+          @param t Time of the fix, s, None for the clock
+          @return True once the survey is complete, the result is in result
+        '''
+        if fix is None or fix['sats'] < self.min_sats:
+            return False
+        if t is None:
+            t = self.__clock()
+        if self.__origin is None:
+            lat0 = fix['lat']
+            self.__origin = (lat0, fix['lon'], fix['alt'],
+                             METERS_PER_DEGREE_LAT * math.cos(math.radians(lat0)))
+            self.__start = t
+        lat0, lon0, alt0, m_lon = self.__origin
+        x = (((fix['lon'] - lon0 + 180.0) % 360.0 - 180.0) * m_lon,
+             (fix['lat'] - lat0) * METERS_PER_DEGREE_LAT,
+             fix['alt'] - alt0)
+        self.n += 1
+        self.__last = t
+        mean = self.__mean
+        before = [x[i] - mean[i] for i in range(3)]
+        for i in range(3):
+            mean[i] += before[i] / self.n
+        after = [x[i] - mean[i] for i in range(3)]
+        m2 = self.__m2
+        m2[0] += before[0] * after[0]
+        m2[1] += before[0] * after[1]
+        m2[2] += before[0] * after[2]
+        m2[3] += before[1] * after[1]
+        m2[4] += before[1] * after[2]
+        m2[5] += before[2] * after[2]
+
+        duration = t - self.__start
+        if duration < self.min_duration or self.n < 3:
+            return False
+        radius = self.radius()
+        if radius > self.target and duration < self.max_duration:
+            return False
+        self.result = self.status()
+        self.result['complete'] = radius <= self.target
+        self.__save()
+        return True
+
+    def radius(self):
+        '''!
+          @brief 95 % horizontal confidence radius of the current mean
+          @return m, infinity with fewer than two samples
+        '''
+        if self.n < 2:
+            return float('inf')
+        ee, en, nn = self.__m2[0] / (self.n - 1), self.__m2[1] / (self.n - 1), self.__m2[3] / (self.n - 1)
+        major = (ee + nn) / 2 + math.sqrt(((ee - nn) / 2) ** 2 + en * en)
+        return K95_2D * math.sqrt(major / self.__effective())
+
+    def status(self):
+        '''!
+          @brief Current survey state
+          @return dict with lat, lon (degree), alt (m), radius (m, 95 % horizontal), alt_sigma
+          @n      (m, standard error of the mean altitude), cov (sample covariance
+          @n      [ee, en, eu, nn, nu, uu], m^2), samples, effective_samples and duration (s),
+          @n      None before the first fix
+        '''
+        if self.__origin is None:
+            return None
+        lat0, lon0, alt0, m_lon = self.__origin
+        e, n, u = self.__mean
+        cov = [v / (self.n - 1) for v in self.__m2] if self.n > 1 else [0.0] * 6
+        effective = self.__effective()
+        return {
+            'lat': lat0 + n / METERS_PER_DEGREE_LAT,
+            'lon': (lon0 + e / m_lon + 180.0) % 360.0 - 180.0,
+            'alt': alt0 + u,
+            'radius': self.radius(),
+            'alt_sigma': math.sqrt(cov[5] / effective),
+            'cov': cov,
+            'samples': self.n,
+            'effective_samples': effective,
+            'duration': self.__last - self.__start,
+        }
+
+    def run(self, interval=1.0, progress=None):
+        '''!
+          @brief Survey with the board until complete, skipped if a result exists
+          @param interval Seconds between fix reads
+          @param progress Called with status() after every new fix
+          @return result dict, see status(), plus complete (False if max_duration ended it)
+        '''
+        stamp = None
+        while self.result is None:
+            start = time.time()
+            fix = self.gnss.get_fix()
+            if fix is not None and (fix['hour'], fix['minute'], fix['second']) != stamp:
+                stamp = (fix['hour'], fix['minute'], fix['second'])
+                if not self.add(fix) and progress is not None and self.n:
+                    progress(self.status())
+            if self.result is None:
+                time.sleep(max(0.0, interval - (time.time() - start)))
+        return self.result
+
+    def __effective(self):
+        if self.correlation_time <= 0 or self.__last is None:
+            return float(self.n)
+        return float(min(self.n, 1 + (self.__last - self.__start) / self.correlation_time))
+
+    def __load(self):
+        state = load_state(self.path, SURVEY_STATE_VERSION)
+        if state is not None:
+            self.result = state['result']
+
+    def __save(self):
+        save_state(self.path, SURVEY_STATE_VERSION, {'result': self.result}, "survey result")
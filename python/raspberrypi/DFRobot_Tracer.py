@@ -0,0 +1,227 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_Tracer.py
+    @brief Timeline tracing of driver calls, exported as Chrome trace_event JSON
+    @details attach() wraps the public methods and _read_reg/_write_reg of one board instance and
+    @n records each call as a complete ('X') event in a bounded ring. The driver modules sleep
+    @n through their module-level time, which is replaced while any tracer is attached; a sleep
+    @n is recorded by the tracer whose board call is running on the same thread, so other
+    @n boards in the process are not traced. Nested calls nest on the timeline: a public
+    @n method contains its register calls, which contain their settle sleeps. The self time
+    @n of a register call is bus I/O and UART spin-waiting; the self time of a public method
+    @n is Python decoding.
+    @n
+    @n Nothing is wrapped until attach() is called and detach() restores the originals (time
+    @n once the last tracer detached), so a board that is not traced runs the plain driver code.
+    @n It can be combined with DFRobot_BusRecorder on the same board in any attach/detach order:
+    @n a wrapper another tool wrapped in the meantime stays installed and only passes calls on.
+    @n Open the exported file in chrome://tracing or https://ui.perfetto.dev.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+from DFRobot_GNSSUtil import install_hook, remove_hook
+
+CAT_API = 'api'
+CAT_BUS = 'bus'
+CAT_SLEEP = 'sleep'
+
+# Bookkeeping helpers called from inside the transports, not worth an event each
+SKIP = frozenset(['invalidate_reg_cache', 'bypass_reg_cache', 'reg_cache_stats', 'breaker_state',
+                  'int_to_bytes'])
+
+# Tracer of the traced board call running on this thread
+_active = threading.local()
+# Driver modules using _TracedTime, with the number of attached tracers that need it
+_patched = {}
+_patched_lock = threading.Lock()
+
+
+class _TracedTime(object):
+    '''!
+      @brief Stands in for the time module inside the driver modules while tracing
+    '''
+
+    def __init__(self, real):
+        self.__real = real
+
+    def sleep(self, seconds):
+        tracer = getattr(_active, 'tracer', None)
+        if tracer is None:
+            return self.__real.sleep(seconds)
+        start = self.__real.time()
+        self.__real.sleep(seconds)
+        tracer.add('sleep', CAT_SLEEP, start, self.__real.time() - start, {'s': seconds})
+
+    def __getattr__(self, name):
+        return getattr(self.__real, name)
+
+
+_traced_time = _TracedTime(time)
+
+
+class DFRobot_Tracer(object):
+    '''!
+      @brief Records nested driver calls in a ring buffer
+    '''
+
+    def __init__(self, capacity=100000):
+        '''!
+          @brief Constructor
+          @param capacity Most events kept, older events are dropped first
+        '''
+        self.__events = collections.deque(maxlen=capacity)
+        self.__pid = os.getpid()
+        self.__board = None
+        self.__wrapped = []
+        self.__modules = []
+
+    def attach(self, board):
+        '''!
+          @brief Start tracing a board
+          @param board DFRobot_GNSSAndRTC instance
+          @return board
+        '''
+        if self.__board is not None:
+            self.detach()
+        self.__board = board
+        for name in dir(type(board)):
+            if name in SKIP or (name.startswith('_') and name not in ('_read_reg', '_write_reg')):
+                continue
+            func = getattr(board, name, None)
+            if not callable(func) or isinstance(func, type):
+                continue
+            cat = CAT_BUS if name.startswith('_') else CAT_API
+            self.__wrapped.append(install_hook(board, name, self.__wrap(board, name, cat, func)))
+        with _patched_lock:
+            for cls in type(board).__mro__:
+                module = sys.modules.get(cls.__module__)
+                if module is None or module in self.__modules:
+                    continue
+                if module in _patched:
+                    _patched[module] += 1
+                elif getattr(module, 'time', None) is time:
+                    module.time = _traced_time
+                    _patched[module] = 1
+                else:
+                    continue
+                self.__modules.append(module)
+        return board
+
+    def detach(self):
+        '''!
+          @brief Stop tracing and restore the plain driver code
+        '''
+        board, self.__board = self.__board, None
+        for token in self.__wrapped:
+            remove_hook(board, token)
+        with _patched_lock:
+            for module in self.__modules:
+                _patched[module] -= 1
+                if not _patched[module]:
+                    del _patched[module]
+                    module.time = time
+        self.__wrapped = []
+        self.__modules = []
+
+    def add(self, name, cat, start, duration, args=None):
+        '''!
+          @brief Record a complete event
+          @param name Event name
+          @param cat Category
+          @param start Start time, time.time() seconds
+          @param duration Duration, s
+          @param args Optional dict shown with the event
+        '''
+        self.__events.append((name, cat, start, duration, threading.current_thread().ident, args))
+
+    def clear(self):
+        '''!
+          @brief Drop all recorded events
+        '''
+        self.__events.clear()
+
+    def summary(self):
+        '''!
+          @brief Total and self time per event name
+          @return dict of name to {'calls', 'total', 'self'} in seconds
+        '''
+        events = sorted(self.__events, key=lambda e: (e[4], e[2], -e[3]))
+        result = {}
+        stack = []
+        for name, cat, start, duration, tid, args in events:
+            while stack and (stack[-1][4] != tid or stack[-1][2] + stack[-1][3] <= start):
+                stack.pop()
+            if stack:
+                result[stack[-1][0]]['self'] -= duration
+            entry = result.setdefault(name, {'calls': 0, 'total': 0.0, 'self': 0.0})
+            entry['calls'] += 1
+            entry['total'] += duration
+            entry['self'] += duration
+            stack.append((name, cat, start, duration, tid))
+        return result
+
+    def export_chrome(self, path):
+        '''!
+          @brief Write the events as Chrome trace_event JSON
+          @param path Output file
+        '''
+        events = []
+        for name, cat, start, duration, tid, args in self.__events:
+            event = {
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': start * 1e6,
+                'dur': duration * 1e6,
+                'pid': self.__pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def __wrap(self, board, name, cat, func):
+        add = self.add
+        clock = time.time
+        if cat == CAT_BUS:
+            @functools.wraps(func)
+            def bus_call(reg, p_buf, size):
+                if self.__board is not board:
+                    return func(reg, p_buf, size)
+                outer = getattr(_active, 'tracer', None)
+                _active.tracer = self
+                start = clock()
+                try:
+                    return func(reg, p_buf, size)
+                finally:
+                    add(name, cat, start, clock() - start, {'reg': '0x%02X' % reg, 'size': size})
+                    _active.tracer = outer
+            return bus_call
+
+        @functools.wraps(func)
+        def api_call(*args, **kwargs):
+            if self.__board is not board:
+                return func(*args, **kwargs)
+            outer = getattr(_active, 'tracer', None)
+            _active.tracer = self
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(name, cat, start, clock() - start)
+                _active.tracer = outer
+        return api_call
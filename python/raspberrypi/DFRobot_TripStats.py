@@ -0,0 +1,226 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_TripStats.py
+    @brief Streaming trip analytics: odometer, stop/start detection and speed statistics
+    @details Every fix updates a fixed set of running values, so each update costs O(1) time
+    @n and memory whatever the length of a trip:
+    @n   distance   haversine sum between consecutive fixes while moving
+    @n   motion     sog above start_speed for start_time starts moving, sog below stop_speed
+    @n              for stop_time stops; between the two thresholds the state is kept
+    @n   speed      Welford mean and variance of the moving samples, maximum of all samples
+    @n A trip starts with the first motion and ends once the board stayed stopped for
+    @n trip_end seconds; its summary is returned by update() (and passed to the callback)
+    @n right then, with the trip end set to the moment the final stop began.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import math
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from DFRobot_GNSSUtil import haversine_m
+from src.timeconv import to_epoch
+
+
+class _Trip(object):
+    '''!
+      @brief Running values of one trip
+    '''
+    __slots__ = ('start', 'start_lat', 'start_lon', 'distance', 'moving_time', 'stops',
+                 'n', 'mean', 'm2', 'max_speed', 'samples')
+
+    def __init__(self, t, lat, lon):
+        self.start = t
+        self.start_lat = lat
+        self.start_lon = lon
+        self.distance = 0.0
+        self.moving_time = 0.0
+        self.stops = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max_speed = 0.0
+        self.samples = 0
+
+    def add_speed(self, sog):
+        self.n += 1
+        delta = sog - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (sog - self.mean)
+
+    def summary(self, end, lat, lon):
+        duration = end - self.start
+        return {
+            'start': self.start,
+            'end': end,
+            'duration': duration,
+            'distance': self.distance,
+            'moving_time': self.moving_time,
+            'idle_time': max(0.0, duration - self.moving_time),
+            'stops': self.stops,
+            'max_speed': self.max_speed,
+            'mean_speed': self.mean if self.n else 0.0,
+            'speed_std': math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0,
+            'start_lat': self.start_lat,
+            'start_lon': self.start_lon,
+            'end_lat': lat,
+            'end_lon': lon,
+            'samples': self.samples,
+        }
+
+
+class DFRobot_TripStats(object):
+    '''!
+      @brief Incremental trip detection and statistics over a fix stream
+    '''
+
+    def __init__(self, start_speed=3.0, stop_speed=1.0, start_time=5.0, stop_time=10.0, trip_end=300.0,
+                 max_gap=30.0, min_sats=4, callback=None, clock=time.time):
+        '''!
+          @brief Constructor
+          @param start_speed sog that counts as motion, knot
+          @param stop_speed sog that counts as stopped, knot, below start_speed for hysteresis
+          @param start_time Seconds of motion that start moving
+          @param stop_time Seconds stopped that stop moving
+          @param trip_end Seconds stopped that end the trip
+          @param max_gap Longer intervals between fixes add neither moving time nor speed samples
+          @param min_sats Fixes with fewer satellites are ignored
+          @param callback Called with every trip summary
+          @param clock Time source for fixes without a valid UTC date
+        '''
+        if stop_speed > start_speed:
+            raise ValueError("stop_speed must not exceed start_speed")
+        self.start_speed = start_speed
+        self.stop_speed = stop_speed
+        self.start_time = start_time
+        self.stop_time = stop_time
+        self.trip_end = trip_end
+        self.max_gap = max_gap
+        self.min_sats = min_sats
+        self.callback = callback
+        self.__clock = clock
+        self.moving = False
+        self.trips = 0
+        self.__done = 0.0
+        self.__trip = None
+        self.__pending = None
+        self.__since = None
+        self.__stopped_at = None
+        self.__last = None
+
+    @property
+    def odometer(self):
+        '''!
+          @brief Distance of all trips including the current one, m
+        '''
+        return self.__done + (self.__trip.distance if self.__trip is not None else 0.0)
+
+    def update(self, fix, t=None):
+        '''!
+          @brief Process one fix
+          @param fix dict in the format of get_fix(), None is ignored
+          @param t Time of the fix, s, None for its UTC time
+          @return Summary dict of the trip that just ended, None otherwise, see summary fields in current()
+        '''
+        if fix is None or fix['sats'] < self.min_sats:
+            return None
+        if t is None:
+            t = self.__fix_time(fix)
+        lat, lon, sog = fix['lat'], fix['lon'], fix['sog']
+        last = self.__last
+        self.__last = (t, lat, lon)
+        if last is not None and t <= last[0]:
+            return None
+        dt = t - last[0] if last is not None else 0.0
+        step = haversine_m(last[1], last[2], lat, lon) if last is not None else 0.0
+
+        # Motion state with hysteresis; a trip candidate collects values until motion is confirmed
+        if not self.moving:
+            if sog >= self.start_speed:
+                if self.__since is None:
+                    self.__since = t
+                    if self.__trip is None:
+                        self.__pending = _Trip(t, lat, lon)
+                        step = dt = 0.0
+                if t - self.__since >= self.start_time:
+                    self.moving = True
+                    self.__since = None
+                    if self.__trip is None:
+                        self.__trip, self.__pending = self.__pending, None
+                        self.trips += 1
+                    else:
+                        self.__trip.stops += 1
+                    self.__stopped_at = None
+            else:
+                self.__since = None
+                self.__pending = None
+        elif sog <= self.stop_speed:
+            if self.__since is None:
+                self.__since = t
+            if t - self.__since >= self.stop_time:
+                self.moving = False
+                self.__stopped_at = self.__since
+                self.__since = None
+        else:
+            self.__since = None
+
+        trip = self.__trip if self.__trip is not None else self.__pending
+        if trip is None:
+            return None
+        trip.samples += 1
+        trip.max_speed = max(trip.max_speed, sog)
+        if sog > self.stop_speed:
+            trip.distance += step
+            if dt <= self.max_gap:
+                trip.moving_time += dt
+                trip.add_speed(sog)
+        if trip is self.__trip and self.__stopped_at is not None and t - self.__stopped_at >= self.trip_end:
+            return self.__finish(self.__stopped_at, lat, lon)
+        return None
+
+    def flush(self, t=None):
+        '''!
+          @brief End the current trip now, e.g. at shutdown
+          @param t End time, s, None for the time of the last fix
+          @return Summary dict, None without a trip
+        '''
+        if self.__trip is None:
+            return None
+        last = self.__last
+        end = t if t is not None else (self.__stopped_at or last[0])
+        return self.__finish(end, last[1], last[2])
+
+    def current(self):
+        '''!
+          @brief Summary of the trip in progress
+          @return dict with start, end (s), duration, moving_time, idle_time (s), distance (m),
+          @n      stops, max_speed, mean_speed, speed_std (knot), start_lat, start_lon, end_lat,
+          @n      end_lon (degree) and samples, None without a trip
+        '''
+        if self.__trip is None:
+            return None
+        t, lat, lon = self.__last
+        return self.__trip.summary(t, lat, lon)
+
+    def __finish(self, end, lat, lon):
+        trip = self.__trip
+        self.__trip = None
+        self.__stopped_at = None
+        self.moving = False
+        self.__since = None
+        self.__done += trip.distance
+        summary = trip.summary(end, lat, lon)
+        if self.callback is not None:
+            self.callback(summary)
+        return summary
+
+    def __fix_time(self, fix):
+        if fix['year'] < 2000 or not 1 <= fix['month'] <= 12 or not 1 <= fix['date'] <= 31:
+            return self.__clock()
+        return to_epoch(fix['year'], fix['month'], fix['date'], fix['hour'], fix['minute'], fix['second'])
@@ -0,0 +1,259 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file DFRobot_UARTPipeline.py
+    @brief Pipelined register reads over the UART transport
+    @details Queued reads are sent as bursts of up to `window` read frames (0xBB reg len) back to
+    @n back, so a burst costs about one round trip instead of one per register. The module
+    @n answers in order with exactly `len` bytes and no header, so responses are matched to
+    @n requests FIFO by byte count. Each request is handed back as a concurrent.futures.Future.
+    @n
+    @n Because responses carry no framing, a lost response can only be told apart from a slow
+    @n one by the total byte count. Results are therefore released per burst: if the burst comes
+    @n up short before the timeout, or brings extra bytes, the engine waits for the line to go
+    @n quiet, drops the input buffer and re-queues the whole burst (up to `retries` times per
+    @n request).
+    @n
+    @n RTC registers (0x30~0x79) are read through the RTC read window, which the module has to
+    @n refill between commands. Such a read always starts a new burst, preceded by the window
+    @n command and the settle time.
+    @n
+    @n Given the board, every burst holds its bus_lock from the first frame sent until the
+    @n responses are in or the line is resynced, so other threads using the board's register
+    @n functions are served between bursts. Bursts also go through the board's circuit breaker:
+    @n while it is open they fail fast, and lost responses count as bus failures.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+UART0_READ_REGBUF = 0xBB
+UART0_WRITE_REGBUF = 0xCC
+REG_RTC_READ_REG = 0x2E
+
+
+class _Request(object):
+    __slots__ = ('reg', 'size', 'future', 'buf', 'tries')
+
+    def __init__(self, reg, size):
+        self.reg = reg
+        self.size = size
+        self.future = Future()
+        self.buf = bytearray()
+        self.tries = 0
+
+
+class DFRobot_UARTPipeline(object):
+    '''!
+      @brief Keeps up to `window` register reads in flight on one serial port
+    '''
+
+    def __init__(self, serial, window=4, timeout=0.2, retries=1, settle=0.05, quiet=0.02, board=None):
+        '''!
+          @brief Constructor
+          @param serial Open pyserial port, owned by the caller
+          @param window Most read frames in flight at once
+          @param timeout Seconds each response may take on top of its transfer time at the port's baud
+          @n     rate, counted from the end of the previous one
+          @param retries How often a request is re-sent after a resync
+          @param settle Wait after the RTC read window command, s
+          @param quiet Line idle time that ends a resync, s
+          @param board DFRobot_GNSSAndRTC_UART owning the port, whose bus_lock and circuit breaker
+          @n     the bursts use, None if nothing else uses the port
+        '''
+        self.__serial = serial
+        self.__board = board
+        self.__bus_lock = board.bus_lock if board is not None else threading.RLock()
+        self.window = window
+        self.timeout = timeout
+        self.retries = retries
+        self.settle = settle
+        self.quiet = quiet
+        self.__pending = collections.deque()
+        self.__cond = threading.Condition()
+        self.__thread = None
+        self.__running = False
+        self.resyncs = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, reg, size):
+        '''!
+          @brief Queue a register read
+          @param reg Register address
+          @param size Number of bytes, 1~255
+          @return concurrent.futures.Future resolving to a list of bytes, or raising IOError
+        '''
+        if not 0 < size <= 0xff:
+            raise ValueError("size must be 1~255")
+        req = _Request(reg, size)
+        with self.__cond:
+            if not self.__running:
+                self.__start()
+            self.__pending.append(req)
+            self.__cond.notify()
+        return req.future
+
+    def read_many(self, requests):
+        '''!
+          @brief Read several register blocks with one pipelined round
+          @param requests list of (reg, size)
+          @return list of byte lists, in request order
+        '''
+        futures = [self.submit(reg, size) for reg, size in requests]
+        return [f.result() for f in futures]
+
+    def stats(self):
+        '''!
+          @brief Get pipeline counters
+          @return dict with completed, failed, resyncs and the number of queued requests
+        '''
+        with self.__cond:
+            return {
+                'completed': self.completed,
+                'failed': self.failed,
+                'resyncs': self.resyncs,
+                'pending': len(self.__pending),
+            }
+
+    def close(self):
+        '''!
+          @brief Stop the worker, requests still queued fail with IOError
+        '''
+        with self.__cond:
+            self.__running = False
+            self.__cond.notify()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        for req in self.__pending:
+            self.__fail(req, IOError("UART pipeline closed"))
+        self.__pending.clear()
+
+    def __start(self):
+        self.__running = True
+        self.__thread = threading.Thread(target=self.__run, name="DFRobot_UARTPipeline")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                while self.__running and not self.__pending:
+                    self.__cond.wait()
+                if not self.__running:
+                    return
+                burst = self.__take_burst()
+            board = self.__board
+            failed = []
+            with self.__bus_lock:
+                if board is not None and not board._bus_allowed():
+                    ok = False
+                    failed = [(req, IOError("Bus circuit breaker open, register 0x%02X not read" % req.reg))
+                              for req in burst]
+                else:
+                    self.__send(burst)
+                    ok = self.__receive(burst)
+                    if not ok:
+                        failed = self.__resync(burst)
+                    if board is not None and ok:
+                        board._bus_ok()
+                    elif board is not None:
+                        board._bus_failed("Read: UART pipeline response lost, please check the peripherals!")
+            # Futures are completed outside the lock, their callbacks may use the board
+            if ok:
+                for req in burst:
+                    self.completed += 1
+                    req.future.set_result(list(req.buf))
+            for req, exc in failed:
+                self.__fail(req, exc)
+
+    def __take_burst(self):
+        burst = []
+        while self.__pending and len(burst) < self.window:
+            req = self.__pending[0]
+            # Only the first read of a burst may use the RTC read window
+            if burst and 0x30 <= req.reg <= 0x79:
+                break
+            burst.append(self.__pending.popleft())
+        return burst
+
+    def __send(self, burst):
+        first = burst[0]
+        if 0x30 <= first.reg <= 0x79:
+            self.__serial.write(bytearray([UART0_WRITE_REGBUF, REG_RTC_READ_REG, 2, first.reg, first.size]))
+            time.sleep(self.settle)
+        frames = bytearray()
+        for req in burst:
+            req.tries += 1
+            req.buf = bytearray()
+            frames += bytearray([UART0_READ_REGBUF, req.reg, req.size])
+        self.__serial.write(frames)
+
+    def __receive(self, burst):
+        '''!
+          @brief Collect the burst's responses
+          @return bool, True when every request got exactly its bytes
+        '''
+        index = 0
+        deadline = self.__deadline(burst[0])
+        while index < len(burst):
+            waiting = self.__serial.in_waiting
+            if not waiting:
+                if time.time() >= deadline:
+                    return False
+                time.sleep(0.001)
+                continue
+            data = bytearray(self.__serial.read(waiting))
+            pos = 0
+            while pos < len(data):
+                if index == len(burst):
+                    # More bytes than requested, the stream is not aligned
+                    return False
+                req = burst[index]
+                take = min(req.size - len(req.buf), len(data) - pos)
+                req.buf += data[pos:pos + take]
+                pos += take
+                if len(req.buf) == req.size:
+                    index += 1
+                    # Each response gets the full timeout from the end of the previous one
+                    if index < len(burst):
+                        deadline = self.__deadline(burst[index])
+        return True
+
+    def __deadline(self, req):
+        # Like the driver: fixed allowance plus 10 bits per byte at the current baud rate
+        return time.time() + self.timeout + req.size * 10.0 / self.__serial.baudrate
+
+    def __resync(self, burst):
+        self.resyncs += 1
+        # Let stray bytes of the lost exchange arrive, then drop them
+        last = -1
+        while True:
+            time.sleep(self.quiet)
+            waiting = self.__serial.in_waiting
+            if waiting == last:
+                break
+            last = waiting
+        self.__serial.reset_input_buffer()
+        retry = []
+        failed = []
+        for req in burst:
+            if req.tries > self.retries:
+                failed.append((req, IOError("UART response lost for register 0x%02X" % req.reg)))
+            else:
+                retry.append(req)
+        with self.__cond:
+            self.__pending.extendleft(reversed(retry))
+        return failed
+
+    def __fail(self, req, exc):
+        self.failed += 1
+        if not req.future.done():
+            req.future.set_exception(exc)
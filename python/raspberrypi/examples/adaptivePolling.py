@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  adaptivePolling.py
+  @brief Poll the fix fast while moving and slowly while parked, powering the GNSS down when idle
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import sys
+import time
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_GNSSScheduler import DFRobot_GNSSScheduler
+
+#I2C_UART_FLAG = "I2C"
+I2C_UART_FLAG = "UART"
+if I2C_UART_FLAG == "I2C":
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_I2C
+    gnss = DFRobot_GNSSAndRTC_I2C(1)
+else:
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+    gnss = DFRobot_GNSSAndRTC_UART("/dev/serial0")
+
+
+def on_fix(fix):
+    print("lat: {lat:.6f} lon: {lon:.6f} sog: {sog} knot sats: {sats} next poll in {interval} s".format(**fix))
+
+
+def setup():
+    while not gnss.begin():
+        print("No Deivce!")
+        time.sleep(1)
+    gnss.enable_power()
+    gnss.set_gnss(gnss.EGPS_BEIDOU_GLONASS)
+
+
+if __name__ == '__main__':
+    scheduler = DFRobot_GNSSScheduler(gnss, fast_interval=1, slow_interval=60, power_save=True)
+    try:
+        setup()
+        scheduler.run(on_fix)
+    except KeyboardInterrupt:
+        print(scheduler.savings())
+        exit()
@@ -0,0 +1,57 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  driftCalibRTC.py
+  @brief Calibrate the RTC from GNSS only when its predicted drift exceeds 0.5 s
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import sys
+import time
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_RTCDrift import DFRobot_RTCDrift
+
+#I2C_UART_FLAG = "I2C"
+I2C_UART_FLAG = "UART"
+if I2C_UART_FLAG == "I2C":
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_I2C
+    rtc = DFRobot_GNSSAndRTC_I2C(1)
+else:
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+    rtc = DFRobot_GNSSAndRTC_UART("/dev/serial0")
+
+drift = DFRobot_RTCDrift(rtc, budget=0.5)
+
+
+def setup():
+    while not rtc.begin():
+        print("Failed to init chip, please check if the chip connection is fine. ")
+        time.sleep(1)
+    rtc.set_hour_system(rtc.E24HOURS)
+
+    if not drift.start():
+        print("Calibration failed! Please proceed to an open outdoor area for time synchronization.")
+
+
+def loop():
+    drift.update()
+    stats = drift.stats()
+    print("predicted error {:+.3f} s (+/- {:.3f} s), {} calibrations, rate at {} C: {:+.2f} ppm".format(
+        stats['predicted'], stats['uncertainty'], stats['calibrations'],
+        drift.last_temp, drift.rate_ppm(drift.last_temp)))
+    time.sleep(300)
+
+
+if __name__ == "__main__":
+    try:
+        setup()
+        while True:
+            loop()
+    except KeyboardInterrupt:
+        exit()
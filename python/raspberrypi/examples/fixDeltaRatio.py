@@ -0,0 +1,70 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  fixDeltaRatio.py
+  @brief Compare the size of delta frames against JSON fixes and keyframes only
+  @details Usage: python fixDeltaRatio.py [track.jsonl], one get_fix() dict per line;
+  @n without a file a synthetic one hour drive is used.
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import json
+import math
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_FixDelta import DFRobot_FixDeltaEncoder, METERS_PER_DEGREE
+from DFRobot_GNSSUtil import KNOT_TO_MS
+
+
+def compare(fixes, **kwargs):
+    enc = DFRobot_FixDeltaEncoder(**kwargs)
+    key_enc = DFRobot_FixDeltaEncoder(keyframe_interval=0)
+    delta = sum(len(enc.encode(f)) for f in fixes)
+    keys = sum(len(key_enc.encode(f)) for f in fixes)
+    raw = sum(len(json.dumps(f, separators=(',', ':'))) for f in fixes)
+    return {
+        'fixes': len(fixes),
+        'json_bytes': raw,
+        'keyframe_bytes': keys,
+        'delta_bytes': delta,
+        'ratio_vs_json': float(raw) / delta if delta else 0.0,
+        'ratio_vs_keyframes': float(keys) / delta if delta else 0.0,
+        'bytes_per_fix': float(delta) / len(fixes) if fixes else 0.0,
+    }
+
+
+def synthetic_track(n=3600):
+    # One hour at 1 Hz: parked, driving with jitter, parked again
+    fixes = []
+    lat, lon = 31.2304, 121.4737
+    for t in range(n):
+        moving = n // 4 <= t < 3 * n // 4
+        sog = 25.0 + 5 * math.sin(t / 60.0) if moving else 0.0
+        if moving:
+            lat += sog * KNOT_TO_MS / METERS_PER_DEGREE * 0.7
+            lon += sog * KNOT_TO_MS / METERS_PER_DEGREE * 0.7
+        jitter = 1.5e-6 * math.sin(t * 12.9898)
+        fixes.append({
+            'year': 2024, 'month': 7, 'date': 10,
+            'hour': 8 + t // 3600, 'minute': (t // 60) % 60, 'second': t % 60,
+            'lat': lat + jitter, 'lon': lon - jitter, 'sats': 9 + (t // 300) % 3,
+            'alt': 12.0 + (0.3 if moving else 0.0) * math.sin(t / 10.0),
+            'sog': round(sog, 2), 'cog': 45.0 if moving else 0.0, 'mode': 7,
+        })
+    return fixes
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            track = [json.loads(line) for line in f if line.strip()]
+    else:
+        track = synthetic_track()
+    for cm in (0, 50, 200):
+        print(cm, "cm:", compare(track, position_cm=cm))
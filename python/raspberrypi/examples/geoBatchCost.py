@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  geoBatchCost.py
+  @brief Per-point cost of the DFRobot_GeoBatch functions on a synthetic 1e6 point track
+  @details Requires NumPy; no board is needed.
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_GeoBatch import (consecutive_bearings, consecutive_distances, geodetic_to_ecef, geodetic_to_enu,
+                              to_utm)
+from DFRobot_GNSSUtil import haversine_m as scalar_haversine
+
+
+def measure(n=1000000):
+    rng = np.random.default_rng(1)
+    lat = 31.2 + np.cumsum(rng.normal(0, 1e-4, n))
+    lon = 121.4 + np.cumsum(rng.normal(0, 1e-4, n))
+    alt = 10 + rng.normal(0, 1, n)
+    origin = (lat[0], lon[0], alt[0])
+    cases = (
+        ('geodetic_to_ecef', lambda: geodetic_to_ecef(lat, lon, alt)),
+        ('geodetic_to_enu', lambda: geodetic_to_enu(lat, lon, alt, origin)),
+        ('to_utm', lambda: to_utm(lat, lon)),
+        ('consecutive haversine', lambda: consecutive_distances(lat, lon)),
+        ('consecutive vincenty', lambda: consecutive_distances(lat, lon, 'vincenty')),
+        ('consecutive_bearings', lambda: consecutive_bearings(lat, lon)),
+    )
+    print("%d points" % n)
+    for name, func in cases:
+        start = time.time()
+        func()
+        print("%-24s %7.1f ns/point" % (name, (time.time() - start) / n * 1e9))
+    m = n // 10
+    lat_l, lon_l = lat[:m].tolist(), lon[:m].tolist()
+    start = time.time()
+    for i in range(m - 1):
+        scalar_haversine(lat_l[i], lon_l[i], lat_l[i + 1], lon_l[i + 1])
+    print("%-24s %7.1f ns/point" % ('per-point haversine', (time.time() - start) / m * 1e9))
+
+
+if __name__ == "__main__":
+    measure()
@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  getAllGNSSQueued.py
+  @brief read all gnss data on a producer thread and log it from a consumer thread
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import sys
+import time
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_GNSSStream import DFRobot_GNSSStream, POLICY_DROP_OLDEST
+
+#I2C_UART_FLAG = "I2C"
+I2C_UART_FLAG = "UART"
+if I2C_UART_FLAG == "I2C":
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_I2C
+    gnss = DFRobot_GNSSAndRTC_I2C(1)
+else:
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+    gnss = DFRobot_GNSSAndRTC_UART("/dev/serial0")
+
+stream = DFRobot_GNSSStream(gnss, maxsize=8, policy=POLICY_DROP_OLDEST, per_dump=True)
+
+
+def show(dump):
+    print("\n---------------------------Raw data from L76K-------------------------------")
+    print(dump.decode('ascii', 'replace'), end='')
+
+
+def setup():
+    while not gnss.begin():
+        print("No Deivce!")
+        time.sleep(1)
+    gnss.enable_power()
+
+    gnss.set_gnss(gnss.EGPS_BEIDOU_GLONASS)
+
+    stream.add_consumer(show)
+    stream.start(interval=3)
+
+
+def loop():
+    time.sleep(30)
+    print("\nqueue:", stream.stats()['consumers']['show'])
+
+
+if __name__ == '__main__':
+    try:
+        setup()
+        while True:
+            loop()
+    except KeyboardInterrupt:
+        stream.close(wait=False)
+        exit()
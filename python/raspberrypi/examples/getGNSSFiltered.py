@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  getGNSSFiltered.py
+  @brief Print a Kalman filtered position at 10 Hz while the fix is read once per second
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import sys
+import time
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_GNSSKalman import DFRobot_GNSSKalman
+
+#I2C_UART_FLAG = "I2C"
+I2C_UART_FLAG = "UART"
+if I2C_UART_FLAG == "I2C":
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_I2C
+    gnss = DFRobot_GNSSAndRTC_I2C(1)
+else:
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+    gnss = DFRobot_GNSSAndRTC_UART("/dev/serial0")
+
+kalman = DFRobot_GNSSKalman(gnss)
+
+
+def setup():
+    while not gnss.begin():
+        print("No Deivce!")
+        time.sleep(1)
+    gnss.enable_power()
+    gnss.set_gnss(gnss.EGPS_BEIDOU_GLONASS)
+    kalman.start(1.0)
+
+
+def loop():
+    pos = kalman.predict()
+    if pos is None:
+        print("waiting for a fix")
+    else:
+        print("lat: {lat:.7f} lon: {lon:.7f} alt: {alt:.1f} m sog: {sog:.2f} knot cog: {cog:.1f} "
+              "sigma: {sigma_h:.1f} m age: {age:.2f} s".format(**pos))
+    time.sleep(0.1)
+
+
+if __name__ == "__main__":
+    try:
+        setup()
+        while True:
+            loop()
+    except KeyboardInterrupt:
+        kalman.stop()
+        print(kalman.stats())
+        exit()
@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  gpsdServer.py
+  @brief Serve the module to gpsd clients on localhost:2947
+  @details Run `python gpsdServer.py --uart /dev/serial0` (or --i2c 1, or --sim for the pty simulator)
+  @n and point gpspipe, cgps or any gpsd client at localhost:2947. Requires Python 3.7 or later.
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_GPSD import DFRobot_GPSDServer, GPSD_PORT
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gpsd-compatible server for the DFRobot GNSS and RTC module")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--uart', metavar='PORT', help="serial port, e.g. /dev/serial0")
+    source.add_argument('--i2c', metavar='BUS', type=int, help="I2C bus number")
+    source.add_argument('--sim', action='store_true', help="serve the pty simulator")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=GPSD_PORT)
+    parser.add_argument('--interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    sim = None
+    if args.i2c is not None:
+        from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_I2C
+        board = DFRobot_GNSSAndRTC_I2C(args.i2c)
+    else:
+        from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+        port = args.uart
+        if args.sim:
+            from DFRobot_GNSSAndRTCSim import DFRobot_GNSSAndRTC_Simulator
+            sim = DFRobot_GNSSAndRTC_Simulator(baud=115200).start()
+            sim.set_fix({'year': 2024, 'month': 7, 'date': 10, 'hour': 8, 'minute': 30, 'second': 0,
+                         'lat': 31.2304, 'lon': 121.4737, 'sats': 9, 'alt': 12.3, 'sog': 0.12, 'cog': 45.6})
+            port = sim.port
+        board = DFRobot_GNSSAndRTC_UART(port, 115200 if sim else 57600)
+    if not board.begin():
+        raise SystemExit("No Device!")
+    server = DFRobot_GPSDServer(board, args.host, args.port, args.interval)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sim is not None:
+            sim.stop()
+
+
+if __name__ == "__main__":
+    main()
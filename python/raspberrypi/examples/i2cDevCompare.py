@@ -0,0 +1,79 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  i2cDevCompare.py
+  @brief Compare register reads through DFRobot_I2CDev against the smbus path
+  @details Both are driven against an in-process fake of the register map on a temporary file
+  @n node, so the host time only covers the Python side; the wire time is computed for a
+  @n 100 kHz bus. No board is needed.
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_I2CDev import DFRobot_I2CDev, I2C_M_RD
+
+
+class FakeRegisterMap(object):
+    '''!
+      @brief Register map answering both smbus calls and I2C_RDWR ioctls
+    '''
+
+    def __init__(self):
+        self.regs = bytearray(range(256))
+
+    def ioctl(self, fd, request, xfer):
+        msgs = xfer.msgs
+        reg = 0
+        for i in range(xfer.nmsgs):
+            msg = msgs[i]
+            if msg.flags & I2C_M_RD:
+                for j in range(msg.len):
+                    msg.buf[j] = self.regs[(reg + j) & 0xff]
+            else:
+                reg = msg.buf[0]
+                for j in range(1, msg.len):
+                    self.regs[(reg + j - 1) & 0xff] = msg.buf[j]
+        return 0
+
+    def read_byte_data(self, addr, reg):
+        return self.regs[reg & 0xff]
+
+
+def wire_time(frames, bytes_on_wire, hz=100000):
+    # 9 clocks per byte, plus start/stop per frame
+    return (bytes_on_wire * 9 + frames * 2) / float(hz)
+
+
+def compare(reads=20000):
+    fake = FakeRegisterMap()
+    node = tempfile.NamedTemporaryFile(prefix='i2c-fake-')
+    dev = DFRobot_I2CDev(path=node.name, ioctl=fake.ioctl)
+    buf = [0x00] * 32
+
+    def smbus_read(size):
+        for i in range(size):
+            buf[i] = fake.read_byte_data(0x66, i)
+
+    for size in (1, 6, 29):
+        t_smbus = timeit.timeit(lambda: smbus_read(size), number=reads) / reads
+        t_dev = timeit.timeit(lambda: dev.read_reg(0x66, 0, buf, size), number=reads) / reads
+        # read_byte_data: [addr+W][reg][addr+R][data] per byte; I2C_RDWR: [addr+W][reg][addr+R][data * size]
+        w_smbus = wire_time(size, 4 * size)
+        w_dev = wire_time(1, 3 + size)
+        print("%2d byte read: smbus %2d calls, host %6.2f us, wire %7.1f us | ioctl 1 call, host %6.2f us, wire %6.1f us" %
+              (size, size, t_smbus * 1e6, w_smbus * 1e6, t_dev * 1e6, w_dev * 1e6))
+    dev.close()
+    node.close()
+
+
+if __name__ == "__main__":
+    compare()
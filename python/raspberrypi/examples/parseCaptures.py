@@ -0,0 +1,81 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  parseCaptures.py
+  @brief Parse archived get_all_gnss captures on all cores with DFRobot_NMEABatch
+  @details Usage: python parseCaptures.py capture.nmea [more files] [-j 8] [-o fixes.csv]
+  @n              python parseCaptures.py --benchmark
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_NMEABatch import parse_captures
+
+
+def xor(text):
+    crc = 0
+    for c in bytearray(text.encode('ascii')):
+        crc ^= c
+    return crc
+
+
+def synthetic_capture(path, fixes):
+    start = datetime.datetime(2024, 7, 10, 8, 30, 0)
+    with open(path, 'w') as f:
+        for i in range(fixes):
+            t = start + datetime.timedelta(seconds=i)
+            hms = t.strftime('%H%M%S') + '.000'
+            lat = '31%08.5f' % (13.824 + (i % 600) * 0.0001)
+            gga = 'GNGGA,%s,%s,N,12128.42200,E,1,09,1.2,12.3,M,0.0,M,,' % (hms, lat)
+            rmc = 'GNRMC,%s,A,%s,N,12128.42200,E,0.12,45.60,%s,,,A,V' % (hms, lat, t.strftime('%d%m%y'))
+            for body in (gga, 'GPGSV,1,1,01,02,35,307,31,0', rmc, 'GNVTG,45.60,T,,M,0.12,N,0.22,K,A'):
+                f.write('$%s*%02X\r\n' % (body, xor(body)))
+
+
+def benchmark(fixes=400000):
+    path = os.path.join(tempfile.mkdtemp(), 'capture.nmea')
+    synthetic_capture(path, fixes)
+    print("capture: %d fixes, %.1f MB" % (fixes, os.path.getsize(path) / 1e6))
+    base = None
+    jobs = 1
+    while jobs <= (os.cpu_count() or 1):
+        start = time.time()
+        result = parse_captures([path], jobs)
+        elapsed = time.time() - start
+        base = base or elapsed
+        print("jobs %2d: %6.2f s, %8.0f fixes/s, speedup %.2f" % (jobs, elapsed, len(result) / elapsed, base / elapsed))
+        jobs *= 2
+    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse get_all_gnss captures on all cores")
+    parser.add_argument('paths', nargs='*', help="capture files")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="worker processes, default one per core")
+    parser.add_argument('-o', '--output', help="write the fixes as CSV")
+    parser.add_argument('--benchmark', action='store_true', help="time a synthetic capture with 1, 2, 4... workers")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark()
+        return
+    if not args.paths:
+        parser.error("no capture files")
+    result = parse_captures(args.paths, args.jobs)
+    print("%(fixes)d fixes from %(sentences)d RMC/GGA sentences, %(bad)d bad, %(shards)d shards" % result.stats)
+    if args.output:
+        result.write_csv(args.output)
+
+
+if __name__ == "__main__":
+    main()
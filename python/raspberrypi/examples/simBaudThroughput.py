@@ -0,0 +1,48 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  simBaudThroughput.py
+  @brief get_all_gnss throughput and get_fix latency per baud rate against the pty simulator
+  @details Runs DFRobot_GNSSAndRTC_UART against DFRobot_GNSSAndRTC_Simulator; no board is needed.
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+from DFRobot_GNSSAndRTCSim import DFRobot_GNSSAndRTC_Simulator
+
+
+def measure(rates=(9600, 57600, 115200, 230400, 460800, 921600), rounds=5):
+    for rate in rates:
+        with DFRobot_GNSSAndRTC_Simulator(baud=rate) as sim:
+            board = DFRobot_GNSSAndRTC_UART(sim.port, rate)
+            if not board.begin():
+                print("%6d baud: begin failed" % rate)
+                continue
+            received = [0]
+
+            def count(data, n):
+                received[0] += n
+
+            board.set_callback(count)
+            start = time.time()
+            for _ in range(rounds):
+                board.get_all_gnss()
+            dump = time.time() - start
+            start = time.time()
+            for _ in range(rounds * 10):
+                board.get_fix()
+            fix = (time.time() - start) / (rounds * 10)
+            print("%6d baud: get_all_gnss %7.0f B/s, get_fix %6.1f ms" % (rate, received[0] / dump, fix * 1e3))
+
+
+if __name__ == "__main__":
+    measure()
@@ -0,0 +1,56 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file sramStore.py
+  @brief Keep a boot counter and the last fix in the RTC SRAM with a CRC protected key-value store
+  @copyright    Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license      The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_SRAMStore import DFRobot_SRAMStore
+
+#I2C_UART_FLAG = "I2C"
+I2C_UART_FLAG = "UART"
+if I2C_UART_FLAG == "I2C":
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_I2C
+    rtc = DFRobot_GNSSAndRTC_I2C(1)
+else:
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+    rtc = DFRobot_GNSSAndRTC_UART("/dev/serial0")
+
+# (name, struct format, default value)
+FIELDS = [
+    ('boot_count', 'H', 0),
+    ('last_lat', 'd', 0.0),
+    ('last_lon', 'd', 0.0),
+    ('last_sats', 'B', 0),
+]
+
+
+def setup():
+    while not rtc.begin():
+        print("Failed to init chip, please check if the chip connection is fine. ")
+        time.sleep(1)
+    store = DFRobot_SRAMStore(rtc, FIELDS)
+    if not store.load():
+        print("No valid record in SRAM, starting from defaults.")
+    store.set('boot_count', store.get('boot_count') + 1)
+    store.set('last_lat', rtc.get_lat().latitudeDegree)
+    store.set('last_lon', rtc.get_lon().lonitudeDegree)
+    store.set('last_sats', rtc.get_num_sat_used())
+    if store.commit() != 0:
+        print("Failed to write the record.")
+    print(store.items())
+
+
+if __name__ == "__main__":
+    try:
+        setup()
+    except KeyboardInterrupt:
+        exit()
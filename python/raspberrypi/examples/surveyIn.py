@@ -0,0 +1,52 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  surveyIn.py
+  @brief Average the position of a static installation once, later boots reuse the stored result
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import sys
+import time
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from DFRobot_SurveyIn import DFRobot_SurveyIn
+
+#I2C_UART_FLAG = "I2C"
+I2C_UART_FLAG = "UART"
+if I2C_UART_FLAG == "I2C":
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_I2C
+    gnss = DFRobot_GNSSAndRTC_I2C(1)
+else:
+    from DFRobot_GNSSAndRTC import DFRobot_GNSSAndRTC_UART
+    gnss = DFRobot_GNSSAndRTC_UART("/dev/serial0")
+
+survey = DFRobot_SurveyIn(gnss, target=1.0, min_duration=600)
+
+
+def progress(status):
+    print("{samples} fixes, {duration:.0f} s, 95% radius {radius:.2f} m".format(**status))
+
+
+def setup():
+    while not gnss.begin():
+        print("No Deivce!")
+        time.sleep(1)
+    gnss.enable_power()
+    gnss.set_gnss(gnss.EGPS_BEIDOU_GLONASS)
+
+
+if __name__ == "__main__":
+    try:
+        setup()
+        if survey.done:
+            print("using the stored survey result")
+        result = survey.run(progress=progress)
+        print("lat: {lat:.8f} lon: {lon:.8f} alt: {alt:.2f} m radius: {radius:.2f} m".format(**result))
+    except KeyboardInterrupt:
+        exit()
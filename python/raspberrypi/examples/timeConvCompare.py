@@ -0,0 +1,75 @@
+# -*- coding:utf-8 -*-
+'''!
+  @file  timeConvCompare.py
+  @brief Compare the table-driven src.timeconv conversions against the get_rtc_time() based path
+  @details Both decode the same RTC register block; no board is needed.
+  @copyright Copyright (c) 2010 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license The MIT License (MIT)
+  @author [thdyyl](yuanlong.yu@dfrobot.com)
+  @version V1.0.0
+  @date 2024-07-10
+  @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+from __future__ import print_function
+import calendar
+import os
+import sys
+import timeit
+from ctypes import Structure, c_uint16, c_uint8, c_char_p
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from src.timeconv import TimezoneRule, days_since_2000, rtc_epoch, to_datetime
+
+
+def compare(rounds=200000):
+    class STimeData_t(Structure):
+        _fields_ = [('year', c_uint16), ('month', c_uint8), ('day', c_uint8), ('week', c_char_p),
+                    ('hour', c_uint8), ('minute', c_uint8), ('second', c_uint8)]
+
+    days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    buf = [0x56, 0x34, 0x92, 0x03, 0x10, 0x07, 0x24]
+
+    def bcd2bin(val):
+        return val - 6 * (val >> 4)
+
+    def date2days(y, m, d):
+        if y >= 2000:
+            y -= 2000
+        days = d
+        for i in range(m - 1):
+            days += days_in_month[i]
+        if m > 2 and y % 4 == 0 and (y % 100 != 0 or y % 400 == 0):
+            days = days + 1
+        return days + 365 * y + (y + 3) // 4 - 1
+
+    def per_call():
+        # What get_rtc_time() plus a hand-made epoch conversion did
+        s_time = STimeData_t()
+        s_time.year = 2000 + bcd2bin(buf[6])
+        s_time.month = bcd2bin(buf[5])
+        s_time.day = bcd2bin(buf[4])
+        data = bcd2bin(buf[3])
+        switchs = {0: "Sunday", 1: "Monday", 2: "Tuesday", 3: "Wednesday", 4: "Thursday", 5: "Friday", 6: "Saturday"}
+        s_time.week = switchs.get(data, "").encode('utf-8')
+        s_time.hour = bcd2bin(buf[2] & 0x7f)
+        s_time.minute = bcd2bin(buf[1])
+        s_time.second = bcd2bin(buf[0])
+        return calendar.timegm((s_time.year, s_time.month, s_time.day, s_time.hour, s_time.minute, s_time.second, 0, 0, 0))
+
+    assert per_call() == rtc_epoch(buf)
+    for y in range(2000, 2100):
+        for m in range(1, 13):
+            assert date2days(y, m, 1) == days_since_2000(y, m, 1)
+    tz = TimezoneRule.from_posix("CET-1CEST,M3.5.0,M10.5.0/3")
+    epoch = rtc_epoch(buf)
+    for name, func in (('get_rtc_time + timegm', per_call),
+                       ('rtc_epoch', lambda: rtc_epoch(buf)),
+                       ('date2days loop', lambda: date2days(2024, 12, 31)),
+                       ('days_since_2000', lambda: days_since_2000(2024, 12, 31)),
+                       ('to_datetime with tz', lambda: to_datetime(epoch, tz))):
+        t = timeit.timeit(func, number=rounds)
+        print("%-22s %6.2f us" % (name, t / rounds * 1e6))
+
+
+if __name__ == "__main__":
+    compare()
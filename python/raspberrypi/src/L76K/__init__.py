@@ -14,6 +14,146 @@ from abc import ABCMeta, abstractmethod
 import time
 from ctypes import *
 import six
+from ..timeconv import gnss_epoch, to_datetime
+
+class ChunkPlanner(object):
+    '''!
+      @brief Picks the REG_ALL_DATA chunk size with the best expected throughput
+      @details Successful chunks feed a decaying least-squares fit of read time = overhead + size * per_byte,
+      @n failures feed a decaying per-byte failure rate p. For every candidate size n the planner
+      @n takes the one maximizing n * (1 - p)^n / (overhead + n * per_byte), i.e. bytes per second
+      @n after retries. Until data is available the largest chunk is used.
+    '''
+    DECAY = 0.9
+
+    def __init__(self, max_size, min_size=4):
+        '''!
+          @brief Constructor
+          @param max_size Largest chunk the transport accepts
+          @param min_size Smallest chunk worth a bus transaction
+        '''
+        self.max_size = max_size
+        self.candidates = sorted(set([max_size] + [n for n in (4, 8, 16, 32, 64, 128, 250) if min_size <= n < max_size]))
+        self.__size = max_size
+        self.__sn = self.__sx = self.__sy = self.__sxx = self.__sxy = 0.0
+        self.__bytes = 0.0
+        self.__fails = 0.0
+        self.chunks = 0
+        self.failures = 0
+
+    def next_size(self):
+        '''!
+          @brief Size of the next chunk
+        '''
+        return self.__size
+
+    def record(self, size, received, duration):
+        '''!
+          @brief Feed the outcome of one chunk read
+          @param size Bytes requested
+          @param received Bytes received, equal to size on success
+          @param duration Time the read took, s
+        '''
+        d = self.DECAY
+        self.chunks += 1
+        self.__fails *= d
+        if received < size:
+            # The byte that failed was attempted as well
+            self.__bytes = self.__bytes * d + received + 1
+            self.failures += 1
+            self.__fails += 1
+        else:
+            self.__bytes = self.__bytes * d + size
+            self.__sn = self.__sn * d + 1
+            self.__sx = self.__sx * d + size
+            self.__sy = self.__sy * d + duration
+            self.__sxx = self.__sxx * d + size * size
+            self.__sxy = self.__sxy * d + size * duration
+        self.__size = self.__plan()
+
+    def estimate(self):
+        '''!
+          @brief Current model
+          @return (overhead s, per-byte s, per-byte failure rate)
+        '''
+        n = self.__sn
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        mean_x = self.__sx / n
+        mean_y = self.__sy / n
+        var_x = self.__sxx / n - mean_x * mean_x
+        if var_x > 1e-9:
+            per_byte = max(0.0, (self.__sxy / n - mean_x * mean_y) / var_x)
+        else:
+            per_byte = 0.0
+        overhead = max(1e-6, mean_y - per_byte * mean_x)
+        rate = self.__fails / self.__bytes if self.__bytes else 0.0
+        return overhead, per_byte, min(rate, 0.5)
+
+    def __plan(self):
+        if self.__sn == 0 and self.__fails == 0:
+            return self.max_size
+        overhead, per_byte, rate = self.estimate()
+        if overhead == 0.0:
+            overhead = 1e-3
+        best = self.max_size
+        best_rate = -1.0
+        for n in self.candidates:
+            throughput = n * (1.0 - rate) ** n / (overhead + n * per_byte)
+            if throughput > best_rate:
+                best, best_rate = n, throughput
+        return best
+
+
+class FixEpochCache(object):
+    '''!
+      @brief Last fix read by get_fix_if_new() and the bus operations it saved or wasted
+      @details A bus operation is wasted when it returns nothing new: a time probe that finds
+      @n the UTC time of the cached fix, or a fix block read with that same time. Without
+      @n the probe every poll would have been a full fix block read.
+    '''
+
+    def __init__(self):
+        self.fix = None
+        self.stamp = None
+        self.read_at = 0.0
+        self.reset()
+
+    def reset(self):
+        '''!
+          @brief Zero the counters
+        '''
+        self.since = time.time()
+        self.polls = 0
+        self.probes = 0
+        self.block_reads = 0
+        self.cached = 0
+        self.stale_blocks = 0
+        self.bytes = 0
+
+    def stats(self):
+        '''!
+          @brief Counters since the last reset
+          @return dict with polls, new (fix block reads with a new epoch), cached (polls served
+          @n      from the cache), probes, bus_ops, bytes, wasted_ops, elapsed (s),
+          @n      wasted_ops_per_s, and saved_ops/saved_bytes against a get_fix() per poll
+        '''
+        elapsed = max(1e-9, time.time() - self.since)
+        full = DFRobot_GNSS.FIX_BLOCK_LEN
+        return {
+            'polls': self.polls,
+            'new': self.block_reads - self.stale_blocks,
+            'cached': self.cached,
+            'probes': self.probes,
+            'bus_ops': self.probes + self.block_reads,
+            'bytes': self.bytes,
+            'wasted_ops': self.cached + self.stale_blocks,
+            'elapsed': elapsed,
+            'wasted_ops_per_s': (self.cached + self.stale_blocks) / elapsed,
+            'saved_ops': self.polls - self.probes - self.block_reads,
+            'saved_bytes': self.polls * full - self.bytes,
+        }
+
 
 class DFRobot_GNSS(object):
     __metaclass__ = ABCMeta
@@ -73,6 +213,11 @@ class DFRobot_GNSS(object):
     UART_MAX_READ_LEN = 250
     I2C_MAX_READ_LEN = 32
 
+    ALL_DATA_RETRIES = 2  # < Retries of one failed get_all_gnss chunk before the dump is cut short
+
+    FIX_BLOCK_LEN = REG_COG_X + 1  # < Registers REG_YEAR_H ~ REG_COG_X hold one complete fix
+    FIX_EPOCH_INTERVAL = 1.0  # < The module publishes a new fix every second
+
     class STim_t(Structure):
         '''!
           @struct STim_t
@@ -132,6 +277,21 @@ class DFRobot_GNSS(object):
         data.second = _send_data[2]
         return data
 
+    def get_gnss_epoch(self, as_datetime=False, tz=None):
+        '''!
+          @brief Get the GNSS date and UTC time with a single register read
+          @param as_datetime False for Unix seconds, True for a naive datetime.datetime
+          @param tz src.timeconv.TimezoneRule, the datetime is converted to its local time
+          @return int or datetime.datetime, None if the read failed or the module has no date yet
+        '''
+        buf = [0x00] * (self.REG_SECOND + 1)
+        if self._read_reg(self.REG_YEAR_H, buf, self.REG_SECOND + 1) == 1:
+            return None
+        epoch = gnss_epoch(buf)
+        if epoch is None or not as_datetime:
+            return epoch
+        return to_datetime(epoch, tz)
+
     def get_date(self):
         '''!
           @brief Get date information, year, month, day
@@ -249,6 +409,104 @@ class DFRobot_GNSS(object):
             cog = ((_send_data[0] & 0x7F) << 8 | _send_data[1]) + _send_data[2] / 100.0
         return cog
 
+    def get_fix(self):
+        '''!
+          @brief Get date, time, position, altitude, speed and course with a single register read
+          @return dict, None if the read failed
+          @retval year, month, date, hour, minute, second UTC date and time
+          @retval lat Latitude in degree, negative for south
+          @retval lon Longitude in degree, negative for west
+          @retval alt Altitude, m
+          @retval sog Speed over ground, knot
+          @retval cog Course over ground, degree
+          @retval sats Number of the used satellite
+        '''
+        buf = [0x00] * self.FIX_BLOCK_LEN
+        if self._read_reg(self.REG_YEAR_H, buf, self.FIX_BLOCK_LEN) == 1:
+            return None
+        return self.decode_fix(buf)
+
+    def get_fix_if_new(self):
+        '''!
+          @brief Get the fix, reading the fix block only when the module has a new epoch
+          @details Within FIX_EPOCH_INTERVAL of the last block read only REG_HOUR ~ REG_SECOND
+          @n are read; if that time equals the time of the cached fix, the cached fix is returned
+          @n without reading or decoding the rest. Otherwise, and always once the cached fix is
+          @n a whole interval old, the block is read and decoded as get_fix() does. Polling
+          @n faster than the module updates then costs a 3 byte read per poll instead of a full
+          @n fix read, and polling at 1 Hz or slower costs the same as get_fix().
+          @return dict in the format of get_fix(), None if a read failed
+        '''
+        cache = self.fix_cache
+        if cache is None:
+            cache = self.fix_cache = FixEpochCache()
+        cache.polls += 1
+        if cache.fix is not None and time.time() - cache.read_at < self.FIX_EPOCH_INTERVAL:
+            probe = [0x00] * 3
+            if self._read_reg(self.REG_HOUR, probe, 3) == 1:
+                return None
+            cache.probes += 1
+            cache.bytes += 3
+            if tuple(probe) == cache.stamp:
+                cache.cached += 1
+                return cache.fix
+        buf = [0x00] * self.FIX_BLOCK_LEN
+        if self._read_reg(self.REG_YEAR_H, buf, self.FIX_BLOCK_LEN) == 1:
+            return None
+        cache.block_reads += 1
+        cache.bytes += self.FIX_BLOCK_LEN
+        stamp = tuple(buf[self.REG_HOUR:self.REG_SECOND + 1])
+        if stamp == cache.stamp:
+            cache.stale_blocks += 1
+        cache.stamp = stamp
+        cache.read_at = time.time()
+        cache.fix = self.decode_fix(buf)
+        return cache.fix
+
+    def fix_read_stats(self, reset=False):
+        '''!
+          @brief Get the counters of get_fix_if_new()
+          @param reset Zero the counters after reading them
+          @return dict, see FixEpochCache.stats(), None before the first get_fix_if_new()
+        '''
+        if self.fix_cache is None:
+            return None
+        stats = self.fix_cache.stats()
+        if reset:
+            self.fix_cache.reset()
+        return stats
+
+    @staticmethod
+    def decode_fix(buf):
+        '''!
+          @brief Decode the REG_YEAR_H ~ REG_COG_X register block
+          @param buf Register values, REG_YEAR_H first
+          @return dict in the format of get_fix()
+        '''
+        def degree(off):
+            value = buf[off] + buf[off + 1] / 60.0 + ((buf[off + 2] << 16) | (buf[off + 3] << 8) | buf[off + 4]) / 100000.0 / 60.0
+            if buf[off + 5] in (ord('S'), ord('W')):
+                value = -value
+            return value
+
+        def fixed(off):
+            return ((buf[off] & 0x7F) << 8 | buf[off + 1]) + buf[off + 2] / 100.0
+
+        return {
+            'year': (buf[0] << 8) | buf[1],
+            'month': buf[2],
+            'date': buf[3],
+            'hour': buf[4],
+            'minute': buf[5],
+            'second': buf[6],
+            'lat': degree(DFRobot_GNSS.REG_LAT_1),
+            'lon': degree(DFRobot_GNSS.REG_LON_1),
+            'sats': buf[DFRobot_GNSS.REG_USE_STAR],
+            'alt': fixed(DFRobot_GNSS.REG_ALT_H),
+            'sog': fixed(DFRobot_GNSS.REG_SOG_H),
+            'cog': fixed(DFRobot_GNSS.REG_COG_H),
+        }
+
     def set_gnss(self, mode):
         '''!
           @brief Set GNSS to be used
@@ -285,49 +543,47 @@ class DFRobot_GNSS(object):
     def get_all_gnss(self):
         '''!
           @brief Get GNSS data, call back and receive
+          @details The dump is read in chunks sized by the chunk planner from the success rate and
+          @n latency observed on this transport. A failed chunk is retried from where the data
+          @n stopped instead of aborting the dump; no zero-length tail read is issued.
+          @note On UART, bytes of a partly received chunk that were lost on the wire cannot be
+          @n    requested again, the dump continues after the bytes that did arrive.
+          @return int type, number of bytes delivered to the callback
         '''
         _send_data = [0x00] * 260
         len = self.__get_gnss_len()
         if len > 1024 + 200 or len == 0:
-            return
-        if self.i2c_uart_flag == self.GNSS_UART_FLAG:
-            templen = len // self.UART_MAX_READ_LEN + 1
-            for i in range(0, templen):
-                if i == templen - 1:
-                    if self._read_reg(self.REG_ALL_DATA, _send_data, len % self.UART_MAX_READ_LEN) == 1:
-                        return
-                    for j in range(0, len % self.UART_MAX_READ_LEN):
-                        if _send_data[j] == 0x00:
-                            _send_data[j] = ord('\n')
-                    if self.callback:
-                        self.callback(_send_data, len % self.UART_MAX_READ_LEN)
-                else:
-                    if self._read_reg(self.REG_ALL_DATA, _send_data, self.UART_MAX_READ_LEN) == 1:
-                        return
-                    for j in range(0, self.UART_MAX_READ_LEN):
-                        if _send_data[j] == 0x00:
-                            _send_data[j] = ord('\n')
-                    if self.callback:
-                        self.callback(_send_data, self.UART_MAX_READ_LEN)
-        else:
-            templen = len // self.I2C_MAX_READ_LEN + 1
-            for i in range(0, templen):
-                if i == templen - 1:
-                    if self._read_reg(self.REG_ALL_DATA, _send_data, len % self.I2C_MAX_READ_LEN) == 1:
-                        return
-                    for j in range(0, len % self.I2C_MAX_READ_LEN):
-                        if _send_data[j] == 0x00:
-                            _send_data[j] = ord('\n')
-                    if self.callback:
-                        self.callback(_send_data, len % self.I2C_MAX_READ_LEN)
-                else:
-                    if self._read_reg(self.REG_ALL_DATA, _send_data, self.I2C_MAX_READ_LEN) == 1:
-                        return
-                    for j in range(0, self.I2C_MAX_READ_LEN):
-                        if _send_data[j] == 0x00:
-                            _send_data[j] = ord('\n')
-                    if self.callback:
-                        self.callback(_send_data, self.I2C_MAX_READ_LEN)
+            return 0
+        if self.chunk_planner is None:
+            if self.i2c_uart_flag == self.GNSS_UART_FLAG:
+                self.chunk_planner = ChunkPlanner(self.UART_MAX_READ_LEN)
+            else:
+                self.chunk_planner = ChunkPlanner(self.I2C_MAX_READ_LEN)
+        planner = self.chunk_planner
+        offset = 0
+        retries = 0
+        while offset < len:
+            size = min(planner.next_size(), len - offset)
+            self._last_read_len = 0
+            start = time.time()
+            ret = self._read_reg(self.REG_ALL_DATA, _send_data, size)
+            received = size if ret == 0 else min(self._last_read_len, size)
+            planner.record(size, received, time.time() - start)
+            if received:
+                for j in range(0, received):
+                    if _send_data[j] == 0x00:
+                        _send_data[j] = ord('\n')
+                if self.callback:
+                    self.callback(_send_data, received)
+                offset += received
+            if ret == 0 or received:
+                retries = 0
+                continue
+            retries += 1
+            if retries > self.ALL_DATA_RETRIES:
+                break
+        return offset
+
     def enable_power(self):
         '''!
           @brief Enable gnss power
@@ -354,6 +610,9 @@ class DFRobot_GNSS(object):
         self.callback = callback
 
     callback = None
+    chunk_planner = None
+    fix_cache = None
+    _last_read_len = 0  # < Bytes actually received by the last _read_reg, set by the transport
 
     def __get_gnss_len(self):
         '''!
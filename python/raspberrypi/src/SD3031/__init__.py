@@ -13,19 +13,15 @@
 from abc import ABCMeta, abstractmethod
 import time
 from ctypes import *
+from ..timeconv import BCD2BIN, BIN2BCD, WEEK_NAMES, days_since_2000, rtc_epoch, to_datetime
 
 days_in_month = [31,28,31,30,31,30,31,31,30,31,30,31]
 
 
 def date2days(y, m, d):
-    if y >= 2000:
-        y -= 2000
-    days = d
-    for i in range(m-1):
-        days += days_in_month[i]
-    if m > 2 and y % 4 == 0 and (y % 100 != 0 or y % 400 == 0):
-        days = days + 1
-    return days + 365 * y + (y + 3) // 4 - 1
+    if y < 2000:
+        y += 2000
+    return days_since_2000(y, m, d)
 
 
 class DFRobot_SD3031(object):
@@ -54,6 +50,13 @@ class DFRobot_SD3031(object):
     SD3031_REG_I2C_CON = (0x17 + 0x30)  # < I2C Control
     SD3031_REG_BAT_VAL = (0x1A + 0x30)  # < Battery Level
 
+    SD3031_SRAM_START = 0x2C  # < First user SRAM address
+    SD3031_SRAM_END = 0x71  # < Last user SRAM address
+    SD3031_SRAM_FREE_START = 0x30  # < First SRAM address past the RTC read window registers 0x2E/0x2F
+    SD3031_RTC_WINDOW = 0x30  # < Addresses from here on are read through the RTC read window
+
+    SRAM_BLOCK_LEN = 32  # < Largest SRAM transfer per bus frame, overridden by the transport
+
     class STimeData_t(Structure):
         '''!
           @struct STimeData_t
@@ -109,18 +112,7 @@ class DFRobot_SD3031(object):
         s_time.month = self.__bcd2bin(buffer[5])
         s_time.day = self.__bcd2bin(buffer[4])
         data = self.__bcd2bin(buffer[3])
-
-        switchs = {
-            0: "Sunday",
-            1: "Monday",
-            2: "Tuesday",
-            3: "Wednesday",
-            4: "Thursday",
-            5: "Friday",
-            6: "Saturday"
-        }
-
-        s_time.week = switchs.get(data, "").encode('utf-8')
+        s_time.week = WEEK_NAMES[data] if data < 7 else b""
         data = buffer[2]
         if self.__mode == self.E24HOURS:
             s_time.hour = self.__bcd2bin(data & 0x7f)
@@ -131,6 +123,20 @@ class DFRobot_SD3031(object):
         s_time.second = self.__bcd2bin(buffer[0])
         return s_time
 
+    def get_rtc_epoch(self, as_datetime=False, tz=None):
+        '''!
+          @brief Get the RTC time with a single register read
+          @param as_datetime False for Unix seconds, True for a naive datetime.datetime
+          @param tz src.timeconv.TimezoneRule, the datetime is converted to its local time
+          @return int or datetime.datetime, None if the read failed
+          @note The time is taken as UTC, which is what GNSS calibration sets. Both hour systems are handled.
+        '''
+        buffer = [0x00] * 7
+        if self._read_reg(self.SD3031_REG_SEC, buffer, 7) == 1:
+            return None
+        epoch = rtc_epoch(buffer)
+        return to_datetime(epoch, tz) if as_datetime else epoch
+
     def set_hour_system(self, mode):
         '''!
           @brief Set clock as 24-hour or 12-hour format
@@ -363,6 +369,77 @@ class DFRobot_SD3031(object):
         '''
         self._write_reg(addr, [0xff], 1)
 
+    def read_sram_block(self, addr, n):
+        '''!
+          @brief read a block of the SRAM
+          @param addr 0x2c~0x71, start address
+          @param n Number of bytes to read, addr + n - 1 must not exceed 0x71
+          @return list of the bytes stored in the SRAM, None if a bus transfer failed
+        '''
+        self.__check_sram_range(addr, n)
+        buffer = [0x00] * n
+        for start, length in self.__sram_chunks(addr, n):
+            chunk = [0x00] * length
+            if self._read_reg(start, chunk, length) == 1:
+                return None
+            buffer[start - addr:start - addr + length] = chunk
+        return buffer
+
+    def write_sram_block(self, addr, data):
+        '''!
+          @brief write a block of the SRAM
+          @param addr 0x2c~0x71, start address
+          @param data list of uint8_t, addr + len(data) - 1 must not exceed 0x71
+          @return uint8_t type, indicates writing status
+          @retval 0 Writing succeeded
+          @retval 1 Writing failed
+        '''
+        self.__check_sram_range(addr, len(data))
+        for start, length in self.__sram_chunks(addr, len(data)):
+            chunk = [b & 0xff for b in data[start - addr:start - addr + length]]
+            if self._write_reg(start, chunk, length) == 1:
+                return 1
+        return 0
+
+    def clear_sram_block(self, addr, n):
+        '''!
+          @brief clear a block of the SRAM
+          @param addr 0x2c~0x71, start address
+          @param n Number of bytes to clear
+          @return uint8_t type, 0 on success, 1 on failure
+        '''
+        return self.write_sram_block(addr, [0xff] * n)
+
+    def __check_sram_range(self, addr, n):
+        '''!
+          @brief Make sure a block lies inside the user SRAM
+          @param addr Start address
+          @param n Block length
+        '''
+        if n <= 0 or addr < self.SD3031_SRAM_START or addr + n - 1 > self.SD3031_SRAM_END:
+            raise ValueError("SRAM block 0x%02X+%d is outside 0x%02X~0x%02X" %
+                             (addr, n, self.SD3031_SRAM_START, self.SD3031_SRAM_END))
+
+    def __sram_chunks(self, addr, n):
+        '''!
+          @brief Split a block into bus frames
+          @details Frames never cross the RTC read window boundary, because the window
+          @n is only opened when the frame starts inside it.
+          @param addr Start address
+          @param n Block length
+          @return list of (start, length) tuples
+        '''
+        chunks = []
+        end = addr + n
+        while addr < end:
+            limit = end
+            if addr < self.SD3031_RTC_WINDOW < end:
+                limit = self.SD3031_RTC_WINDOW
+            length = min(limit - addr, self.SRAM_BLOCK_LEN)
+            chunks.append((addr, length))
+            addr += length
+        return chunks
+
     def count_down(self, second):
         '''!
           @brief Countdown
@@ -395,7 +472,7 @@ class DFRobot_SD3031(object):
           @param val Input BCD code
           @return Return BIN code
         '''
-        return val - 6 * (val >> 4)
+        return BCD2BIN[val]
 
     def __bin2bcd(self, val):
         '''!
@@ -403,7 +480,7 @@ class DFRobot_SD3031(object):
           @param val Input BIN code
           @return Return BCD code
         '''
-        return val + 6 * (val // 10)
+        return BIN2BCD[val]
 
     @abstractmethod
     def _write_reg(self, reg, p_buf, size):
@@ -0,0 +1,218 @@
+# -*- coding:utf-8 -*-
+'''!
+    @file timeconv.py
+    @brief Table-driven conversions between register time fields, epoch seconds and datetime
+    @details Day counts come from cumulative days-before-month tables and BCD values from
+    @n 256 entry lookup tables, so converting a register block costs a few index
+    @n operations. TimezoneRule turns UTC epochs into local time with POSIX TZ style rules
+    @n and keeps the current offset interval cached, so consecutive conversions skip the
+    @n rule evaluation entirely.
+    @n
+    @n examples/timeConvCompare.py compares the conversions against the get_rtc_time() based path.
+    @copyright	Copyright (c) 2024 DFRobot Co.Ltd (http://www.dfrobot.com)
+    @license The MIT License (MIT)
+    @author [thdyyl](yuanlong.yu@dfrobot.com)
+    @version V1.0
+    @date 2024-07-10
+    @url https://github.com/DFRobot/DFRobot_GNSSAndRTC
+'''
+import datetime
+import re
+
+EPOCH_2000 = 946684800  # < 2000-01-01T00:00:00Z in Unix seconds
+EPOCH_DATETIME = datetime.datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+# DAYS_BEFORE_MONTH[leap][month - 1]
+DAYS_BEFORE_MONTH = (
+    (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334),
+    (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335),
+)
+
+DAYS_IN_MONTH = (
+    (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+
+BCD2BIN = tuple(v - 6 * (v >> 4) for v in range(256))
+BIN2BCD = tuple(v + 6 * (v // 10) for v in range(256))
+
+WEEK_NAMES = (b"Sunday", b"Monday", b"Tuesday", b"Wednesday", b"Thursday", b"Friday", b"Saturday")
+
+
+def is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def days_since_2000(year, month, day):
+    '''!
+      @brief Days from 2000-01-01 to a date
+      @param year 2000 and later
+      @param month 1~12
+      @param day 1~31
+      @return int
+    '''
+    y = year - 2000
+    return (365 * y + (y + 3) // 4 - (y + 99) // 100 + (y + 399) // 400 +
+            DAYS_BEFORE_MONTH[is_leap(year)][month - 1] + day - 1)
+
+
+def to_epoch(year, month, day, hour, minute, second):
+    '''!
+      @brief Unix seconds of a UTC date and time
+      @return int
+    '''
+    return EPOCH_2000 + days_since_2000(year, month, day) * SECONDS_PER_DAY + hour * 3600 + minute * 60 + second
+
+
+def weekday(year, month, day):
+    '''!
+      @brief Day of the week
+      @return int, 0 is Sunday
+    '''
+    # 2000-01-01 was a Saturday
+    return (days_since_2000(year, month, day) + 6) % 7
+
+
+def rtc_fields(buf):
+    '''!
+      @brief Decode the 7 BCD time registers of the SD3031, seconds first
+      @param buf Register values
+      @return (year, month, day, hour, minute, second) with a 0~23 hour in either hour system
+    '''
+    hour = buf[2]
+    if hour & 0x80:
+        hour = BCD2BIN[hour & 0x3f]
+    else:
+        hour = BCD2BIN[hour & 0x1f] % 12 + (12 if hour & 0x20 else 0)
+    return 2000 + BCD2BIN[buf[6]], BCD2BIN[buf[5]], BCD2BIN[buf[4]], hour, BCD2BIN[buf[1]], BCD2BIN[buf[0]]
+
+
+def rtc_epoch(buf):
+    '''!
+      @brief Unix seconds of the 7 BCD time registers of the SD3031, seconds first
+      @return int
+    '''
+    year, month, day, hour, minute, second = rtc_fields(buf)
+    return to_epoch(year, month, day, hour, minute, second)
+
+
+def gnss_epoch(buf):
+    '''!
+      @brief Unix seconds of the GNSS registers REG_YEAR_H ~ REG_SECOND
+      @return int, None while the module has no valid date
+    '''
+    year = (buf[0] << 8) | buf[1]
+    if year < 2000 or not 1 <= buf[2] <= 12 or not 1 <= buf[3] <= 31:
+        return None
+    return to_epoch(year, buf[2], buf[3], buf[4], buf[5], buf[6])
+
+
+def to_datetime(epoch, tz=None):
+    '''!
+      @brief Naive datetime of a Unix time
+      @param epoch Unix seconds
+      @param tz TimezoneRule for local time, None for UTC
+      @return datetime.datetime
+    '''
+    if tz is not None:
+        epoch += tz.utcoffset(epoch)
+    return EPOCH_DATETIME + datetime.timedelta(seconds=epoch)
+
+
+class TimezoneRule(object):
+    '''!
+      @brief UTC offset rule with an optional yearly daylight saving period
+    '''
+    _POSIX = re.compile(r'^(<[^>]+>|[A-Za-z]{3,})([+-]?\d{1,2}(?::\d{2}){0,2})'
+                        r'(?:(<[^>]+>|[A-Za-z]{3,})([+-]?\d{1,2}(?::\d{2}){0,2})?'
+                        r',M(\d+)\.(\d)\.(\d)(?:/([+-]?\d+(?::\d{2}){0,2}))?'
+                        r',M(\d+)\.(\d)\.(\d)(?:/([+-]?\d+(?::\d{2}){0,2}))?)?$')
+
+    def __init__(self, offset=0, dst_offset=None, dst_start=None, dst_end=None):
+        '''!
+          @brief Constructor
+          @param offset Standard time offset east of UTC, s
+          @param dst_offset Daylight saving offset east of UTC, s, None without daylight saving
+          @param dst_start (month, week 1~5 with 5 the last, weekday 0~6 from Sunday, local standard time s)
+          @param dst_end Same as dst_start, local daylight saving time s
+        '''
+        self.offset = offset
+        self.dst_offset = dst_offset
+        self.dst_start = dst_start
+        self.dst_end = dst_end
+        self.__years = {}
+        self.__lo = self.__hi = 0
+        self.__cached = None
+
+    @classmethod
+    def from_posix(cls, spec):
+        '''!
+          @brief Build a rule from a POSIX TZ string with M-format transitions
+          @param spec e.g. "UTC0", "CST-8", "CET-1CEST,M3.5.0,M10.5.0/3", "EST5EDT,M3.2.0,M11.1.0"
+          @return TimezoneRule
+        '''
+        m = cls._POSIX.match(spec.strip())
+        if m is None:
+            raise ValueError("unsupported TZ rule %r" % spec)
+        g = m.groups()
+        offset = -cls.__seconds(g[1])
+        if g[2] is None:
+            return cls(offset)
+        dst_offset = -cls.__seconds(g[3]) if g[3] else offset + 3600
+        start = (int(g[4]), int(g[5]), int(g[6]), cls.__seconds(g[7]) if g[7] else 7200)
+        end = (int(g[8]), int(g[9]), int(g[10]), cls.__seconds(g[11]) if g[11] else 7200)
+        return cls(offset, dst_offset, start, end)
+
+    def utcoffset(self, epoch):
+        '''!
+          @brief Offset east of UTC in effect at a Unix time
+          @param epoch Unix seconds
+          @return int, s
+        '''
+        if self.__lo <= epoch < self.__hi:
+            return self.__cached
+        if self.dst_offset is None:
+            self.__lo, self.__hi, self.__cached = float('-inf'), float('inf'), self.offset
+            return self.offset
+        year = (EPOCH_DATETIME + datetime.timedelta(seconds=epoch)).year
+        start, end = self.__transitions(year)
+        if start < end:
+            # Northern hemisphere: daylight saving inside the year
+            if epoch < start:
+                self.__lo, self.__hi, self.__cached = to_epoch(year, 1, 1, 0, 0, 0), start, self.offset
+            elif epoch < end:
+                self.__lo, self.__hi, self.__cached = start, end, self.dst_offset
+            else:
+                self.__lo, self.__hi, self.__cached = end, to_epoch(year + 1, 1, 1, 0, 0, 0), self.offset
+        else:
+            # Southern hemisphere: daylight saving across the new year
+            if epoch < end:
+                self.__lo, self.__hi, self.__cached = to_epoch(year, 1, 1, 0, 0, 0), end, self.dst_offset
+            elif epoch < start:
+                self.__lo, self.__hi, self.__cached = end, start, self.offset
+            else:
+                self.__lo, self.__hi, self.__cached = start, to_epoch(year + 1, 1, 1, 0, 0, 0), self.dst_offset
+        return self.__cached
+
+    def __transitions(self, year):
+        if year not in self.__years:
+            self.__years[year] = (self.__transition(year, self.dst_start) - self.offset,
+                                  self.__transition(year, self.dst_end) - self.dst_offset)
+        return self.__years[year]
+
+    @staticmethod
+    def __transition(year, rule):
+        month, week, wday, local = rule
+        first = weekday(year, month, 1)
+        day = 1 + (wday - first) % 7 + (week - 1) * 7
+        length = DAYS_IN_MONTH[is_leap(year)][month - 1]
+        while day > length:
+            day -= 7
+        return to_epoch(year, month, day, 0, 0, 0) + local
+
+    @staticmethod
+    def __seconds(text):
+        sign = -1 if text.startswith('-') else 1
+        parts = [int(p) for p in text.lstrip('+-').split(':')] + [0, 0]
+        return sign * (parts[0] * 3600 + parts[1] * 60 + parts[2])